@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+기어박스 사양 일괄 계산 (멀티프로세스 배치)
+- 견적 요청 파일(CSV / JSONL)의 각 행을 GearboxSpec 으로 읽어 design_gearbox 실행
+- 행을 청크 단위로 프로세스 풀에 분배하고, 입력 순서대로 결과를 스트리밍 저장
+- 출력: JSONL (기본) 또는 Parquet (.parquet, pyarrow 필요)
+- 종료 시 처리량 (specs/s) 을 stderr 로 출력
+
+사용법:
+    python gearbox_batch.py <입력.csv|.jsonl> <출력.jsonl|.parquet> [--workers N] [--chunk-size N]
+
+입력 열 이름은 GearboxSpec 필드명 (P_kW, n1, n_out, Ka, sigma_Fb, sigma_Hb ...) 과 같다.
+없는 열은 기본값을 쓰고, "id" 열이 있으면 결과에 그대로 옮긴다.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import fields
+from itertools import islice
+from multiprocessing import Pool
+
+from gearbox_design_agma import (
+    GearboxSpec, design_gearbox, preload_factor_tables, result_summary,
+)
+
+SPEC_FIELDS = {f.name: f.type for f in fields(GearboxSpec)}
+
+
+def read_rows(path):
+    """CSV / JSONL 파일의 행을 dict 로 하나씩 읽는다."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def row_to_spec(row):
+    """
+    입력 행 -> GearboxSpec (빈 값은 기본값, 알 수 없는 열은 무시)
+    정수 필드(잇수 등)에 정수가 아닌 값 (17.6 등) 이 오면 ValueError.
+    """
+    kwargs = {}
+    for name, value in row.items():
+        if name not in SPEC_FIELDS or value in (None, ""):
+            continue
+        kind = SPEC_FIELDS[name]
+        if kind in (int, "int"):
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError(f"{name} 는 정수여야 함: {value!r}")
+            value = int(number)
+        elif kind in (float, "float"):
+            value = float(value)
+        elif isinstance(value, list):
+            value = tuple(value)
+        kwargs[name] = value
+    return GearboxSpec(**kwargs)
+
+
+def run_row(index, row):
+    """한 행 계산. 입력 오류/설계 불가는 예외 대신 error 필드로 돌려준다."""
+    record = {"row": index}
+    if "id" in row:
+        record["id"] = row["id"]
+    try:
+        record.update(result_summary(design_gearbox(row_to_spec(row))))
+        record["error"] = None
+    except (ValueError, TypeError, ZeroDivisionError) as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def _run_chunk(chunk):
+    start, rows = chunk
+    return [run_row(start + i, row) for i, row in enumerate(rows)]
+
+
+def _chunks(rows, size):
+    start = 0
+    it = iter(rows)
+    while True:
+        block = list(islice(it, size))
+        if not block:
+            return
+        yield start, block
+        start += len(block)
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.f = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        self.f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    def close(self):
+        self.f.close()
+
+
+# Parquet 열 타입 (result_summary 의 키 + row/id/error). 오류 행은 결과 열이 비므로 모두 nullable.
+PARQUET_COLUMNS = [
+    ("row", "int64"), ("id", "string"),
+    ("actual_ratio", "float64"),
+    ("m1", "float64"), ("m2", "float64"),
+    ("a1", "float64"), ("a2", "float64"),
+    ("b1", "float64"), ("b2", "float64"),
+    ("d_input", "int64"), ("d_intermediate", "int64"), ("d_output", "int64"),
+    ("SF1", "float64"), ("SH1", "float64"), ("SF2", "float64"), ("SH2", "float64"),
+    ("eta_total", "float64"), ("P_loss", "float64"),
+    ("T_oil", "float64"),
+    ("cooling_result", "string"), ("fin_needed", "bool"),
+    ("fin_count", "int64"), ("fin_height", "float64"), ("fin_pitch", "float64"),
+    ("error", "string"),
+]
+
+
+class ParquetWriter:
+    """
+    청크마다 row group 하나씩 기록 (pyarrow 선택 의존성)
+    스키마는 PARQUET_COLUMNS 로 고정 - 첫 청크의 추론 타입에 의존하지 않는다.
+    id 열은 문자열로 저장한다 (JSONL 의 숫자 id 도 str 로 변환).
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            print("오류: Parquet 출력에는 pyarrow가 필요합니다.", file=sys.stderr)
+            print("설치: pip install pyarrow", file=sys.stderr)
+            sys.exit(1)
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.schema = pyarrow.schema(
+            [pyarrow.field(name, kind, nullable=True) for name, kind in PARQUET_COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, records):
+        records = [dict(r, id=str(r["id"])) if r.get("id") is not None else r
+                   for r in records]
+        self.writer.write_table(self.pa.Table.from_pylist(records, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def run_batch(input_path, output_path, workers=None, chunk_size=256):
+    """
+    입력 파일 전체를 계산해 output_path 에 입력 순서대로 기록한다.
+    반환: (처리 행 수, 오류 행 수, 경과 시간 [s])
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = ParquetWriter(output_path) if output_path.lower().endswith(".parquet") \
+        else JsonlWriter(output_path)
+
+    n_rows = n_errors = 0
+    t0 = time.perf_counter()
+    pool = Pool(workers, initializer=preload_factor_tables) if workers > 1 else None
+    try:
+        chunks = _chunks(read_rows(input_path), chunk_size)
+        if pool is None:
+            preload_factor_tables()
+            results = map(_run_chunk, chunks)
+        else:
+            # imap: 청크 순서 보장 + 완료되는 대로 스트리밍
+            results = pool.imap(_run_chunk, chunks)
+        for records in results:
+            writer.write(records)
+            n_rows += len(records)
+            n_errors += sum(r["error"] is not None for r in records)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        writer.close()
+    return n_rows, n_errors, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기어박스 사양 일괄 계산")
+    parser.add_argument("input", help="입력 사양 파일 (.csv / .jsonl)")
+    parser.add_argument("output", help="결과 파일 (.jsonl / .parquet)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--chunk-size", type=int, default=256,
+                        help="작업 단위 행 수 (기본: 256)")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.input):
+        print(f"오류: 입력 파일을 찾을 수 없습니다: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    n_rows, n_errors, elapsed = run_batch(args.input, args.output,
+                                          args.workers, args.chunk_size)
+    rate = n_rows / elapsed if elapsed > 0 else float("inf")
+    print(f"완료: {n_rows}건 (오류 {n_errors}건), {elapsed:.2f} s, {rate:,.0f} specs/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+AGMA 기어박스 설계 파이프라인 벤치마크
+- 단일 설계 지연시간 (design_gearbox)
+- 함수별 마이크로벤치마크: velocity_factor, shaft_diameter, 모듈 선정 ([4]),
+  강도 검증 ([7] design_stage), 열 검토 ([8] thermal_check)
+- 대량 열 평형: sweep_thermal (후보 하우징 벡터화)
+- 대량 처리량: 스칼라 루프 / 벡터화 스윕, 1k / 100k / 1M 설계
+- 결과를 JSON 으로 저장하여 커밋 간 비교 (--compare)
+
+사용법:
+    python gearbox_benchmark.py [-o bench.json] [--sizes 1000,100000,1000000]
+                                [--quick] [--compare 이전결과.json]
+
+후보 집합은 고정 시드 난수로 만들며, 네트워크 없이 실행된다.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import gearbox_design_agma as agma
+import gearbox_sweep as sweep
+
+SEED = 20260212
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+# 스칼라 루프는 이 크기까지만 (1M 스칼라는 수 분 소요)
+SCALAR_BATCH_MAX = 100_000
+
+
+def measure(fn, number, repeat):
+    """fn 을 number 회 호출하는 측정을 repeat 번 -> 1회당 시간 [s] 목록"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return times
+
+
+def summarize(times, items=1):
+    """1회 시간 목록 -> 통계 dict (items = 1회에 처리하는 설계 수)"""
+    median = statistics.median(times)
+    return {
+        "items": items,
+        "repeat": len(times),
+        "median_s": median,
+        "min_s": min(times),
+        "max_s": max(times),
+        "per_item_us": median / items * 1e6,
+        "items_per_s": items / median if median > 0 else None,
+    }
+
+
+def random_specs(n, seed=SEED):
+    """고정 시드 스칼라 사양 목록 (입력 동력/회전수/하중 계수 분산)"""
+    rng = np.random.default_rng(seed)
+    P = rng.uniform(1, 60, n)
+    n1 = rng.choice([960, 1450, 1750, 2900], n)
+    n_out = rng.choice([50, 60, 80], n)
+    Ka = rng.choice([1.25, 1.5, 1.75], n)
+    return [agma.GearboxSpec(P_kW=float(P[i]), n1=float(n1[i]),
+                             n_out=float(n_out[i]), Ka=float(Ka[i]))
+            for i in range(n)]
+
+
+def random_candidates(n, seed=SEED):
+    """고정 시드 2단 후보 배열 (벡터화 스윕 입력)"""
+    rng = np.random.default_rng(seed)
+    return dict(
+        z1_1=rng.integers(16, 25, n), z2_1=rng.integers(100, 141, n),
+        m1=rng.choice([2.5, 3.0, 3.5], n),
+        z1_2=rng.integers(17, 26, n), z2_2=rng.integers(80, 121, n),
+        m2=rng.choice([4.0, 4.5, 5.0], n),
+        helix_angle=rng.choice([15.0, 20.0], n), psi=rng.choice([10.0, 12.0], n),
+    )
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, quick=False, log=print):
+    """전체 벤치마크 실행 -> {이름: 통계}"""
+    repeat = 3 if quick else 7
+    results = {}
+
+    def record(name, stats):
+        results[name] = stats
+        log(f"  {name:<32} {stats['per_item_us']:>12.3f} us/item"
+            f"  ({stats['items_per_s']:,.0f} items/s)")
+
+    spec = agma.GearboxSpec()
+    base = agma.design_gearbox(spec)
+    s1 = base.stage1
+
+    # 단일 설계 지연시간
+    log("[단일 설계]")
+    record("design_gearbox", summarize(measure(agma.design_gearbox, 200 if quick else 2000, repeat)))
+    record("render_report", summarize(measure(lambda: agma.render_report(base),
+                                              100 if quick else 1000, repeat)))
+
+    # 함수별 마이크로벤치마크
+    log("[마이크로벤치마크]")
+    n_micro = 20_000 if quick else 200_000
+    micro = {
+        "velocity_factor": lambda: agma.velocity_factor(4.5),
+        "shaft_diameter": lambda: agma.shaft_diameter(54.6),
+        "select_module[4]": lambda: agma.select_module(base.T2, base.n2, spec.z1_2,
+                                                       spec, spec.m2_init),
+        "design_stage[7]": lambda: agma.design_stage(base.T1, spec.n1, spec.z1_1,
+                                                     spec.z2_1, s1.m, spec),
+        "thermal_check[8]": lambda: agma.thermal_check(
+            spec, base.stage1, base.stage2, (base.d_input, base.d_intermediate, base.d_output)),
+    }
+    for name, fn in micro.items():
+        number = n_micro if name in ("velocity_factor", "shaft_diameter") else n_micro // 10
+        record(name, summarize(measure(fn, number, repeat)))
+
+    # 대량 처리량
+    log("[대량 처리량]")
+    for n in sizes:
+        if n <= SCALAR_BATCH_MAX:
+            specs = random_specs(n)
+
+            def scalar_batch():
+                for s in specs:
+                    agma.design_gearbox(s)
+            record(f"batch_scalar_{n}", summarize(measure(scalar_batch, 1, 1 if n > 1000 else repeat), n))
+
+        cand = random_candidates(n)
+        record(f"batch_sweep_{n}", summarize(
+            measure(lambda: sweep.sweep_two_stage(10, 1750, **cand), 1, repeat), n))
+        auto = {k: v for k, v in cand.items() if k not in ("m1", "m2")}
+        record(f"batch_sweep_sized_{n}", summarize(
+            measure(lambda: sweep.sweep_two_stage(10, 1750, m1=None, m2=None, **auto), 1, repeat), n))
+        swept = sweep.sweep_two_stage(10, 1750, **cand)
+        record(f"batch_sweep_thermal_{n}", summarize(
+            measure(lambda: sweep.sweep_thermal(swept, 10, 1750), 1, repeat), n))
+
+    return results
+
+
+def environment():
+    """비교용 실행 환경 정보"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": SEED,
+    }
+
+
+def compare(current, baseline, log=print):
+    """이전 결과 대비 per_item 시간 비율 출력 (>1 이면 느려짐)"""
+    log(f"\n[비교] 기준: {baseline['env'].get('commit')} ({baseline['env'].get('timestamp')})")
+    for name, stats in current.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = stats["per_item_us"] / old["per_item_us"]
+        flag = "  <-- 느려짐" if ratio > 1.10 else ""
+        log(f"  {name:<32} {ratio:>6.2f}x{flag}")
+
+
+def main():
+    sys.stdout.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser(description="AGMA 기어박스 설계 벤치마크")
+    parser.add_argument("-o", "--output", default="gearbox_benchmark.json",
+                        help="결과 JSON 경로 (기본: gearbox_benchmark.json)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="대량 처리량 크기 목록 (쉼표 구분)")
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 줄여 빠르게 실행")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run_benchmarks(sizes, quick=args.quick)
+    report = {"env": environment(), "results": results}
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,210 +2,191 @@
 """
 10kW 기어박스 설계 - AGMA/ISO 준수
 2단 헬리컬 기어 감속 (35:1)
+
+라이브러리로 import 해서 사용할 수 있다 (import 시 입출력 없음).
+    from gearbox_design_agma import GearboxSpec, design_gearbox
+    result = design_gearbox(GearboxSpec(P_kW=15))
+콘솔 리포트는 render_report(result) 또는 스크립트 직접 실행으로 출력한다.
 """
+import bisect
+import functools
 import math
 import sys
-import io
+from dataclasses import dataclass
 
-# 출력 인코딩 설정
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from gearbox_thermal import (
+    COOLING_FAN, COOLING_FINS, COOLING_INSUFFICIENT, COOLING_NATURAL, ThermalResult,
+    gearbox_thermal,
+)
 
-print("=" * 70)
-print("       10kW 기어박스 설계 - AGMA 2001-D04 준수")
-print("=" * 70)
+# ISO 54 표준 모듈 [mm] - 1계열(우선)과 1+2계열
+ISO54_SERIES_1 = (1, 1.25, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10, 12, 16, 20, 25, 32, 40, 50)
+ISO54_MODULES = (1, 1.125, 1.25, 1.375, 1.5, 1.75, 2, 2.25, 2.5, 2.75, 3, 3.5, 4, 4.5,
+                 5, 5.5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 18, 20, 22, 25, 28, 32, 36,
+                 40, 45, 50)
 
-# ============================================================
-# 1. 기본 입력 사양
-# ============================================================
-P_kW = 10           # 동력 [kW]
-P = P_kW * 1000     # 동력 [W]
-n1 = 1750           # 입력 회전수 [RPM]
-n_out = 50          # 출력 회전수 [RPM]
-total_ratio = n1 / n_out  # 총 감속비 = 35
-
-# 기어 재질: SCM420H (침탄 경화강)
-sigma_Fb = 400      # 허용 굽힘 응력 [MPa]
-sigma_Hb = 1400     # 허용 접촉 응력 [MPa]
-E = 206000          # 탄성계수 [MPa]
-poisson = 0.3       # 포아송비
-
-# 헬리컬 기어 파라미터
-helix_angle = 20    # 비틀림각 [도]
-pressure_angle = 20 # 압력각 [도]
-
-print(f"\n[1] 기본 사양")
-print("-" * 50)
-print(f"  입력 동력      : {P_kW:.1f} kW")
-print(f"  입력 회전수    : {n1} RPM")
-print(f"  출력 회전수    : {n_out} RPM")
-print(f"  총 감속비      : {total_ratio:.1f}:1")
-
-# ============================================================
-# 2. 감속 단계 구성 (2단 감속)
-# ============================================================
-print(f"\n[2] 감속 단계 구성 (2단 헬리컬)")
-print("-" * 50)
+# 냉각 판정 문구 (gearbox_thermal.COOLING_* 코드 순)
+COOLING_RESULTS = (
+    "자연 대류로 충분 -> 방열 핀 불필요",
+    "냉각 팬 권장 (방열 핀 선택사항)",
+    "방열 핀 + 냉각 팬 필요",
+    "방열 핀 + 냉각 팬으로 부족 -> 오일 쿨러 필요",
+)
 
-# 1단 기어
-z1_1 = 18           # 1단 피니언 잇수
-z2_1 = 126          # 1단 기어 잇수
-ratio_1 = z2_1 / z1_1
+# 기하계수 캐시 크기 (잇수 8~300 x 비틀림각 격자 수십 개를 담는 정도)
+FACTOR_CACHE_SIZE = 16384
 
-# 2단 기어
-z1_2 = 20           # 2단 피니언 잇수
-z2_2 = 100          # 2단 기어 잇수
-ratio_2 = z2_2 / z1_2
 
-actual_ratio = ratio_1 * ratio_2
+class ModuleSizingError(ValueError):
+    """모듈 계열 안에 굽힘 강도를 만족하는 모듈이 없음"""
 
-print(f"  1단: 피니언 {z1_1}T -> 기어 {z2_1}T (감속비 {ratio_1:.2f}:1)")
-print(f"  2단: 피니언 {z1_2}T -> 기어 {z2_2}T (감속비 {ratio_2:.2f}:1)")
-print(f"  실제 총 감속비: {actual_ratio:.1f}:1")
 
 # ============================================================
-# 3. 토크 계산 (단위 주의: kW 사용)
+# 1. 기본 입력 사양
 # ============================================================
-print(f"\n[3] 각 축 토크 계산")
-print("-" * 50)
-
-# T [N.m] = (P[kW] * 9549) / n[RPM]
-T1 = (P_kW * 9549) / n1                 # 입력축 토크 [N.m]
-n2 = n1 / ratio_1                       # 중간축 회전수
-T2 = T1 * ratio_1 * 0.98                # 중간축 토크 (효율 98%)
-n3 = n2 / ratio_2                       # 출력축 회전수
-T3 = T2 * ratio_2 * 0.98                # 출력축 토크 (효율 98%)
+@dataclass
+class GearboxSpec:
+    """기어박스 설계 입력 사양 (기본값 = 10kW, 1750 -> 50 RPM 설계)"""
+    P_kW: float = 10            # 동력 [kW]
+    n1: float = 1750            # 입력 회전수 [RPM]
+    n_out: float = 50           # 출력 회전수 [RPM]
+
+    # 기어 재질: SCM420H (침탄 경화강)
+    sigma_Fb: float = 400       # 허용 굽힘 응력 [MPa]
+    sigma_Hb: float = 1400      # 허용 접촉 응력 [MPa]
+    E: float = 206000           # 탄성계수 [MPa]
+    poisson: float = 0.3        # 포아송비
+
+    # 헬리컬 기어 파라미터
+    helix_angle: float = 20     # 비틀림각 [도]
+    pressure_angle: float = 20  # 압력각 [도]
+
+    # 감속 단계 구성 (2단 감속)
+    z1_1: int = 18              # 1단 피니언 잇수
+    z2_1: int = 126             # 1단 기어 잇수
+    z1_2: int = 20              # 2단 피니언 잇수
+    z2_2: int = 100             # 2단 기어 잇수
+
+    # 하중 계수 및 속도 계수
+    Ka: float = 1.5             # 하중 계수 (중간 충격)
+    Ks: float = 1.0             # 크기 계수
+    Km: float = 1.2             # 하중 분포 계수
+    KB: float = 1.0             # 림 두께 계수
+    psi: float = 10             # 폭/모듈 비
+    m1_init: float = 2.0        # 1단 최소 모듈 [mm]
+    m2_init: float = 2.5        # 2단 최소 모듈 [mm]
+    m_max: float = 25.0         # 최대 모듈 [mm]
+    module_series: tuple = None # 모듈 계열 (None = 0.5 mm 간격, 예: ISO54_MODULES)
+
+    # 축 재질: S45C
+    tau_allow: float = 55       # 허용 전단 응력 [MPa]
+    Kt: float = 2.0             # 응력 집중 계수
+    Cm: float = 1.5             # 굽힘 모멘트 계수
+    Ct: float = 1.0             # 비틀림 모멘트 계수
+
+    Ze: float = 191             # 탄성 계수 (강-강) [MPa^0.5]
+
+    # 효율 및 냉각
+    eta_gear: float = 0.98      # 기어 1쌍당 효율
+    eta_bearing: float = 0.99   # 베어링 1개당 효율 (단 수 분할 탐색의 근사 효율용)
+    n_bearings: int = 6         # 3축 x 2개
+    oil_nu40: float = 220       # 윤활유 동점도 @40C [mm2/s] (ISO VG 220)
+    oil_nu100: float = 19.4     # 윤활유 동점도 @100C [mm2/s]
+    h_natural: float = 10       # [W/m2.K] (자연 대류)
+    h_forced: float = 25        # [W/m2.K] (강제 대류)
+    T_ambient: float = 25       # 주변 온도 [C]
+    T_max_oil: float = 80       # 최대 허용 오일 온도 [C]
+
+
+@dataclass(slots=True)
+class StageResult:
+    """감속 1단의 모듈/치수/강도 계산 결과"""
+    z_pinion: int
+    z_gear: int
+    ratio: float
+    n: float                    # 피니언 회전수 [RPM]
+    T: float                    # 피니언 토크 [N.m]
+    m: float                    # 모듈 [mm]
+    Y: float                    # Lewis 형상계수
+    V: float                    # 피치선 속도 [m/s]
+    Kv: float                   # 속도 계수
+    d_pinion: float             # 피니언 피치원 직경 [mm]
+    d_gear: float               # 기어 피치원 직경 [mm]
+    a: float                    # 중심 거리 [mm]
+    b: float                    # 기어 폭 [mm]
+    Wt: float                   # 접선력 [N]
+    J: float
+    I: float
+    sigma_F: float              # 굽힘 응력 [MPa]
+    SF: float                   # 굽힘 안전율
+    sigma_H: float              # 접촉 응력 [MPa]
+    SH: float                   # 면압 안전율
+
+
+@dataclass(slots=True)
+class GearboxResult:
+    """design_gearbox() 의 전체 계산 결과 ([1]~[8]절)"""
+    spec: GearboxSpec
+    total_ratio: float
+    actual_ratio: float
+    T1: float
+    n2: float
+    T2: float
+    n3: float
+    T3: float
+    stage1: StageResult
+    stage2: StageResult
+    d_input: float
+    d_intermediate: float
+    d_output: float
+    eta_total: float
+    P_loss: float               # 열손실 [W] (평형 오일 온도 기준)
+    L_housing: float            # 하우징 길이 [m]
+    W_housing: float            # 하우징 폭 [m]
+    H_housing: float            # 하우징 높이 [m]
+    A_housing: float            # 방열 면적 [m2]
+    Q_natural: float            # 자연 대류 방열량 [W]
+    Q_forced: float             # 강제 대류 방열량 [W]
+    cooling_result: str
+    fin_needed: bool
+    thermal: ThermalResult      # 평형 오일 온도, 손실 내역, 방열 핀
 
-print(f"  입력축 (1축): {n1:.0f} RPM, {T1:.1f} N.m")
-print(f"  중간축 (2축): {n2:.0f} RPM, {T2:.1f} N.m")
-print(f"  출력축 (3축): {n3:.0f} RPM, {T3:.1f} N.m")
 
 # ============================================================
-# 4. 모듈 결정 (AGMA 기반)
+# AGMA / ASME 계산식
 # ============================================================
-print(f"\n[4] 모듈(Module) 결정 - AGMA 2001-D04")
-print("-" * 50)
+@functools.lru_cache(maxsize=256)
+def _helix_cos3(helix_deg):
+    """cos^3(비틀림각) - 등가 잇수 z / cos^3(beta) 용"""
+    return math.cos(math.radians(helix_deg)) ** 3
+
+
+@functools.lru_cache(maxsize=256)
+def _pressure_cos_sin(pressure_angle):
+    """cos(phi) * sin(phi) - 기하계수 I 용"""
+    phi = math.radians(pressure_angle)
+    return math.cos(phi) * math.sin(phi)
 
-# 하중 계수 및 속도 계수
-Ka = 1.5            # 하중 계수 (중간 충격)
-Ks = 1.0            # 크기 계수
-Km = 1.2            # 하중 분포 계수
-KB = 1.0            # 림 두께 계수
 
-# Lewis 형상 계수 (등가 잇수 기준)
+@functools.lru_cache(maxsize=FACTOR_CACHE_SIZE)
 def lewis_factor(z, helix_deg):
     """등가 잇수에 대한 Lewis 형상 계수"""
-    z_eq = z / (math.cos(math.radians(helix_deg)) ** 3)
+    z_eq = z / _helix_cos3(helix_deg)
     Y = 0.154 - 0.912 / z_eq
     return max(Y, 0.28)
 
-# 피치선 속도 계산 함수
+
 def pitch_velocity(d, n):
     """피치선 속도 [m/s], d: mm, n: RPM"""
     return (math.pi * d * n) / 60000
 
-# 속도 계수 (AGMA)
+
 def velocity_factor(V):
     """AGMA 속도 계수 Kv (Quality 6 기준)"""
     return (6.1 + V) / 6.1
 
-cos_beta = math.cos(math.radians(helix_angle))
-psi = 10            # 폭/모듈 비
-
-# 1단 기어 모듈 결정
-Y1 = lewis_factor(z1_1, helix_angle)
-m1 = 2.0            # 초기값 [mm]
-
-for _ in range(20):
-    d1_1 = m1 * z1_1 / cos_beta
-    V1 = pitch_velocity(d1_1, n1)
-    Kv1 = velocity_factor(V1)
-    b1 = psi * m1
-    Wt1 = (2 * T1 * 1000) / d1_1  # 접선력 [N], T1을 N.mm로 변환
-    sigma_calc = (Wt1 * Ka * Kv1 * Ks * Km * KB) / (b1 * m1 * Y1)
-    if sigma_calc > sigma_Fb:
-        m1 += 0.5
-    else:
-        break
-
-m1 = math.ceil(m1 * 2) / 2  # 0.5 단위로 올림
-d1_1 = m1 * z1_1 / cos_beta
-V1 = pitch_velocity(d1_1, n1)
-Kv1 = velocity_factor(V1)
-
-print(f"  1단 기어 모듈: m = {m1:.1f} mm")
-print(f"    - 피치선 속도: V = {V1:.2f} m/s")
-print(f"    - 속도 계수: Kv = {Kv1:.3f}")
-print(f"    - Lewis 형상계수: Y = {Y1:.3f}")
-
-# 2단 기어 모듈 결정
-Y2 = lewis_factor(z1_2, helix_angle)
-m2 = 2.5            # 초기값 [mm]
-
-for _ in range(20):
-    d1_2 = m2 * z1_2 / cos_beta
-    V2 = pitch_velocity(d1_2, n2)
-    Kv2 = velocity_factor(V2)
-    b2 = psi * m2
-    Wt2 = (2 * T2 * 1000) / d1_2
-    sigma_calc = (Wt2 * Ka * Kv2 * Ks * Km * KB) / (b2 * m2 * Y2)
-    if sigma_calc > sigma_Fb:
-        m2 += 0.5
-    else:
-        break
-
-m2 = math.ceil(m2 * 2) / 2
-d1_2 = m2 * z1_2 / cos_beta
-V2 = pitch_velocity(d1_2, n2)
-Kv2 = velocity_factor(V2)
 
-print(f"\n  2단 기어 모듈: m = {m2:.1f} mm")
-print(f"    - 피치선 속도: V = {V2:.2f} m/s")
-print(f"    - 속도 계수: Kv = {Kv2:.3f}")
-print(f"    - Lewis 형상계수: Y = {Y2:.3f}")
-
-# ============================================================
-# 5. 기어 치수 계산
-# ============================================================
-print(f"\n[5] 기어 치수 계산")
-print("-" * 50)
-
-# 1단 기어
-d1_pinion = m1 * z1_1 / cos_beta    # 피니언 피치원 직경
-d1_gear = m1 * z2_1 / cos_beta      # 기어 피치원 직경
-a1 = (d1_pinion + d1_gear) / 2      # 중심 거리
-b1 = psi * m1                        # 기어 폭
-
-# 2단 기어
-d2_pinion = m2 * z1_2 / cos_beta
-d2_gear = m2 * z2_2 / cos_beta
-a2 = (d2_pinion + d2_gear) / 2
-b2 = psi * m2
-
-print(f"\n  [1단 기어] (m = {m1:.1f} mm)")
-print(f"    피니언: z={z1_1}T, d={d1_pinion:.1f}mm")
-print(f"    기  어: z={z2_1}T, d={d1_gear:.1f}mm")
-print(f"    중심거리: a = {a1:.1f} mm")
-print(f"    기어 폭: b = {b1:.1f} mm")
-
-print(f"\n  [2단 기어] (m = {m2:.1f} mm)")
-print(f"    피니언: z={z1_2}T, d={d2_pinion:.1f}mm")
-print(f"    기  어: z={z2_2}T, d={d2_gear:.1f}mm")
-print(f"    중심거리: a = {a2:.1f} mm")
-print(f"    기어 폭: b = {b2:.1f} mm")
-
-# ============================================================
-# 6. 축 직경 계산 (ASME 기준)
-# ============================================================
-print(f"\n[6] 축 직경 계산 - ASME 기준")
-print("-" * 50)
-
-# 축 재질: S45C
-tau_allow = 55      # 허용 전단 응력 [MPa]
-Kt = 2.0            # 응력 집중 계수
-Cm = 1.5            # 굽힘 모멘트 계수
-Ct = 1.0            # 비틀림 모멘트 계수
-
-def shaft_diameter(T, tau_allow=55, Kt=2.0):
+def shaft_diameter(T, tau_allow=55, Kt=2.0, Cm=1.5, Ct=1.0):
     """
     ASME 공식에 의한 축 직경 계산
     T: 토크 [N.m]
@@ -218,167 +199,367 @@ def shaft_diameter(T, tau_allow=55, Kt=2.0):
     d = d_cubed ** (1/3)
     return math.ceil(d / 5) * 5  # 5mm 단위로 올림
 
-d_input = shaft_diameter(T1)
-d_intermediate = shaft_diameter(T2)
-d_output = shaft_diameter(T3)
-
-print(f"  입력축 (1축) 직경:  dia {d_input:.0f} mm  (토크 {T1:.1f} N.m)")
-print(f"  중간축 (2축) 직경:  dia {d_intermediate:.0f} mm  (토크 {T2:.1f} N.m)")
-print(f"  출력축 (3축) 직경:  dia {d_output:.0f} mm  (토크 {T3:.1f} N.m)")
 
-# ============================================================
-# 7. 강도 검증 (AGMA)
-# ============================================================
-print(f"\n[7] 강도 검증 - AGMA 2001-D04")
-print("-" * 50)
-
-# 탄성 계수 (강-강)
-Ze = 191            # [MPa^0.5]
-
-# AGMA 기하계수
+@functools.lru_cache(maxsize=FACTOR_CACHE_SIZE)
 def agma_J_factor(z, helix_deg):
     """굽힘 강도용 기하계수 J"""
-    z_eq = z / (math.cos(math.radians(helix_deg)) ** 3)
+    z_eq = z / _helix_cos3(helix_deg)
     J = 0.45 + 0.003 * z_eq
     return min(J, 0.55)
 
+
+@functools.lru_cache(maxsize=FACTOR_CACHE_SIZE)
 def agma_I_factor(z1, z2, pressure_angle):
     """면압 강도용 기하계수 I"""
-    phi = math.radians(pressure_angle)
     mg = z2 / z1
-    I = (math.cos(phi) * math.sin(phi)) / (2 * (1 + 1/mg))
+    I = _pressure_cos_sin(pressure_angle) / (2 * (1 + 1/mg))
     return I
 
-# 1단 기어 강도 검증
-J1 = agma_J_factor(z1_1, helix_angle)
-I1 = agma_I_factor(z1_1, z2_1, pressure_angle)
-b1 = psi * m1
-Wt1 = (2 * T1 * 1000) / d1_pinion
-
-# 굽힘 응력
-sigma_F1 = (Wt1 * Ka * Kv1 * Ks * Km * KB) / (b1 * m1 * J1)
-SF1 = sigma_Fb / sigma_F1  # 굽힘 안전율
-
-# 접촉 응력
-sigma_H1 = Ze * math.sqrt((Wt1 * Ka * Kv1 * Ks * Km) / (d1_pinion * b1 * I1))
-SH1 = sigma_Hb / sigma_H1  # 면압 안전율
-
-print(f"\n  [1단 기어 강도]")
-print(f"    접선력 Wt = {Wt1:.1f} N")
-print(f"    굽힘 응력 sigmaF = {sigma_F1:.1f} MPa (허용: {sigma_Fb} MPa)")
-print(f"    굽힘 안전율 SF = {SF1:.2f} {'[OK]' if SF1 >= 1.5 else '[NG]'}")
-print(f"    접촉 응력 sigmaH = {sigma_H1:.1f} MPa (허용: {sigma_Hb} MPa)")
-print(f"    면압 안전율 SH = {SH1:.2f} {'[OK]' if SH1 >= 1.2 else '[NG]'}")
-
-# 2단 기어 강도 검증
-J2 = agma_J_factor(z1_2, helix_angle)
-I2 = agma_I_factor(z1_2, z2_2, pressure_angle)
-b2 = psi * m2
-Wt2 = (2 * T2 * 1000) / d2_pinion
-
-sigma_F2 = (Wt2 * Ka * Kv2 * Ks * Km * KB) / (b2 * m2 * J2)
-SF2 = sigma_Fb / sigma_F2
-
-sigma_H2 = Ze * math.sqrt((Wt2 * Ka * Kv2 * Ks * Km) / (d2_pinion * b2 * I2))
-SH2 = sigma_Hb / sigma_H2
-
-print(f"\n  [2단 기어 강도]")
-print(f"    접선력 Wt = {Wt2:.1f} N")
-print(f"    굽힘 응력 sigmaF = {sigma_F2:.1f} MPa (허용: {sigma_Fb} MPa)")
-print(f"    굽힘 안전율 SF = {SF2:.2f} {'[OK]' if SF2 >= 1.5 else '[NG]'}")
-print(f"    접촉 응력 sigmaH = {sigma_H2:.1f} MPa (허용: {sigma_Hb} MPa)")
-print(f"    면압 안전율 SH = {SH2:.2f} {'[OK]' if SH2 >= 1.2 else '[NG]'}")
+
+def preload_factor_tables(z_range=range(8, 301), helix_angles=range(0, 46, 5),
+                          pressure_angles=(14.5, 20, 22.5, 25)):
+    """
+    기하계수 캐시를 미리 채운다 (서비스 시작 시 1회 호출).
+    Lewis Y, J 는 (잇수, 비틀림각) 격자 전체, I 는 압력각 삼각함수만 채운다.
+    캐시는 FACTOR_CACHE_SIZE 로 제한되며 넘치면 LRU 로 밀려난다.
+    """
+    for helix_deg in helix_angles:
+        for z in z_range:
+            lewis_factor(z, helix_deg)
+            agma_J_factor(z, helix_deg)
+    for pressure_angle in pressure_angles:
+        _pressure_cos_sin(pressure_angle)
+
+
+def factor_cache_info():
+    """기하계수 캐시 적중 통계 {함수명: CacheInfo}"""
+    return {f.__name__: f.cache_info()
+            for f in (lewis_factor, agma_J_factor, agma_I_factor)}
+
 
 # ============================================================
-# 8. 열 방출 및 냉각 검토
+# 단계별 계산
 # ============================================================
-print(f"\n[8] 열 방출 및 냉각 검토")
-print("-" * 50)
-
-# 효율 및 열손실 계산
-eta_gear = 0.98     # 기어 1쌍당 효율
-eta_bearing = 0.99  # 베어링 1개당 효율
-n_gear_pairs = 2
-n_bearings = 6      # 3축 x 2개
-
-eta_total = (eta_gear ** n_gear_pairs) * (eta_bearing ** n_bearings)
-P_loss = P * (1 - eta_total)  # 열손실 [W]
-
-print(f"  총 전달 효율: eta = {eta_total*100:.1f}%")
-print(f"  열 손실: Q = {P_loss:.0f} W")
-
-# 하우징 방열 면적 추정
-L_housing = (a1 + a2) * 1.3 / 1000  # 길이 [m]
-W_housing = max(d1_gear, d2_gear) * 0.6 / 1000  # 폭 [m]
-H_housing = max(d1_gear, d2_gear) * 0.5 / 1000  # 높이 [m]
-
-A_housing = 2 * (L_housing * W_housing + W_housing * H_housing + H_housing * L_housing)
-
-# 열전달 계수
-h_natural = 10      # [W/m2.K] (자연 대류)
-h_forced = 25       # [W/m2.K] (강제 대류)
-T_ambient = 25      # 주변 온도 [C]
-T_max_oil = 80      # 최대 허용 오일 온도 [C]
-dT_allow = T_max_oil - T_ambient
-
-# 방열량 계산
-Q_natural = h_natural * A_housing * dT_allow
-Q_forced = h_forced * A_housing * dT_allow
-
-print(f"\n  하우징 크기 (추정):")
-print(f"    L x W x H = {L_housing*1000:.0f} x {W_housing*1000:.0f} x {H_housing*1000:.0f} mm")
-print(f"    방열 면적: A = {A_housing:.3f} m2")
-print(f"\n  방열 능력 비교:")
-print(f"    자연 대류: {Q_natural:.0f} W")
-print(f"    강제 대류: {Q_forced:.0f} W")
-print(f"    필요 방열량: {P_loss:.0f} W")
-
-if P_loss <= Q_natural:
-    cooling_result = "자연 대류로 충분 -> 방열 핀 불필요"
-    fin_needed = False
-elif P_loss <= Q_forced:
-    cooling_result = "냉각 팬 권장 (방열 핀 선택사항)"
-    fin_needed = False
-else:
-    cooling_result = "방열 핀 + 냉각 팬 필요"
-    fin_needed = True
-
-print(f"\n  >> 판정: {cooling_result}")
+def min_module_lewis(T, n, z, spec):
+    """
+    Lewis 굽힘 부등식을 만족하는 최소 연속 모듈 [mm] (해석해)
+
+    sigma(m) = A * (6.1 + c*m) / m^3 <= sigma_Fb  (Kv = (6.1 + V)/6.1, V = c*m)
+    -> sigma_Fb*m^3 - A*c*m - 6.1*A = 0 의 유일한 양의 근
+    """
+    cos_beta = math.cos(math.radians(spec.helix_angle))
+    Y = lewis_factor(z, spec.helix_angle)
+    K = spec.Ka * spec.Ks * spec.Km * spec.KB
+    A = (2 * T * 1000 * cos_beta * K) / (6.1 * z * spec.psi * Y)
+    c = (math.pi * z * n) / (60000 * cos_beta)
+
+    # 감소 3차식 m^3 + p*m + q = 0 (p, q < 0 이므로 양의 근은 하나)
+    p = -A * c / spec.sigma_Fb
+    q = -6.1 * A / spec.sigma_Fb
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+    if disc >= 0:
+        r = math.sqrt(disc)
+        return math.copysign(abs(-q / 2 + r) ** (1/3), -q / 2 + r) \
+            + math.copysign(abs(-q / 2 - r) ** (1/3), -q / 2 - r)
+    # 세 실근 중 가장 큰 근
+    rho = 2 * math.sqrt(-p / 3)
+    return rho * math.cos(math.acos(3 * q / (2 * p) * math.sqrt(-3 / p)) / 3)
+
+
+def module_candidates(spec, m_min):
+    """m_min 이상 m_max 이하의 모듈 계열 (오름차순)"""
+    if spec.module_series is None:
+        m0 = math.ceil(m_min * 2) / 2
+        return [m0 + 0.5 * k for k in range(int((spec.m_max - m0) * 2) + 1)]
+    return sorted(m for m in spec.module_series if m_min <= m <= spec.m_max)
+
+
+def bending_stress(T, n, z, m, spec):
+    """[4] 모듈 m 에서의 Lewis 굽힘 응력 [MPa]"""
+    cos_beta = math.cos(math.radians(spec.helix_angle))
+    d = m * z / cos_beta
+    Kv = velocity_factor(pitch_velocity(d, n))
+    b = spec.psi * m
+    Wt = (2 * T * 1000) / d  # 접선력 [N], T를 N.mm로 변환
+    return (Wt * spec.Ka * Kv * spec.Ks * spec.Km * spec.KB) / (b * m * lewis_factor(z, spec.helix_angle))
+
+
+def select_module(T, n, z, spec, m_init):
+    """
+    [4] 굽힘 강도를 만족하는 모듈 계열 중 최소 모듈을 선정
+
+    해석해로 최소 연속 모듈을 구한 뒤 계열에서 이분 탐색하고, 실제 응력으로 확인한다.
+    만족하는 모듈이 계열에 없으면 ModuleSizingError.
+    """
+    series = module_candidates(spec, m_init)
+    m_req = min_module_lewis(T, n, z, spec)
+    i = bisect.bisect_left(series, m_req * (1 - 1e-9))
+
+    # 반올림 오차로 경계 모듈이 근소하게 초과하면 다음 계열로
+    while i < len(series) and bending_stress(T, n, z, series[i], spec) > spec.sigma_Fb:
+        i += 1
+    if i == len(series):
+        raise ModuleSizingError(
+            f"z={z}, T={T:.1f} N.m: 필요 모듈 {m_req:.2f} mm 이 "
+            f"허용 범위 [{m_init}, {spec.m_max}] mm 를 벗어남")
+    return series[i]
+
+
+def design_stage(T, n, z_pinion, z_gear, m, spec):
+    """[4], [5], [7] 결정된 모듈로 한 단의 치수와 AGMA 강도를 계산"""
+    cos_beta = math.cos(math.radians(spec.helix_angle))
+    d_pinion = m * z_pinion / cos_beta    # 피니언 피치원 직경
+    d_gear = m * z_gear / cos_beta        # 기어 피치원 직경
+    V = pitch_velocity(d_pinion, n)
+    Kv = velocity_factor(V)
+    b = spec.psi * m                      # 기어 폭
+    Wt = (2 * T * 1000) / d_pinion
+
+    J = agma_J_factor(z_pinion, spec.helix_angle)
+    I = agma_I_factor(z_pinion, z_gear, spec.pressure_angle)
+
+    # 굽힘 응력
+    sigma_F = (Wt * spec.Ka * Kv * spec.Ks * spec.Km * spec.KB) / (b * m * J)
+    # 접촉 응력
+    sigma_H = spec.Ze * math.sqrt((Wt * spec.Ka * Kv * spec.Ks * spec.Km) / (d_pinion * b * I))
+
+    return StageResult(
+        z_pinion=z_pinion, z_gear=z_gear, ratio=z_gear / z_pinion,
+        n=n, T=T, m=m, Y=lewis_factor(z_pinion, spec.helix_angle), V=V, Kv=Kv,
+        d_pinion=d_pinion, d_gear=d_gear, a=(d_pinion + d_gear) / 2, b=b,
+        Wt=Wt, J=J, I=I,
+        sigma_F=sigma_F, SF=spec.sigma_Fb / sigma_F,
+        sigma_H=sigma_H, SH=spec.sigma_Hb / sigma_H,
+    )
+
+
+def thermal_check(spec, stage1, stage2, d_shafts):
+    """
+    [8] 효율, 열손실, 평형 오일 온도, 냉각 방식 (GearboxResult 의 [8]절 필드 dict)
+    d_shafts: (입력축, 중간축, 출력축) 직경 [mm]
+    """
+    # 하우징 방열 면적 추정
+    d_gear_max = max(stage1.d_gear, stage2.d_gear)
+    L_housing = (stage1.a + stage2.a) * 1.3 / 1000
+    W_housing = d_gear_max * 0.6 / 1000
+    H_housing = d_gear_max * 0.5 / 1000
+    A_housing = 2 * (L_housing * W_housing + W_housing * H_housing + H_housing * L_housing)
+
+    # 허용 오일 온도에서의 방열 능력 (참고값)
+    dT_allow = spec.T_max_oil - spec.T_ambient
+    Q_natural = spec.h_natural * A_housing * dT_allow
+    Q_forced = spec.h_forced * A_housing * dT_allow
+
+    n2 = stage1.n / stage1.ratio
+    shafts = list(zip((stage1.n, n2, n2 / stage2.ratio), d_shafts))
+    thermal = gearbox_thermal(spec, stage1, stage2, shafts, A_housing, L_housing, H_housing)
+    P_loss = thermal.P_mesh + thermal.P_churn + thermal.P_bearing   # 열손실 [W]
+    eta_total = 1 - P_loss / (spec.P_kW * 1000)
+
+    if thermal.T_oil_natural <= spec.T_max_oil:
+        cooling = COOLING_NATURAL
+    elif thermal.T_oil_forced <= spec.T_max_oil:
+        cooling = COOLING_FAN
+    else:
+        cooling = COOLING_FINS if thermal.fin_ok else COOLING_INSUFFICIENT
+
+    return dict(
+        eta_total=eta_total, P_loss=P_loss,
+        L_housing=L_housing, W_housing=W_housing, H_housing=H_housing,
+        A_housing=A_housing, Q_natural=Q_natural, Q_forced=Q_forced,
+        cooling_result=COOLING_RESULTS[cooling], fin_needed=cooling >= COOLING_FINS,
+        thermal=thermal,
+    )
+
+
+def design_gearbox(spec=None):
+    """[1]~[8]절 전체 설계 계산을 입출력 없이 수행하고 GearboxResult 를 반환"""
+    if spec is None:
+        spec = GearboxSpec()
+
+    # [1], [2] 감속비
+    total_ratio = spec.n1 / spec.n_out
+    ratio_1 = spec.z2_1 / spec.z1_1
+    ratio_2 = spec.z2_2 / spec.z1_2
+
+    # [3] 토크 계산: T [N.m] = (P[kW] * 9549) / n[RPM]
+    T1 = (spec.P_kW * 9549) / spec.n1
+    n2 = spec.n1 / ratio_1
+    T2 = T1 * ratio_1 * spec.eta_gear
+    n3 = n2 / ratio_2
+    T3 = T2 * ratio_2 * spec.eta_gear
+
+    # [4], [5], [7] 모듈 결정, 치수, 강도 검증
+    m1 = select_module(T1, spec.n1, spec.z1_1, spec, spec.m1_init)
+    m2 = select_module(T2, n2, spec.z1_2, spec, spec.m2_init)
+    stage1 = design_stage(T1, spec.n1, spec.z1_1, spec.z2_1, m1, spec)
+    stage2 = design_stage(T2, n2, spec.z1_2, spec.z2_2, m2, spec)
+
+    # [6] 축 직경
+    shaft = dict(tau_allow=spec.tau_allow, Kt=spec.Kt, Cm=spec.Cm, Ct=spec.Ct)
+    d_input = shaft_diameter(T1, **shaft)
+    d_intermediate = shaft_diameter(T2, **shaft)
+    d_output = shaft_diameter(T3, **shaft)
+
+    # [8] 열 방출 및 냉각
+    thermal = thermal_check(spec, stage1, stage2, (d_input, d_intermediate, d_output))
+
+    return GearboxResult(
+        spec=spec, total_ratio=total_ratio, actual_ratio=ratio_1 * ratio_2,
+        T1=T1, n2=n2, T2=T2, n3=n3, T3=T3,
+        stage1=stage1, stage2=stage2,
+        d_input=d_input, d_intermediate=d_intermediate, d_output=d_output,
+        **thermal,
+    )
+
+
+def result_summary(r):
+    """GearboxResult 의 주요 설계값을 평탄한 dict 로 (배치 출력/회귀 비교용)"""
+    s1, s2 = r.stage1, r.stage2
+    return {
+        "actual_ratio": r.actual_ratio,
+        "m1": s1.m, "m2": s2.m,
+        "a1": s1.a, "a2": s2.a,
+        "b1": s1.b, "b2": s2.b,
+        "d_input": r.d_input, "d_intermediate": r.d_intermediate, "d_output": r.d_output,
+        "SF1": s1.SF, "SH1": s1.SH, "SF2": s2.SF, "SH2": s2.SH,
+        "eta_total": r.eta_total, "P_loss": r.P_loss,
+        "T_oil": r.thermal.T_oil,
+        "cooling_result": r.cooling_result, "fin_needed": r.fin_needed,
+        "fin_count": r.thermal.fin_count, "fin_height": r.thermal.fin_height,
+        "fin_pitch": r.thermal.fin_pitch,
+    }
+
 
 # ============================================================
-# 9. 설계 결과 요약
+# 콘솔 리포트
 # ============================================================
-print(f"\n{'='*70}")
-print(f"                    [설계 결과 요약]")
-print(f"{'='*70}")
-
-print(f"""
+def render_report(r):
+    """GearboxResult 를 콘솔 설계 리포트 문자열로 변환"""
+    spec, s1, s2, th = r.spec, r.stage1, r.stage2, r.thermal
+    out = []
+    p = out.append
+
+    p("=" * 70)
+    p("       10kW 기어박스 설계 - AGMA 2001-D04 준수")
+    p("=" * 70)
+
+    p(f"\n[1] 기본 사양")
+    p("-" * 50)
+    p(f"  입력 동력      : {spec.P_kW:.1f} kW")
+    p(f"  입력 회전수    : {spec.n1} RPM")
+    p(f"  출력 회전수    : {spec.n_out} RPM")
+    p(f"  총 감속비      : {r.total_ratio:.1f}:1")
+
+    p(f"\n[2] 감속 단계 구성 (2단 헬리컬)")
+    p("-" * 50)
+    p(f"  1단: 피니언 {s1.z_pinion}T -> 기어 {s1.z_gear}T (감속비 {s1.ratio:.2f}:1)")
+    p(f"  2단: 피니언 {s2.z_pinion}T -> 기어 {s2.z_gear}T (감속비 {s2.ratio:.2f}:1)")
+    p(f"  실제 총 감속비: {r.actual_ratio:.1f}:1")
+
+    p(f"\n[3] 각 축 토크 계산")
+    p("-" * 50)
+    p(f"  입력축 (1축): {spec.n1:.0f} RPM, {r.T1:.1f} N.m")
+    p(f"  중간축 (2축): {r.n2:.0f} RPM, {r.T2:.1f} N.m")
+    p(f"  출력축 (3축): {r.n3:.0f} RPM, {r.T3:.1f} N.m")
+
+    p(f"\n[4] 모듈(Module) 결정 - AGMA 2001-D04")
+    p("-" * 50)
+    p(f"  1단 기어 모듈: m = {s1.m:.1f} mm")
+    p(f"    - 피치선 속도: V = {s1.V:.2f} m/s")
+    p(f"    - 속도 계수: Kv = {s1.Kv:.3f}")
+    p(f"    - Lewis 형상계수: Y = {s1.Y:.3f}")
+    p(f"\n  2단 기어 모듈: m = {s2.m:.1f} mm")
+    p(f"    - 피치선 속도: V = {s2.V:.2f} m/s")
+    p(f"    - 속도 계수: Kv = {s2.Kv:.3f}")
+    p(f"    - Lewis 형상계수: Y = {s2.Y:.3f}")
+
+    p(f"\n[5] 기어 치수 계산")
+    p("-" * 50)
+    for i, s in enumerate((s1, s2), start=1):
+        p(f"\n  [{i}단 기어] (m = {s.m:.1f} mm)")
+        p(f"    피니언: z={s.z_pinion}T, d={s.d_pinion:.1f}mm")
+        p(f"    기  어: z={s.z_gear}T, d={s.d_gear:.1f}mm")
+        p(f"    중심거리: a = {s.a:.1f} mm")
+        p(f"    기어 폭: b = {s.b:.1f} mm")
+
+    p(f"\n[6] 축 직경 계산 - ASME 기준")
+    p("-" * 50)
+    p(f"  입력축 (1축) 직경:  dia {r.d_input:.0f} mm  (토크 {r.T1:.1f} N.m)")
+    p(f"  중간축 (2축) 직경:  dia {r.d_intermediate:.0f} mm  (토크 {r.T2:.1f} N.m)")
+    p(f"  출력축 (3축) 직경:  dia {r.d_output:.0f} mm  (토크 {r.T3:.1f} N.m)")
+
+    p(f"\n[7] 강도 검증 - AGMA 2001-D04")
+    p("-" * 50)
+    for i, s in enumerate((s1, s2), start=1):
+        p(f"\n  [{i}단 기어 강도]")
+        p(f"    접선력 Wt = {s.Wt:.1f} N")
+        p(f"    굽힘 응력 sigmaF = {s.sigma_F:.1f} MPa (허용: {spec.sigma_Fb} MPa)")
+        p(f"    굽힘 안전율 SF = {s.SF:.2f} {'[OK]' if s.SF >= 1.5 else '[NG]'}")
+        p(f"    접촉 응력 sigmaH = {s.sigma_H:.1f} MPa (허용: {spec.sigma_Hb} MPa)")
+        p(f"    면압 안전율 SH = {s.SH:.2f} {'[OK]' if s.SH >= 1.2 else '[NG]'}")
+
+    p(f"\n[8] 열 방출 및 냉각 검토")
+    p("-" * 50)
+    p(f"  총 전달 효율: eta = {r.eta_total*100:.1f}%")
+    p(f"  열 손실: Q = {r.P_loss:.0f} W")
+    p(f"\n  하우징 크기 (추정):")
+    p(f"    L x W x H = {r.L_housing*1000:.0f} x {r.W_housing*1000:.0f} x {r.H_housing*1000:.0f} mm")
+    p(f"    방열 면적: A = {r.A_housing:.3f} m2")
+    p(f"\n  손실 내역 (오일 {th.T_oil:.1f} C 기준):")
+    p(f"    맞물림: {th.P_mesh:.0f} W, 교반: {th.P_churn:.0f} W, 베어링: {th.P_bearing:.0f} W")
+    p(f"\n  방열 능력 비교 (오일 {spec.T_max_oil} C 기준):")
+    p(f"    자연 대류: {r.Q_natural:.0f} W")
+    p(f"    강제 대류: {r.Q_forced:.0f} W")
+    p(f"    필요 방열량: {r.P_loss:.0f} W")
+    p(f"\n  평형 오일 온도 (허용 {spec.T_max_oil} C):")
+    p(f"    자연 대류: {th.T_oil_natural:.1f} C")
+    p(f"    강제 대류: {th.T_oil_forced:.1f} C")
+    if r.fin_needed:
+        p(f"    방열 핀 (양 측면): {th.fin_count}개, 높이 {th.fin_height:.0f} mm, "
+          f"피치 {th.fin_pitch:.1f} mm -> {th.T_oil:.1f} C")
+    p(f"\n  >> 판정: {r.cooling_result}")
+
+    p(f"\n{'='*70}")
+    p(f"                    [설계 결과 요약]")
+    p(f"{'='*70}")
+    p(f"""
 +--------------------------------------------------------------------+
 |                     기어박스 최종 사양                             |
 +--------------------------------------------------------------------+
-| 동력: {P_kW:.0f} kW | 감속비: {actual_ratio:.0f}:1 | 효율: {eta_total*100:.1f}%                  |
+| 동력: {spec.P_kW:.0f} kW | 감속비: {r.actual_ratio:.0f}:1 | 효율: {r.eta_total*100:.1f}%                  |
 +--------------------------------------------------------------------+
 
   [1단 헬리컬 기어]               [2단 헬리컬 기어]
   -----------------------         -----------------------
-  모듈:     m = {m1:.1f} mm            모듈:     m = {m2:.1f} mm
-  피니언:   {z1_1}T (dia {d1_pinion:.0f}mm)        피니언:   {z1_2}T (dia {d2_pinion:.0f}mm)
-  기  어:   {z2_1}T (dia {d1_gear:.0f}mm)       기  어:   {z2_2}T (dia {d2_gear:.0f}mm)
-  중심거리: {a1:.0f} mm                중심거리: {a2:.0f} mm
-  기어 폭:  {b1:.0f} mm                 기어 폭:  {b2:.0f} mm
-  감속비:   {ratio_1:.1f}:1                감속비:   {ratio_2:.1f}:1
+  모듈:     m = {s1.m:.1f} mm            모듈:     m = {s2.m:.1f} mm
+  피니언:   {s1.z_pinion}T (dia {s1.d_pinion:.0f}mm)        피니언:   {s2.z_pinion}T (dia {s2.d_pinion:.0f}mm)
+  기  어:   {s1.z_gear}T (dia {s1.d_gear:.0f}mm)       기  어:   {s2.z_gear}T (dia {s2.d_gear:.0f}mm)
+  중심거리: {s1.a:.0f} mm                중심거리: {s2.a:.0f} mm
+  기어 폭:  {s1.b:.0f} mm                 기어 폭:  {s2.b:.0f} mm
+  감속비:   {s1.ratio:.1f}:1                감속비:   {s2.ratio:.1f}:1
 
 +--------------------------------------------------------------------+
 | [축 직경]                                                          |
-|   입력축: dia {d_input:.0f}mm | 중간축: dia {d_intermediate:.0f}mm | 출력축: dia {d_output:.0f}mm          |
+|   입력축: dia {r.d_input:.0f}mm | 중간축: dia {r.d_intermediate:.0f}mm | 출력축: dia {r.d_output:.0f}mm          |
 +--------------------------------------------------------------------+
 | [안전율]                                                           |
-|   1단 - 굽힘: SF = {SF1:.2f}  면압: SH = {SH1:.2f}                     |
-|   2단 - 굽힘: SF = {SF2:.2f}  면압: SH = {SH2:.2f}                     |
+|   1단 - 굽힘: SF = {s1.SF:.2f}  면압: SH = {s1.SH:.2f}                     |
+|   2단 - 굽힘: SF = {s2.SF:.2f}  면압: SH = {s2.SH:.2f}                     |
 +--------------------------------------------------------------------+
 | [냉각]                                                             |
-|   {cooling_result:<50}         |
+|   {r.cooling_result:<50}         |
 +--------------------------------------------------------------------+
 """)
+    return "\n".join(out)
+
+
+def main():
+    # 출력 인코딩 설정
+    sys.stdout.reconfigure(encoding="utf-8")
+    print(render_report(design_gearbox()))
+    print("계산 완료!")
+
 
-print("계산 완료!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+기어박스 설계 골든 결과 회귀 검사
+- 저/고출력, 저/고감속비를 아우르는 기준 사양 집합을 고정 시드로 생성하고
+  스칼라 design_gearbox 결과를 golden/gearbox_golden.jsonl 에 저장
+- 임의의 엔진(벡터화, 캐시 등 고속 경로)을 코퍼스에 대해 실행하여
+  허용 오차 안에서 같은 결과를 내는지 확인하고 첫 불일치를 보고
+
+사용법:
+    python gearbox_golden.py generate [--n 2000] [--seed 20260212]
+    python gearbox_golden.py check [--engine scalar|sweep] [--rtol 1e-9] [--atol 1e-9]
+
+엔진 인터페이스: engine(specs) -> 사양마다 결과 dict 또는 예외 객체의 목록
+(dict 에 있는 GOLDEN_FIELDS 만 비교한다)
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from dataclasses import asdict, fields
+
+import numpy as np
+
+from gearbox_design_agma import (
+    COOLING_FINS, COOLING_RESULTS, ISO54_MODULES, GearboxSpec, ModuleSizingError,
+    design_gearbox, module_candidates, result_summary,
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "golden", "gearbox_golden.jsonl")
+SEED = 20260212
+GOLDEN_FIELDS = (
+    "m1", "m2", "a1", "a2",
+    "d_input", "d_intermediate", "d_output",
+    "SF1", "SH1", "SF2", "SH2",
+    "T_oil", "cooling_result", "fin_needed", "fin_count",
+)
+
+
+# ============================================================
+# 코퍼스 생성
+# ============================================================
+def corpus_specs(n, seed=SEED):
+    """기준 사양 n 개 (동력 0.5~200 kW, 총 감속비 5~80, 계수/재질/모듈 범위 분산)"""
+    rng = np.random.default_rng(seed)
+    specs = []
+    for _ in range(n):
+        n1 = float(rng.choice([720, 960, 1450, 1750, 2900, 3600]))
+        R = math.exp(rng.uniform(math.log(5), math.log(80)))
+        r1 = R ** 0.55
+        z1_1 = int(rng.integers(17, 25))
+        z1_2 = int(rng.integers(17, 27))
+        z2_1 = max(z1_1 + 1, round(z1_1 * r1))
+        z2_2 = max(z1_2 + 1, round(z1_2 * R / r1))
+        ratio = (z2_1 / z1_1) * (z2_2 / z1_2)
+        specs.append(GearboxSpec(
+            P_kW=round(math.exp(rng.uniform(math.log(0.5), math.log(200))), 2),
+            n1=n1, n_out=round(n1 / ratio, 2),
+            z1_1=z1_1, z2_1=z2_1, z1_2=z1_2, z2_2=z2_2,
+            helix_angle=float(rng.choice([0, 10, 15, 20, 25, 30])),
+            psi=float(rng.choice([8, 10, 12, 15])),
+            Ka=float(rng.choice([1.0, 1.25, 1.5, 1.75, 2.0])),
+            sigma_Fb=float(rng.choice([300, 400, 500])),
+            sigma_Hb=float(rng.choice([1100, 1400, 1500])),
+            module_series=ISO54_MODULES if rng.random() < 0.25 else None,
+            m_max=12.0 if rng.random() < 0.1 else 25.0,   # 일부는 모듈 선정 실패 사례
+        ))
+    return specs
+
+
+def _spec_delta(spec, defaults):
+    """기본값과 다른 필드만 (코퍼스 크기 절약)"""
+    return {k: v for k, v in asdict(spec).items() if v != defaults[k]}
+
+
+def _outcome(summary_or_error):
+    if isinstance(summary_or_error, Exception):
+        return {"error": type(summary_or_error).__name__}
+    return {k: summary_or_error[k] for k in GOLDEN_FIELDS if k in summary_or_error}
+
+
+def generate_corpus(path=CORPUS_PATH, n=2000, seed=SEED):
+    """기준 사양과 스칼라 엔진 결과를 JSONL 로 저장 (첫 줄: 헤더/기본값)"""
+    defaults = asdict(GearboxSpec())
+    specs = corpus_specs(n, seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        header = {"seed": seed, "n": n, "fields": GOLDEN_FIELDS, "defaults": defaults}
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for spec, out in zip(specs, scalar_engine(specs)):
+            f.write(json.dumps({"spec": _spec_delta(spec, defaults),
+                                "expected": _outcome(out)}, ensure_ascii=False) + "\n")
+    return n
+
+
+def load_corpus(path=CORPUS_PATH):
+    """-> (헤더, [(GearboxSpec, expected dict)])"""
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        known = {fd.name for fd in fields(GearboxSpec)}
+        current = asdict(GearboxSpec())
+        changed = [k for k, v in header["defaults"].items() if k in known and current[k] != v]
+        if changed:
+            raise ValueError(f"GearboxSpec 기본값이 코퍼스 생성 시와 다름: {changed} "
+                             "(코퍼스를 다시 생성하세요)")
+        cases = []
+        for line in f:
+            row = json.loads(line)
+            spec = row["spec"]
+            if isinstance(spec.get("module_series"), list):
+                spec["module_series"] = tuple(spec["module_series"])
+            cases.append((GearboxSpec(**spec), row["expected"]))
+    return header, cases
+
+
+# ============================================================
+# 엔진
+# ============================================================
+def scalar_engine(specs):
+    """기준 엔진: design_gearbox (스칼라)"""
+    out = []
+    for spec in specs:
+        try:
+            out.append(result_summary(design_gearbox(spec)))
+        except ValueError as e:
+            out.append(e)
+    return out
+
+
+def sweep_engine(specs):
+    """gearbox_sweep 벡터화 엔진 ([4]~[7], 축 직경, [8] 열 평형)"""
+    from gearbox_sweep import size_module, sweep_thermal, sweep_two_stage
+
+    out = [None] * len(specs)
+    # 모듈 계열과 냉각 조건이 같은 사양끼리 묶어 한 번에 계산
+    groups = {}
+    for i, s in enumerate(specs):
+        key = (s.module_series, s.pressure_angle, s.h_natural, s.h_forced,
+               s.T_ambient, s.T_max_oil, s.oil_nu40, s.oil_nu100)
+        groups.setdefault(key, []).append(i)
+
+    for key, idx in groups.items():
+        series = key[0]
+        col = {f.name: np.array([getattr(specs[i], f.name) for i in idx])
+               for f in fields(GearboxSpec) if f.name != "module_series"}
+        # 단별 최소 모듈 (스칼라 엔진의 m_init) 을 반영하기 위해 단마다 계열을 자른다
+        m = []
+        for stage, z, m_init in ((1, col["z1_1"], "m1_init"), (2, col["z1_2"], "m2_init")):
+            T1 = col["P_kW"] * 9549 / col["n1"]
+            r1 = col["z2_1"] / col["z1_1"]
+            T, n = (T1, col["n1"]) if stage == 1 else (T1 * r1 * col["eta_gear"], col["n1"] / r1)
+            m_stage = np.full(len(idx), np.nan)
+            for m0, m_max in set(zip(col[m_init].tolist(), col["m_max"].tolist())):
+                sel = (col[m_init] == m0) & (col["m_max"] == m_max)
+                grid = module_candidates(GearboxSpec(module_series=series, m_max=m_max), m0)
+                m_stage[sel] = size_module(
+                    T[sel], n[sel], z[sel], col["helix_angle"][sel], col["psi"][sel], grid,
+                    sigma_Fb=col["sigma_Fb"][sel], Ka=col["Ka"][sel], Ks=col["Ks"][sel],
+                    Km=col["Km"][sel], KB=col["KB"][sel])
+            m.append(m_stage)
+
+        r = sweep_two_stage(
+            col["P_kW"], col["n1"], col["z1_1"], col["z2_1"], m[0],
+            col["z1_2"], col["z2_2"], m[1],
+            helix_angle=col["helix_angle"], psi=col["psi"], eta_stage=col["eta_gear"],
+            sigma_Fb=col["sigma_Fb"], sigma_Hb=col["sigma_Hb"],
+            pressure_angle=col["pressure_angle"],
+            Ka=col["Ka"], Ks=col["Ks"], Km=col["Km"], KB=col["KB"], Ze=col["Ze"])
+
+        sized = ~(np.isnan(r["m1"]) | np.isnan(r["m2"]))
+        th = sweep_thermal(r[sized], col["P_kW"][sized], col["n1"][sized],
+                           eta_stage=col["eta_gear"][sized], spec=specs[idx[0]])
+        j = 0
+        for k, i in enumerate(idx):
+            if not sized[k]:
+                out[i] = ModuleSizingError("모듈 계열 안에 만족하는 모듈 없음")
+                continue
+            res = {name: r[name][k].item() for name in GOLDEN_FIELDS if name in r.dtype.names}
+            res["T_oil"] = th["T_oil"][j].item()
+            res["cooling_result"] = COOLING_RESULTS[th["cooling"][j]]
+            res["fin_needed"] = bool(th["cooling"][j] >= COOLING_FINS)
+            res["fin_count"] = th["fin_count"][j].item()
+            out[i] = res
+            j += 1
+    return out
+
+
+ENGINES = {"scalar": scalar_engine, "sweep": sweep_engine}
+
+
+# ============================================================
+# 검사
+# ============================================================
+def _same(expected, got, rtol, atol):
+    if isinstance(expected, bool) or isinstance(expected, str) or expected is None:
+        return expected == got
+    return math.isclose(got, expected, rel_tol=rtol, abs_tol=atol)
+
+
+def check_engine(engine, path=CORPUS_PATH, rtol=1e-9, atol=1e-9):
+    """
+    코퍼스 전체를 engine 으로 계산해 비교한다.
+    반환: (검사 사례 수, 불일치 목록 [(행, 필드, 기대값, 결과값, spec)])
+    """
+    _, cases = load_corpus(path)
+    specs = [spec for spec, _ in cases]
+    results = engine(specs)
+
+    mismatches = []
+    for row, ((spec, expected), got) in enumerate(zip(cases, results)):
+        got = _outcome(got)
+        if "error" in expected or "error" in got:
+            if expected.get("error") != got.get("error"):
+                mismatches.append((row, "error", expected.get("error"), got.get("error"), spec))
+            continue
+        for name in GOLDEN_FIELDS:
+            if name in got and not _same(expected[name], got[name], rtol, atol):
+                mismatches.append((row, name, expected[name], got[name], spec))
+    return len(cases), mismatches
+
+
+def main():
+    sys.stdout.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser(description="기어박스 골든 결과 회귀 검사")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="골든 코퍼스 생성 (스칼라 엔진 기준)")
+    gen.add_argument("--n", type=int, default=2000)
+    gen.add_argument("--seed", type=int, default=SEED)
+    gen.add_argument("--corpus", default=CORPUS_PATH)
+    chk = sub.add_parser("check", help="엔진 결과를 코퍼스와 비교")
+    chk.add_argument("--engine", choices=sorted(ENGINES), default="scalar")
+    chk.add_argument("--rtol", type=float, default=1e-9)
+    chk.add_argument("--atol", type=float, default=1e-9)
+    chk.add_argument("--corpus", default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        n = generate_corpus(args.corpus, args.n, args.seed)
+        print(f"코퍼스 저장: {args.corpus} ({n}개 사양)")
+        return
+
+    n, mismatches = check_engine(ENGINES[args.engine], args.corpus, args.rtol, args.atol)
+    if not mismatches:
+        print(f"[OK] {args.engine}: {n}개 사양 모두 일치 (rtol={args.rtol}, atol={args.atol})")
+        return
+    row, name, expected, got, spec = mismatches[0]
+    print(f"[불일치] {args.engine}: {len(mismatches)}건 / {n}개 사양")
+    print(f"  첫 불일치: 행 {row}, {name}: 기대 {expected!r}, 결과 {got!r}")
+    print(f"  사양: {spec}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
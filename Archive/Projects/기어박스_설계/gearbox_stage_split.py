@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+N단 감속비 분배 탐색 - 파레토 최적 기어열
+- 총 감속비 n1/n_out 을 1~4단으로 나누는 정수 잇수 조합을 탐색
+- 감속비 허용 오차와 헌팅 투스(피니언/기어 잇수 서로소) 조건으로 가지치기
+- 총 중심거리, 질량 지표, 전체 효율, 최소 안전율 여유의 파레토 전선을 반환
+  (효율은 기어열마다 맞물림 + 교반 + 베어링 손실로 계산, gearbox_thermal 손실 모델)
+
+누적 감속비를 로그 구간(bin)으로 나눈 동적 계획법으로 탐색한다. 각 구간에는
+부분 기어열의 파레토 집합 (중심거리, 질량, 단별 손실 합, 안전율 여유) 만 남기므로 단 수가
+늘어도 조합이 폭발하지 않고, 효율이 높은 부분 기어열도 가지치기에서 버려지지 않는다.
+단 평가는 gearbox_sweep 의 벡터화 식을 쓰고, 최종 전선은
+gearbox_design_agma.design_stage 로 정확히 다시 계산한다.
+"""
+import bisect
+import math
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from gearbox_design_agma import (
+    GearboxSpec, ModuleSizingError, design_stage, module_candidates, select_module,
+    shaft_diameter,
+)
+from gearbox_sweep import shaft_diameter as sweep_shaft_diameter, size_module, stage_check
+from gearbox_thermal import F_DIP, bearing_loss, churning_loss, oil_viscosity, speed_losses
+
+RHO_STEEL = 7.85e-6     # 강 밀도 [kg/mm3]
+
+
+@dataclass(slots=True)
+class TrainDesign:
+    """파레토 전선의 기어열 1개"""
+    stages: list            # StageResult 목록 (입력측부터)
+    ratio: float            # 실제 총 감속비
+    a_total: float          # 총 중심거리 a1+a2+... [mm]
+    mass: float             # 기어 질량 지표 [kg] (피치원 원판 근사)
+    eta_total: float        # 전체 효율 (맞물림 + 교반 + 베어링 손실, T_max_oil 기준)
+    SF_min: float           # 최소 굽힘 안전율
+    SH_min: float           # 최소 면압 안전율
+    margin: float           # 최소 안전율 여유 min(SF/SF_req, SH/SH_req)
+
+
+def pair_catalog(z_pinion, z_gear_max, ratio_min, ratio_max, hunting=True):
+    """단 1개에 쓸 수 있는 (피니언, 기어) 잇수 쌍 (헌팅 투스: 최대공약수 1)"""
+    z1, z2 = np.meshgrid(np.asarray(list(z_pinion)), np.arange(1, z_gear_max + 1),
+                         indexing="ij")
+    z1, z2 = z1.ravel(), z2.ravel()
+    r = z2 / z1
+    ok = (r >= ratio_min) & (r <= ratio_max)
+    if hunting:
+        ok &= np.gcd(z1, z2) == 1
+    z1, z2 = z1[ok], z2[ok]
+    order = np.argsort(z2 / z1, kind="stable")
+    return z1[order], z2[order]
+
+
+def pareto_mask(objs):
+    """최소화 목적 행렬 objs (n, k) 의 비지배 행 마스크"""
+    if objs.shape[1] == 3:
+        return _pareto_mask_3d(objs)
+    order = np.lexsort(objs.T[::-1])
+    keep = np.zeros(len(objs), dtype=bool)
+    kept = np.empty((0, objs.shape[1]))
+    for i in order:
+        if not np.any(np.all(kept <= objs[i], axis=1)):
+            keep[i] = True
+            kept = np.vstack([kept, objs[i]])
+    return keep
+
+
+def _pareto_mask_3d(objs):
+    """3목적 파레토: 첫 목적으로 정렬 후 나머지 2목적 계단(staircase) 유지"""
+    order = np.lexsort(objs.T[::-1])
+    keep = np.zeros(len(objs), dtype=bool)
+    xs, ys = [], []     # 계단: x 오름차순, y 내림차순
+    for i, x, y in zip(order.tolist(), objs[order, 1].tolist(), objs[order, 2].tolist()):
+        j = bisect.bisect_right(xs, x)
+        if j and ys[j - 1] <= y:
+            continue        # x, y 모두 작거나 같은 점이 이미 있음
+        keep[i] = True
+        # 새 점이 지배하는 계단 점 제거 (x >= 새 x 이고 y >= 새 y)
+        k = j
+        while k < len(xs) and ys[k] >= y:
+            k += 1
+        xs[j:k] = [x]
+        ys[j:k] = [y]
+    return keep
+
+
+def _pareto_mask_cells(x, y, cells):
+    """
+    실수 목적 x, y 와 정수 격자 목적 cells (n, k) (모두 최소화) 의 비지배 마스크.
+    (x, y, cells) 사전식으로 정렬하면 지배하는 행은 항상 앞에 있으므로, 격자 칸마다 앞 행들의
+    y 누적 최소를 구해 (칸 <= 자기 칸) 인 칸의 최소가 자기 y 이하이면 지배당한 것.
+    격자 칸 수가 적을 때 (안전율 여유, 손실 격자) 행 수에 선형.
+    """
+    order = np.lexsort((*cells.T[::-1], y, x))
+    y, cells = y[order], cells[order]
+    uniq, cell = np.unique(cells, axis=0, return_inverse=True)
+    cell = cell.ravel()
+    y_cell = np.where(cell[None, :] == np.arange(len(uniq))[:, None], y[None, :], np.inf)
+    # 앞 행들만 (자기 제외) 의 칸별 누적 최소
+    y_prev = np.minimum.accumulate(np.hstack([np.full((len(uniq), 1), np.inf), y_cell[:, :-1]]),
+                                   axis=1)
+    below = np.all(uniq[:, None, :] <= uniq[None, :, :], axis=2)     # [칸 k, 칸 l]: k <= l
+    best = np.where(below[:, cell], y_prev, np.inf).min(axis=0)
+    keep = np.zeros(len(x), dtype=bool)
+    keep[order] = best > y
+    return keep
+
+
+def _stage_eval(T, n, z1, z2, spec, series, SF_req, SH_req, nu):
+    """
+    잇수 쌍 배열을 입력 (T, n) 에서 평가 -> (합격, 중심거리, 질량, 안전율 여유, 손실 지표)
+    손실 지표 [W]: 이 단의 큰 기어 교반 손실 + 이 단 치면 법선력이 입력/출력축 베어링에 주는
+    부하 마찰 손실 + 출력축 베어링 무부하 손실 (점도 nu, train_efficiency 와 같은 모델).
+    맞물림 손실은 단 수가 같으면 같으므로 넣지 않는다.
+    """
+    f = dict(sigma_Fb=spec.sigma_Fb, Ka=spec.Ka, Ks=spec.Ks, Km=spec.Km, KB=spec.KB)
+    m = size_module(T, n, z1, spec.helix_angle, spec.psi, series, **f)
+    a, SF, SH = stage_check(T, n, z1, z2, m, spec.helix_angle, spec.psi,
+                            sigma_Hb=spec.sigma_Hb, pressure_angle=spec.pressure_angle,
+                            Ze=spec.Ze, **f)
+    cos_beta = math.cos(math.radians(spec.helix_angle))
+    d1, d2 = m * z1 / cos_beta, m * z2 / cos_beta
+    mass = np.pi / 4 * (d1 ** 2 + d2 ** 2) * spec.psi * m * RHO_STEEL
+    margin = np.minimum(SF / SF_req, SH / SH_req)
+
+    shaft = dict(tau_allow=spec.tau_allow, Kt=spec.Kt, Cm=spec.Cm, Ct=spec.Ct)
+    r = z2 / z1
+    n_out = n / r
+    d_out = sweep_shaft_diameter(T * r * spec.eta_gear, **shaft)
+    d_in = sweep_shaft_diameter(T, **shaft)
+    half_Fn = (2 * T * 1000) / d1 / math.cos(math.radians(spec.pressure_angle)) / 2
+    # 축당 베어링 2개, 축 하중 = 양쪽 단 법선력 절반의 합 -> 부하 마찰은 단별로 더해진다
+    loss = (churning_loss(nu, n_out, d2, spec.psi * m, F_DIP)
+            + 2 * bearing_loss(nu, n_out, d_out, half_Fn)
+            + 2 * (bearing_loss(nu, n, d_in, half_Fn) - bearing_loss(nu, n, d_in, 0.0)))
+    return np.nan_to_num(margin, nan=0.0) >= 1, a, mass, margin, loss
+
+
+def _prune(bins, R, a, mass, loss, margin, path, eps, eps_margin, loss_step):
+    """
+    같은 누적 감속비 구간 안에서 (a, mass, loss, -margin) 파레토 집합만 남긴다.
+    a, mass 는 상대 eps, margin 은 eps_margin, loss 는 loss_step [W] 격자로 묶은 epsilon-파레토.
+    """
+    q_margin = np.floor(np.minimum(margin, 100) / eps_margin)
+    q_loss = np.floor(loss / loss_step)
+
+    # 1) 격자 칸마다 중심거리 최소 1개만 남김
+    q = [bins, np.floor(np.log(a) / eps), np.floor(np.log(mass) / eps), q_loss, q_margin]
+    q = [(c - c.min()).astype(np.int64) for c in q]
+    key = np.ravel_multi_index(q, [int(c.max()) + 1 for c in q])
+    order = np.lexsort((a, key))
+    key = key[order]
+    idx = order[np.r_[True, key[1:] != key[:-1]]]
+
+    # 2) 구간별 파레토
+    idx = idx[np.argsort(bins[idx], kind="stable")]
+    b_sorted = bins[idx]
+    starts = np.flatnonzero(np.r_[True, b_sorted[1:] != b_sorted[:-1]])
+    keep = []
+    for s, e in zip(starts, np.r_[starts[1:], len(idx)]):
+        g = idx[s:e]
+        keep.append(g[_pareto_mask_cells(a[g], mass[g],
+                                         np.stack([q_loss[g], -q_margin[g]], axis=1))])
+    keep = np.concatenate(keep)
+    return (bins[keep], R[keep], a[keep], mass[keep], loss[keep], margin[keep],
+            path[keep])
+
+
+def _search_stages(N, T1, n1, total, spec, pairs, series, ratio_min, ratio_max,
+                   ratio_tol, SF_req, SH_req, bin_width, eps, eps_margin, loss_step):
+    """N단 기어열 후보 (잇수 쌍 인덱스 경로 배열) 를 동적 계획법으로 찾는다"""
+    z1_all, z2_all = pairs
+    r_all = z2_all / z1_all
+    eta = spec.eta_gear
+    nu = oil_viscosity(spec.T_max_oil, spec.oil_nu40, spec.oil_nu100)
+
+    # 상태: 누적 감속비 구간 -> 부분 기어열 레이블 (R, a, mass, loss, margin, path)
+    bins = np.zeros(1, dtype=np.int64)
+    R = np.ones(1)
+    a = mass = loss = np.zeros(1)
+    margin = np.full(1, np.inf)
+    path = np.empty((1, 0), dtype=np.int64)
+
+    for k in range(N):
+        rem = N - k - 1
+        r_lo_rem = ratio_min ** rem * (1 - ratio_tol)
+        r_hi_rem = ratio_max ** rem * (1 + ratio_tol)
+        out = []
+        for b in np.unique(bins):
+            sel = bins == b
+            Rs = R[sel]
+            # 남은 단으로 총 감속비를 맞출 수 있는 잇수 쌍만 평가
+            i0 = np.searchsorted(r_all, total / (Rs.max() * r_hi_rem), side="left")
+            i1 = np.searchsorted(r_all, total / (Rs.min() * r_lo_rem), side="right")
+            if i0 >= i1:
+                continue
+            cand = np.arange(i0, i1)
+            # 구간 내 최대 누적비 기준 평가 (토크 큰 쪽 = 안전측)
+            R_rep = Rs.max()
+            ok, a_p, m_p, s_p, l_p = _stage_eval(T1 * R_rep * eta ** k, n1 / R_rep,
+                                                 z1_all[cand], z2_all[cand],
+                                                 spec, series, SF_req, SH_req, nu)
+            cand, a_p, m_p, s_p, l_p = cand[ok], a_p[ok], m_p[ok], s_p[ok], l_p[ok]
+            if cand.size == 0:
+                continue
+
+            R_new = Rs[:, None] * r_all[cand][None, :]
+            R_rem = total / R_new
+            valid = (R_rem >= r_lo_rem) & (R_rem <= r_hi_rem)
+            li, pi = np.nonzero(valid)
+            if li.size == 0:
+                continue
+            out.append((
+                R_new[li, pi],
+                a[sel][li] + a_p[pi],
+                mass[sel][li] + m_p[pi],
+                loss[sel][li] + l_p[pi],
+                np.minimum(margin[sel][li], s_p[pi]),
+                np.hstack([path[sel][li], cand[pi][:, None]]),
+            ))
+        if not out:
+            return np.empty((0, N), dtype=np.int64)
+
+        R, a, mass, loss, margin, path = (np.concatenate(c) for c in zip(*out))
+        bins = np.zeros(len(R), dtype=np.int64) if rem == 0 \
+            else np.round(np.log(R) / bin_width).astype(np.int64)
+        bins, R, a, mass, loss, margin, path = _prune(bins, R, a, mass, loss, margin,
+                                                      path, eps, eps_margin, loss_step)
+
+    return path
+
+
+def evaluate_train(P_kW, n1, teeth, spec):
+    """잇수 쌍 목록으로 기어열을 design_stage 로 정확히 계산 (모듈 불가 시 None)"""
+    T = (P_kW * 9549) / n1
+    n = n1
+    stages = []
+    for z1, z2 in teeth:
+        try:
+            m = select_module(T, n, z1, spec, spec.m1_init)
+        except ModuleSizingError:
+            return None
+        st = design_stage(T, n, z1, z2, m, spec)
+        stages.append(st)
+        T = T * st.ratio * spec.eta_gear
+        n = n / st.ratio
+    return stages
+
+
+def train_efficiency(P_kW, stages, spec):
+    """
+    기어열 전체 효율 = 1 - (맞물림 + 교반 + 베어링 손실) / 입력 동력
+    손실 모델은 gearbox_thermal.gearbox_thermal 과 같고 (큰 기어만 침지, 축당 베어링 2개,
+    베어링 하중 = 치면 법선력의 절반), 하우징은 단 수마다 달라 열 평형 대신 허용 오일 온도
+    T_max_oil 에서 계산한다. 교반/베어링 손실이 단별 회전수, 기어 직경/폭, 축 직경에 따라
+    달라지므로 단 수가 같아도 분배마다 효율이 다르다.
+    """
+    P = P_kW * 1000
+    P_mesh = P * (1 - spec.eta_gear ** len(stages))     # 단마다 통과 동력의 (1 - eta_gear)
+    gears = [(st.n / st.ratio, st.d_gear, st.b, F_DIP) for st in stages]
+
+    cos_phi = math.cos(math.radians(spec.pressure_angle))
+    Fn = [st.Wt / cos_phi for st in stages]
+    shaft = dict(tau_allow=spec.tau_allow, Kt=spec.Kt, Cm=spec.Cm, Ct=spec.Ct)
+    # 축: 입력축, 단 사이 중간축, 출력축 (토크는 각 축을 지나는 값)
+    speeds = [stages[0].n] + [st.n / st.ratio for st in stages]
+    torques = [st.T for st in stages] + [stages[-1].T * stages[-1].ratio * spec.eta_gear]
+    loads = [(a + b) / 2 for a, b in zip([0.0] + Fn, Fn + [0.0])]
+    shafts = [(n, shaft_diameter(T, **shaft), F) for n, T, F in zip(speeds, torques, loads)]
+
+    P_churn, P_bearing = speed_losses(spec.T_max_oil, gears, shafts,
+                                      nu40=spec.oil_nu40, nu100=spec.oil_nu100)
+    return 1 - (P_mesh + P_churn + P_bearing) / P
+
+
+def split_stages(P_kW, n1, n_out, spec=None, stage_counts=(1, 2, 3, 4),
+                 z_pinion=range(17, 31), z_gear_max=150,
+                 ratio_min=1.5, ratio_max=8.0, ratio_tol=0.02, hunting=True,
+                 SF_req=1.5, SH_req=1.2, bin_width=0.01, eps=0.02, eps_margin=0.1,
+                 eps_eta=0.001):
+    """
+    총 감속비 n1/n_out 의 N단 분배 파레토 전선을 찾는다.
+
+    목적: 총 중심거리(최소), 질량 지표(최소), 전체 효율(최대), 최소 안전율 여유(최대)
+    조건: 단별 감속비 [ratio_min, ratio_max], 총 감속비 오차 ratio_tol,
+          각 단 SF >= SF_req, SH >= SH_req
+    탐색 해상도: 누적 감속비 구간 bin_width (로그), 목적값 격자 eps (상대),
+                 안전율 여유 격자 eps_margin, 효율 격자 eps_eta (입력 동력 대비 손실)
+    반환: TrainDesign 목록 (총 중심거리 오름차순)
+    """
+    if spec is None:
+        spec = GearboxSpec()
+    total = n1 / n_out
+    T1 = (P_kW * 9549) / n1
+    pairs = pair_catalog(z_pinion, z_gear_max, ratio_min, ratio_max, hunting)
+    series = module_candidates(spec, spec.m1_init)
+
+    designs = []
+    for N in stage_counts:
+        paths = _search_stages(N, T1, n1, total, spec, pairs, series, ratio_min, ratio_max,
+                               ratio_tol, SF_req, SH_req, bin_width, eps, eps_margin,
+                               P_kW * 1000 * eps_eta)
+        for p in paths:
+            teeth = [(int(pairs[0][i]), int(pairs[1][i])) for i in p]
+            stages = evaluate_train(P_kW, n1, teeth, spec)
+            if stages is None:
+                continue
+            SF_min = min(s.SF for s in stages)
+            SH_min = min(s.SH for s in stages)
+            margin = min(SF_min / SF_req, SH_min / SH_req)
+            if margin < 1:
+                continue
+            designs.append(TrainDesign(
+                stages=stages,
+                ratio=math.prod(s.ratio for s in stages),
+                a_total=sum(s.a for s in stages),
+                mass=sum(math.pi / 4 * (s.d_pinion ** 2 + s.d_gear ** 2) * s.b * RHO_STEEL
+                         for s in stages),
+                eta_total=train_efficiency(P_kW, stages, spec),
+                SF_min=SF_min, SH_min=SH_min, margin=margin,
+            ))
+
+    if not designs:
+        return []
+    objs = np.array([[d.a_total, d.mass, -d.eta_total, -d.margin] for d in designs])
+    front = [d for d, k in zip(designs, pareto_mask(objs)) if k]
+    return sorted(front, key=lambda d: d.a_total)
+
+
+# ============================================================
+# 실행 예: 10kW, 1750 -> 50 RPM (35:1)
+# ============================================================
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+
+    t0 = time.perf_counter()
+    front = split_stages(10, 1750, 50)
+    elapsed = time.perf_counter() - t0
+
+    print(f"파레토 전선: {len(front)}개 기어열 ({elapsed:.2f} s)")
+    print(f"{'단':>3}{'감속비':>8}{'a_total':>9}{'질량[kg]':>10}{'효율':>8}"
+          f"{'SF_min':>8}{'SH_min':>8}  잇수 (모듈)")
+    for d in front:
+        teeth = " / ".join(f"{s.z_pinion}-{s.z_gear} (m{s.m:g})" for s in d.stages)
+        print(f"{len(d.stages):>3}{d.ratio:>8.2f}{d.a_total:>9.1f}{d.mass:>10.2f}"
+              f"{d.eta_total * 100:>7.2f}%{d.SF_min:>8.2f}{d.SH_min:>8.2f}  {teeth}")
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+기어박스 설계 공간 스윕 - NumPy 벡터화
+- gearbox_design_agma.py 의 [3]~[7] 계산식을 후보 배열 전체에 한 번에 적용
+- (잇수, 모듈, 비틀림각, 폭/모듈 비 psi) 후보별 안전율 SF/SH, 중심거리, 축 직경을
+  구조화 배열(structured array)로 반환
+"""
+import sys
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from gearbox_design_agma import GearboxSpec, module_candidates
+from gearbox_thermal import F_DIP, housing_thermal
+
+# ============================================================
+# 기본 계수 (GearboxSpec 기본값과 동일)
+# ============================================================
+_SPEC = GearboxSpec()
+SIGMA_FB = _SPEC.sigma_Fb           # 허용 굽힘 응력 [MPa]
+SIGMA_HB = _SPEC.sigma_Hb           # 허용 접촉 응력 [MPa]
+PRESSURE_ANGLE = _SPEC.pressure_angle
+KA, KS, KM, KB = _SPEC.Ka, _SPEC.Ks, _SPEC.Km, _SPEC.KB
+ZE = _SPEC.Ze                       # 탄성 계수 (강-강) [MPa^0.5]
+ETA_STAGE = _SPEC.eta_gear          # 단당 효율
+
+# 2단 후보 스윕 결과 레코드
+SWEEP_DTYPE = np.dtype([
+    ("z1_1", np.int32), ("z2_1", np.int32), ("m1", np.float64),
+    ("z1_2", np.int32), ("z2_2", np.int32), ("m2", np.float64),
+    ("helix_angle", np.float64), ("psi", np.float64),
+    ("ratio", np.float64),
+    ("a1", np.float64), ("a2", np.float64),
+    ("SF1", np.float64), ("SH1", np.float64),
+    ("SF2", np.float64), ("SH2", np.float64),
+    ("d_input", np.float64), ("d_intermediate", np.float64), ("d_output", np.float64),
+])
+
+# 후보별 열 평형 결과 레코드 (sweep_thermal)
+THERMAL_DTYPE = np.dtype([
+    ("T_oil_natural", np.float64), ("T_oil_forced", np.float64), ("T_oil", np.float64),
+    ("P_loss", np.float64), ("cooling", np.int8),
+    ("fin_count", np.int32), ("fin_height", np.float64), ("fin_pitch", np.float64),
+])
+
+
+# ============================================================
+# 벡터화 계산식 (스칼라 버전과 동일한 식, 배열 입력)
+# ============================================================
+def lewis_factor(z, helix_deg):
+    """등가 잇수에 대한 Lewis 형상 계수"""
+    z_eq = z / np.cos(np.radians(helix_deg)) ** 3
+    return np.maximum(0.154 - 0.912 / z_eq, 0.28)
+
+
+def pitch_velocity(d, n):
+    """피치선 속도 [m/s], d: mm, n: RPM"""
+    return (np.pi * d * n) / 60000
+
+
+def velocity_factor(V):
+    """AGMA 속도 계수 Kv (Quality 6 기준)"""
+    return (6.1 + V) / 6.1
+
+
+def agma_J_factor(z, helix_deg):
+    """굽힘 강도용 기하계수 J"""
+    z_eq = z / np.cos(np.radians(helix_deg)) ** 3
+    return np.minimum(0.45 + 0.003 * z_eq, 0.55)
+
+
+def agma_I_factor(z1, z2, pressure_angle):
+    """면압 강도용 기하계수 I"""
+    phi = np.radians(pressure_angle)
+    mg = z2 / z1
+    return (np.cos(phi) * np.sin(phi)) / (2 * (1 + 1 / mg))
+
+
+def shaft_diameter(T, tau_allow=55, Kt=2.0, Cm=1.5, Ct=1.0):
+    """ASME 공식에 의한 축 직경 [mm], T: 토크 [N.m] (5mm 단위 올림)"""
+    M = T * 0.3
+    term = np.sqrt((Cm * M * 1000) ** 2 + (Ct * T * 1000) ** 2)
+    d = ((16 / (np.pi * tau_allow)) * Kt * term) ** (1 / 3)
+    return np.ceil(d / 5) * 5
+
+
+def stage_check(T, n, z1, z2, m, helix_deg, psi,
+                sigma_Fb=SIGMA_FB, sigma_Hb=SIGMA_HB, pressure_angle=PRESSURE_ANGLE,
+                Ka=KA, Ks=KS, Km=KM, KB=KB, Ze=ZE):
+    """
+    한 감속단의 치수/강도 검증 ([5], [7]절)
+    T: 피니언 토크 [N.m], n: 피니언 회전수 [RPM]
+    반환: (중심거리 a [mm], 굽힘 안전율 SF, 면압 안전율 SH)
+    """
+    cos_beta = np.cos(np.radians(helix_deg))
+    d_pinion = m * z1 / cos_beta
+    d_gear = m * z2 / cos_beta
+    a = (d_pinion + d_gear) / 2
+    b = psi * m
+
+    Kv = velocity_factor(pitch_velocity(d_pinion, n))
+    Wt = (2 * T * 1000) / d_pinion
+    K = Wt * Ka * Kv * Ks * Km
+
+    sigma_F = K * KB / (b * m * agma_J_factor(z1, helix_deg))
+    sigma_H = Ze * np.sqrt(K / (d_pinion * b * agma_I_factor(z1, z2, pressure_angle)))
+    return a, sigma_Fb / sigma_F, sigma_Hb / sigma_H
+
+
+def size_module(T, n, z, helix_deg, psi, series,
+                sigma_Fb=SIGMA_FB, Ka=KA, Ks=KS, Km=KM, KB=KB):
+    """
+    [4] 모듈 선정 벡터화 (gearbox_design_agma.select_module 과 동일한 해)
+    Lewis 굽힘 부등식의 3차식 해석해 -> 모듈 계열 series 에서 searchsorted.
+    계열 안에 만족하는 모듈이 없는 후보는 NaN.
+    """
+    series = np.sort(np.asarray(series, dtype=float))
+    if series.size == 0:
+        return np.full(np.broadcast(T, n, z, helix_deg, psi).shape, np.nan)
+    cos_beta = np.cos(np.radians(helix_deg))
+    Y = lewis_factor(z, helix_deg)
+    K = Ka * Ks * Km * KB
+    A = (2 * T * 1000 * cos_beta * K) / (6.1 * z * psi * Y)
+    c = (np.pi * z * n) / (60000 * cos_beta)
+
+    # 감소 3차식 m^3 + p*m + q = 0 의 양의 근
+    p = -A * c / sigma_Fb
+    q = -6.1 * A / sigma_Fb
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+    r = np.sqrt(np.maximum(disc, 0))
+    m_cardano = np.cbrt(-q / 2 + r) + np.cbrt(-q / 2 - r)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rho = 2 * np.sqrt(-p / 3)
+        arg = np.clip(3 * q / (2 * p) * np.sqrt(-3 / p), -1, 1)
+        m_trig = rho * np.cos(np.arccos(arg) / 3)
+    m_req = np.where(disc >= 0, m_cardano, m_trig)
+
+    idx = np.searchsorted(series, m_req * (1 - 1e-9))
+    # 반올림 오차로 경계 모듈이 근소하게 초과하면 다음 계열로
+    m = series[np.minimum(idx, series.size - 1)]
+    d = m * z / cos_beta
+    sigma = ((2 * T * 1000) / d * K * velocity_factor(pitch_velocity(d, n))) / (psi * m * m * Y)
+    idx = idx + (sigma > sigma_Fb * (1 + 1e-12))
+    return np.where(idx < series.size, series[np.minimum(idx, series.size - 1)], np.nan)
+
+
+def sweep_two_stage(P_kW, n1, z1_1, z2_1, m1, z1_2, z2_2, m2,
+                    helix_angle=20, psi=10, eta_stage=ETA_STAGE,
+                    module_series=None, m1_init=_SPEC.m1_init, m2_init=_SPEC.m2_init, **factors):
+    """
+    2단 헬리컬 감속기 후보 전체를 한 번에 평가한다.
+
+    모든 후보 인자는 스칼라 또는 서로 브로드캐스트 가능한 배열이다.
+    m1/m2 가 None 이면 module_series (None = 0.5 mm 간격) 중 단별 최소 모듈 m1_init/m2_init
+    이상에서 size_module 로 최소 모듈을 선정한다 (design_gearbox 와 같은 module_candidates 계열,
+    만족하는 모듈이 없는 후보는 m, SF, SH 가 NaN).
+    factors 로 sigma_Fb, sigma_Hb, Ka 등 stage_check 계수를 덮어쓸 수 있다.
+    반환: SWEEP_DTYPE 구조화 배열 (1차원)
+    """
+    auto_m1, auto_m2 = m1 is None, m2 is None
+    args = np.broadcast_arrays(
+        np.asarray(z1_1), np.asarray(z2_1), np.asarray(np.nan if auto_m1 else m1, dtype=float),
+        np.asarray(z1_2), np.asarray(z2_2), np.asarray(np.nan if auto_m2 else m2, dtype=float),
+        np.asarray(helix_angle, dtype=float), np.asarray(psi, dtype=float),
+    )
+    z1_1, z2_1, m1, z1_2, z2_2, m2, helix_angle, psi = (a.ravel() for a in args)
+
+    ratio_1 = z2_1 / z1_1
+    ratio_2 = z2_2 / z1_2
+
+    # [3] 토크 계산
+    T1 = (P_kW * 9549) / n1
+    n2 = n1 / ratio_1
+    T2 = T1 * ratio_1 * eta_stage
+    T3 = T2 * ratio_2 * eta_stage
+
+    # [4] 모듈 자동 선정
+    if auto_m1 or auto_m2:
+        spec = _SPEC if module_series is None else replace(_SPEC, module_series=tuple(module_series))
+        sizing = {k: v for k, v in factors.items() if k in ("sigma_Fb", "Ka", "Ks", "Km", "KB")}
+        if auto_m1:
+            m1 = size_module(T1, n1, z1_1, helix_angle, psi, module_candidates(spec, m1_init), **sizing)
+        if auto_m2:
+            m2 = size_module(T2, n2, z1_2, helix_angle, psi, module_candidates(spec, m2_init), **sizing)
+
+    # [5], [7] 각 단 치수 및 강도
+    a1, SF1, SH1 = stage_check(T1, n1, z1_1, z2_1, m1, helix_angle, psi, **factors)
+    a2, SF2, SH2 = stage_check(T2, n2, z1_2, z2_2, m2, helix_angle, psi, **factors)
+
+    out = np.empty(z1_1.shape[0], dtype=SWEEP_DTYPE)
+    out["z1_1"], out["z2_1"], out["m1"] = z1_1, z2_1, m1
+    out["z1_2"], out["z2_2"], out["m2"] = z1_2, z2_2, m2
+    out["helix_angle"], out["psi"] = helix_angle, psi
+    out["ratio"] = ratio_1 * ratio_2
+    out["a1"], out["a2"] = a1, a2
+    out["SF1"], out["SH1"], out["SF2"], out["SH2"] = SF1, SH1, SF2, SH2
+
+    # [6] 축 직경 (T1 은 스칼라이므로 브로드캐스트)
+    out["d_input"] = shaft_diameter(T1)
+    out["d_intermediate"] = shaft_diameter(T2)
+    out["d_output"] = shaft_diameter(T3)
+    return out
+
+
+def sweep_thermal(result, P_kW, n1, eta_stage=ETA_STAGE, spec=_SPEC):
+    """
+    sweep_two_stage 결과의 후보별 [8] 열 평형 (design_gearbox 와 같은 하우징 추정/손실 모델)
+    P_kW, n1, eta_stage 는 스칼라 또는 result 와 같은 길이의 배열.
+    spec 에서는 냉각/윤활 항목 (h_natural, h_forced, T_ambient, T_max_oil, oil_nu40/100,
+    pressure_angle) 만 사용한다. 반환: THERMAL_DTYPE 구조화 배열 (result 와 같은 길이)
+    """
+    cos_beta = np.cos(np.radians(result["helix_angle"]))
+    m1, m2, psi = result["m1"], result["m2"], result["psi"]
+    ratio_1 = result["z2_1"] / result["z1_1"]
+    ratio_2 = result["z2_2"] / result["z1_2"]
+    T1 = (P_kW * 9549) / n1
+    T2 = T1 * ratio_1 * eta_stage
+    n2 = n1 / ratio_1
+    n3 = n2 / ratio_2
+    d_gear1, d_gear2 = m1 * result["z2_1"] / cos_beta, m2 * result["z2_2"] / cos_beta
+    Wt1 = 2 * T1 * 1000 / (m1 * result["z1_1"] / cos_beta)
+    Wt2 = 2 * T2 * 1000 / (m2 * result["z1_2"] / cos_beta)
+
+    # 하우징 추정 (thermal_check 와 동일)
+    d_gear_max = np.maximum(d_gear1, d_gear2)
+    L = (result["a1"] + result["a2"]) * 1.3 / 1000
+    W = d_gear_max * 0.6 / 1000
+    H = d_gear_max * 0.5 / 1000
+    A = 2 * (L * W + W * H + H * L)
+
+    P = P_kW * 1000
+    P_mesh = P * (1 - eta_stage) + P * eta_stage * (1 - eta_stage)
+    cos_phi = np.cos(np.radians(spec.pressure_angle))
+    Fn1, Fn2 = Wt1 / cos_phi, Wt2 / cos_phi
+    gears = [(n2, d_gear1, psi * m1, F_DIP), (n3, d_gear2, psi * m2, F_DIP)]
+    shafts = [(np.broadcast_to(n1, n2.shape), result["d_input"], Fn1 / 2),
+              (n2, result["d_intermediate"], (Fn1 + Fn2) / 2),
+              (n3, result["d_output"], Fn2 / 2)]
+    th = housing_thermal(P_mesh, gears, shafts, A, L, H, spec.h_natural, spec.h_forced,
+                         spec.T_ambient, spec.T_max_oil, spec.oil_nu40, spec.oil_nu100)
+
+    out = np.empty(result.shape[0], dtype=THERMAL_DTYPE)
+    for name in THERMAL_DTYPE.names:
+        out[name] = th[name]
+    return out
+
+
+def candidate_grid(**axes):
+    """
+    축별 후보 값의 데카르트 곱을 1차원 배열들로 펼친다.
+    예: candidate_grid(z1_1=range(16, 25), m1=[2.5, 3.0]) -> {"z1_1": ..., "m1": ...}
+    """
+    names = list(axes)
+    mesh = np.meshgrid(*(np.asarray(list(v)) for v in axes.values()), indexing="ij")
+    return {name: grid.ravel() for name, grid in zip(names, mesh)}
+
+
+def feasible(result, SF_min=1.5, SH_min=1.2):
+    """모든 단이 안전율 기준을 만족하는 후보만 남긴다."""
+    ok = ((result["SF1"] >= SF_min) & (result["SH1"] >= SH_min)
+          & (result["SF2"] >= SF_min) & (result["SH2"] >= SH_min))
+    return result[ok]
+
+
+# ============================================================
+# 실행 예: 35:1 (1750 -> 50 RPM) 근방 후보 스윕
+# ============================================================
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    P_kW, n1, n_out = 10, 1750, 50
+    total_ratio = n1 / n_out
+
+    grid = candidate_grid(
+        z1_1=range(16, 25), z2_1=range(100, 141),
+        z1_2=range(17, 26), z2_2=range(80, 121, 2),
+        m1=[2.5, 3.0, 3.5], m2=[4.0, 4.5, 5.0],
+        helix_angle=[15, 20], psi=[10, 12],
+    )
+
+    t0 = time.perf_counter()
+    result = sweep_two_stage(P_kW, n1, **grid)
+    elapsed = time.perf_counter() - t0
+
+    # 감속비 허용 오차 2% + 안전율 만족 후보 중 총 중심거리 최소 순
+    ok = feasible(result[np.abs(result["ratio"] / total_ratio - 1) <= 0.02])
+    ok = ok[np.argsort(ok["a1"] + ok["a2"])]
+
+    print(f"평가 후보: {result.size:,}개, {elapsed:.2f} s "
+          f"({result.size / elapsed:,.0f} 후보/s)")
+    print(f"조건 만족: {ok.size:,}개")
+    print(f"{'z1_1':>5}{'z2_1':>5}{'m1':>5}{'z1_2':>5}{'z2_2':>5}{'m2':>5}"
+          f"{'beta':>6}{'psi':>5}{'i':>7}{'a1+a2':>8}{'SF1':>6}{'SH1':>6}{'SF2':>6}{'SH2':>6}")
+    for r in ok[:10]:
+        print(f"{r['z1_1']:>5}{r['z2_1']:>5}{r['m1']:>5.1f}{r['z1_2']:>5}{r['z2_2']:>5}"
+              f"{r['m2']:>5.1f}{r['helix_angle']:>6.0f}{r['psi']:>5.0f}{r['ratio']:>7.2f}"
+              f"{r['a1'] + r['a2']:>8.1f}{r['SF1']:>6.2f}{r['SH1']:>6.2f}"
+              f"{r['SF2']:>6.2f}{r['SH2']:>6.2f}")
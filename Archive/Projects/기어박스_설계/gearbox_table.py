@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+기어박스 설계 결과 열 단위(columnar) 저장소
+- 설계 1건마다 dict / GearboxResult 를 들고 있지 않고, 필드별 NumPy 배열 하나에 모아 저장
+  (결과 1건당 약 160 B, result_summary dict 는 약 2 KB)
+- 필터/정렬/상위 N 개 선택은 인덱스 배열 연산으로만 하고, 행 객체는 꺼낼 때만 만든다
+- 구조화 배열이면 무엇이든 감쌀 수 있다 (gearbox_sweep.SWEEP_DTYPE 스윕 결과 포함)
+
+    table = ResultTable.from_designs(design_gearbox(s) for s in specs)
+    ok = table.filter(table["SF1"] >= 1.5, cooling=COOLING_NATURAL).sort("a1")
+    best = ok.row(0)     # dict 1개
+"""
+import numpy as np
+
+from gearbox_design_agma import COOLING_FINS, COOLING_RESULTS
+
+# design_gearbox 결과 1건의 열 구성 (result_summary 와 같은 이름, 냉각 판정은 코드)
+RESULT_DTYPE = np.dtype([
+    ("P_kW", np.float64), ("n1", np.float64), ("actual_ratio", np.float64),
+    ("m1", np.float64), ("m2", np.float64),
+    ("a1", np.float64), ("a2", np.float64), ("b1", np.float64), ("b2", np.float64),
+    ("d_input", np.float64), ("d_intermediate", np.float64), ("d_output", np.float64),
+    ("SF1", np.float64), ("SH1", np.float64), ("SF2", np.float64), ("SH2", np.float64),
+    ("eta_total", np.float64), ("P_loss", np.float64), ("T_oil", np.float64),
+    ("cooling", np.int8), ("fin_count", np.int32),
+])
+
+
+def _design_row(r):
+    s1, s2 = r.stage1, r.stage2
+    return (r.spec.P_kW, r.spec.n1, r.actual_ratio, s1.m, s2.m, s1.a, s2.a, s1.b, s2.b,
+            r.d_input, r.d_intermediate, r.d_output, s1.SF, s1.SH, s2.SF, s2.SH,
+            r.eta_total, r.P_loss, r.thermal.T_oil,
+            COOLING_RESULTS.index(r.cooling_result), r.thermal.fin_count)
+
+
+class ResultTable:
+    """
+    구조화 배열 1개를 감싼 결과 표. 필터/정렬은 선택된 행만 담은 새 ResultTable 을
+    돌려주고 원래 표는 바꾸지 않는다.
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = np.asarray(data)
+        if self.data.dtype.names is None:
+            raise TypeError("ResultTable 은 구조화 배열(structured array)만 담는다")
+
+    # --------------------------------------------------------
+    # 생성
+    # --------------------------------------------------------
+    @classmethod
+    def from_designs(cls, results, dtype=RESULT_DTYPE):
+        """GearboxResult 반복자 -> 표 (결과 객체는 한 건씩 소비하고 보관하지 않음)"""
+        return cls(np.fromiter((_design_row(r) for r in results), dtype=dtype))
+
+    @classmethod
+    def concat(cls, tables):
+        """같은 dtype 의 표들을 이어 붙인다 (청크 단위 누적용)"""
+        return cls(np.concatenate([t.data for t in tables]))
+
+    # --------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __repr__(self):
+        return f"ResultTable({len(self)} rows, columns={self.columns})"
+
+    @property
+    def columns(self):
+        return self.data.dtype.names
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def __getitem__(self, key):
+        """표["열"] -> 열 배열 (뷰), 표[마스크/인덱스/슬라이스] -> 부분 표"""
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, (int, np.integer)):
+            return self.row(key)
+        return ResultTable(self.data[key])
+
+    def row(self, i):
+        """i 번째 행을 dict 로 (냉각 코드가 있으면 판정 문구/fin_needed 도 복원)"""
+        rec = {name: self.data[name][i].item() for name in self.columns}
+        if "cooling" in rec:
+            rec["cooling_result"] = COOLING_RESULTS[rec["cooling"]]
+            rec["fin_needed"] = rec["cooling"] >= COOLING_FINS
+        return rec
+
+    def rows(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    # --------------------------------------------------------
+    # 필터 / 정렬
+    # --------------------------------------------------------
+    def filter(self, mask=None, **equals):
+        """
+        불리언 마스크 그리고/또는 열=값 일치 조건을 모두 만족하는 행만 남긴다.
+        예: table.filter(table["SF1"] >= 1.5, cooling=0)
+        """
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for name, value in equals.items():
+            keep = keep & (self.data[name] == value)
+        return ResultTable(self.data[keep])
+
+    def sort(self, by, descending=False):
+        """
+        열 이름 (또는 이름 목록, 앞쪽이 우선) 기준 안정 정렬.
+        NaN 은 오름/내림차순 모두 맨 뒤.
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        order = np.lexsort([self._sort_key(k, descending) for k in reversed(keys)])
+        return ResultTable(self.data[order])
+
+    def top(self, n, by, descending=False):
+        """정렬 기준 상위 n 개 (전체 정렬 없이 np.partition 으로 후보를 먼저 추림)"""
+        if n >= len(self):
+            return self.sort(by, descending)
+        key = self._sort_key(by if isinstance(by, str) else by[0], descending)
+        # n 번째 값과 같은 값(동률)까지 남겨야 보조 정렬 키가 올바르게 적용된다
+        nth = np.partition(key, n - 1)[n - 1]
+        return ResultTable(self.data[key <= nth]).sort(by, descending)[:n]
+
+    def _sort_key(self, name, descending):
+        col = self.data[name]
+        if not np.issubdtype(col.dtype, np.number):
+            # 문자열 등은 정렬 순위(정수)로 바꿔 내림차순도 부호 반전으로 처리
+            rank = np.unique(col, return_inverse=True)[1].ravel()
+            return -rank if descending else rank
+        key = -col.astype(np.float64) if descending else col.astype(np.float64)
+        return np.where(np.isnan(key), np.inf, key)
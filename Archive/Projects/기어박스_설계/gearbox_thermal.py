@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+기어박스 열 평형 해석 - 오일 온도 반복 계산 및 방열 핀 설계
+- 손실: 기어 맞물림(단당 효율) + 교반(churning, ISO/TR 14179-1 식)
+        + 베어링(무부하 SKF 식 + 부하 마찰), 교반/베어링은 회전수와 오일 점도에 의존
+- 오일 점도: ISO VG 등급의 40/100 C 동점도로 Walther 식 보간
+- 열 평형 P_loss(T) = h * A_eff * (T - T_ambient) 를 가위치법으로 풀어 오일 온도 계산
+  (반복 횟수 상한 고정, 모든 입력이 배열이어도 동작)
+- 강제 대류로도 T_max_oil 을 넘으면 핀 높이/피치 격자에서 최소 체적 핀을 선정
+"""
+import functools
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+# 기본 물성/계수
+T_OIL_MAX_SEARCH = 250.0    # 평형 온도 탐색 상한 [C]
+N_ITER = 50                 # 평형 온도 반복 계산 최대 횟수
+TOL = 1e-9                  # 평형 온도 수렴 허용 오차 [K]
+A_G = 0.2                   # 교반 배치 상수 (ISO/TR 14179-1)
+F_DIP = 0.5                 # 기어 침지 계수 (완전 침지 = 1, 유욕 윤활 기어의 부분 침지)
+F0_BEARING = 2.0            # 베어링 무부하 토크 계수 (유욕 윤활)
+MU_BEARING = 0.0015         # 베어링 마찰 계수
+DM_RATIO = 1.5              # 베어링 피치원 직경 / 축 직경
+K_FIN = 50.0                # 핀 재질 열전도율 [W/m.K] (주철)
+T_FIN = 4.0                 # 핀 두께 [mm]
+FIN_HEIGHTS = np.arange(5.0, 85.0, 5.0)         # 핀 높이 후보 [mm]
+FIN_PITCHES = np.array([10.0, 12.5, 15.0, 20.0, 25.0])   # 핀 피치 후보 [mm]
+
+# 냉각 방식 코드 (housing_thermal)
+COOLING_NATURAL = 0         # 자연 대류로 충분
+COOLING_FAN = 1             # 냉각 팬
+COOLING_FINS = 2            # 방열 핀 + 냉각 팬
+COOLING_INSUFFICIENT = 3    # 핀 후보 범위로도 부족 (오일 쿨러)
+
+
+@dataclass(slots=True)
+class ThermalResult:
+    """열 평형 해석 결과 (GearboxResult [8]절)"""
+    T_oil_natural: float        # 자연 대류 평형 오일 온도 [C]
+    T_oil_forced: float         # 강제 대류 평형 오일 온도 [C]
+    T_oil: float                # 선정된 냉각 방식의 평형 오일 온도 [C]
+    P_mesh: float               # 맞물림 손실 [W]
+    P_churn: float              # 교반 손실 [W] (T_oil 기준)
+    P_bearing: float            # 베어링 손실 [W] (T_oil 기준)
+    fin_count: int = 0          # 방열 핀 수 (양 측면 합)
+    fin_height: float = 0.0     # 핀 높이 [mm]
+    fin_pitch: float = 0.0      # 핀 피치 [mm]
+    fin_ok: bool = True         # 핀 후보 범위 안에서 T_max_oil 만족 여부
+
+
+# ============================================================
+# 손실 모델 (모두 배열 입력 가능)
+# ============================================================
+@functools.lru_cache(maxsize=64)
+def _walther(nu40, nu100):
+    """Walther 식 계수 (A, B): log log(nu + 0.7) = A - B log T[K]"""
+    x40, x100 = math.log10(313.15), math.log10(373.15)
+    y40 = math.log10(math.log10(nu40 + 0.7))
+    y100 = math.log10(math.log10(nu100 + 0.7))
+    B = (y40 - y100) / (x100 - x40)
+    return y40 + B * x40, B
+
+
+def oil_viscosity(T_oil, nu40=220.0, nu100=19.4):
+    """ISO VG 등급 40/100 C 동점도로 보간한 T_oil [C] 에서의 동점도 [mm2/s]"""
+    A, B = _walther(nu40, nu100)
+    log10 = math.log10 if isinstance(T_oil, (int, float)) else np.log10
+    return 10 ** (10 ** (A - B * log10(T_oil + 273.15))) - 0.7
+
+
+def churning_loss(nu, n, D, b, f_g=1.0):
+    """
+    기어 교반 손실 [W] (ISO/TR 14179-1, 외경면 + 측면)
+    nu: 동점도 [mm2/s], n: 회전수 [RPM], D: 직경 [mm], b: 이폭 [mm], f_g: 침지 계수
+    """
+    n3 = n ** 3
+    P_rim = 7.37 * f_g * nu * n3 * D ** 4.7 * b / (A_G * 1e26)
+    P_face = 1.474 * f_g * nu * n3 * D ** 5.7 / (A_G * 1e26)
+    return (P_rim + P_face) * 1000
+
+
+def bearing_loss(nu, n, d_shaft, F):
+    """
+    베어링 1개 손실 [W] = (무부하 토크 + 부하 마찰 토크) x 각속도
+    d_shaft: 축 직경 [mm], F: 베어링 반경 하중 [N]
+    """
+    dm = DM_RATIO * d_shaft
+    # nu*n < 2000 에서는 상수 (160e-7 ~= 1e-7 * 2000^(2/3), 연속이 되도록 하한 처리)
+    M0 = 1e-7 * F0_BEARING * np.maximum(nu * n, 2000) ** (2 / 3) * dm ** 3   # [N.mm]
+    M1 = MU_BEARING * F * d_shaft / 2                        # [N.mm]
+    return (M0 + M1) / 1000 * (2 * math.pi * n / 60)
+
+
+def _loss_model(gears, shafts):
+    """
+    교반/베어링 손실을 점도만의 함수로 (반복 계산 안에서 기어/축 항을 다시 계산하지 않도록)
+    교반 손실은 점도에 비례, 베어링 무부하 손실은 (nu*n)^(2/3) 에 비례.
+    """
+    C_churn = sum(churning_loss(1.0, n, D, b, f_g) for n, D, b, f_g in gears)
+    # 축당 베어링 2개: 부하 마찰 손실 (점도 무관) 과 무부하 손실 계수
+    P_load = sum(2 * MU_BEARING * F * d / 2 / 1000 * (2 * math.pi * n / 60)
+                 for n, d, F in shafts)
+    K0 = [(n, 2 * 1e-7 * F0_BEARING * (DM_RATIO * d) ** 3 / 1000 * (2 * math.pi * n / 60))
+          for n, d, _ in shafts]
+
+    def losses(nu):
+        P_bearing = P_load
+        for n, k in K0:
+            vn = nu * n
+            P_bearing = P_bearing + k * (max(vn, 2000) if isinstance(vn, float)
+                                         else np.maximum(vn, 2000)) ** (2 / 3)
+        return C_churn * nu, P_bearing
+    return losses
+
+
+def speed_losses(T_oil, gears, shafts, nu40=220.0, nu100=19.4):
+    """
+    오일 온도 T_oil 에서의 (교반 손실, 베어링 손실) [W]
+    gears: [(n, D, b, f_g), ...], shafts: [(n, d_shaft, F_bearing), ...] (축당 베어링 2개)
+    """
+    return _loss_model(gears, shafts)(oil_viscosity(T_oil, nu40, nu100))
+
+
+def _all_scalar(*values):
+    return not any(isinstance(v, np.ndarray) for x in values
+                   for v in (x if isinstance(x, tuple) else (x,)))
+
+
+def _illinois_scalar(surplus, a, b, n_iter, tol):
+    """solve_oil_temperature 의 스칼라 경로 (배열 연산 부담 없이 같은 반복)"""
+    fa, fb = surplus(a), surplus(b)
+    if fb > 0:
+        return b
+    for _ in range(n_iter):
+        if fb == fa:
+            break
+        c = b - fb * (b - a) / (fb - fa)
+        fc = surplus(c)
+        if fc * fb > 0:
+            fa /= 2
+        else:
+            a, fa = b, fb
+        step, b, fb = abs(c - b), c, fc
+        if step < tol:
+            break
+    return b
+
+
+def solve_oil_temperature(P_mesh, gears, shafts, hA, T_ambient,
+                          nu40=220.0, nu100=19.4, n_iter=N_ITER, tol=TOL):
+    """
+    열 평형 오일 온도 [C] (Illinois 가위치법, 최대 n_iter 회)
+    P_mesh + P_churn(T) + P_bearing(T) = hA * (T - T_ambient)
+    손실은 온도에 따라 감소(점도 감소)하므로 [T_ambient, T_OIL_MAX_SEARCH] 에 근이 하나.
+    hA: 열전달계수 x 유효 면적 [W/K]. 상한에서도 평형이 안 되면 상한값을 돌려준다.
+    """
+    losses = _loss_model(gears, shafts)
+
+    def surplus(T):
+        P_churn, P_bearing = losses(oil_viscosity(T, nu40, nu100))
+        return P_mesh + P_churn + P_bearing - hA * (T - T_ambient)
+
+    if _all_scalar(P_mesh, hA, T_ambient, *gears, *shafts):
+        return _illinois_scalar(surplus, float(T_ambient), T_OIL_MAX_SEARCH, n_iter, tol)
+
+    shape = np.broadcast(P_mesh, hA, T_ambient).shape
+    a = np.broadcast_to(np.asarray(T_ambient, dtype=float), shape)
+    b = np.full(shape, T_OIL_MAX_SEARCH)
+    fa, fb = surplus(a), surplus(b)
+    saturated = fb > 0
+    for _ in range(n_iter):
+        den = fb - fa
+        c = b - fb * (b - a) / np.where(den == 0, 1.0, den)   # den=0 이면 fa=fb=0 (수렴)
+        fc = surplus(c)
+        same = fc * fb > 0
+        # 근이 같은 쪽에 남으면 반대 끝 값을 절반으로 (Illinois 수정)
+        a, fa = np.where(same, a, b), np.where(same, fa / 2, fb)
+        step, b, fb = np.abs(c - b), c, fc
+        if np.all(step < tol):
+            break
+    return np.where(saturated, T_OIL_MAX_SEARCH, b)
+
+
+# ============================================================
+# 방열 핀
+# ============================================================
+def fin_area(L, H, fin_height, fin_pitch, h):
+    """
+    양 측면(L x H)에 길이 방향 핀을 붙였을 때 추가 유효 면적 [m2] 과 핀 수
+    L, H: 하우징 길이/높이 [m], fin_height/pitch: [mm], h: 열전달계수 [W/m2.K]
+    """
+    count = 2 * np.floor(H * 1000 / fin_pitch)
+    mH = np.sqrt(2 * h / (K_FIN * T_FIN / 1000)) * fin_height / 1000
+    eta_fin = np.tanh(mH) / mH
+    per_fin = L * (2 * fin_height * eta_fin - T_FIN) / 1000     # 핀면 - 핀 밑면
+    return count * per_fin, count
+
+
+def size_fins(P_mesh, gears, shafts, A_housing, L, H, h, T_ambient, T_max_oil,
+              nu40=220.0, nu100=19.4):
+    """
+    T_max_oil 을 만족하는 최소 체적 핀 (높이 x 피치 격자 탐색)
+    평형 온도는 유효 면적에 대해 단조 감소하므로, 격자점마다 열 평형을 풀지 않고
+    T_max_oil 에서의 손실로 필요 면적을 구해 비교한 뒤 선정된 핀만 평형 온도를 계산한다.
+    반환: (핀 수, 높이 [mm], 피치 [mm], 만족 여부, 핀 적용 오일 온도 [C]) - 배열
+    만족하는 격자점이 없으면 가장 큰 핀 면적 후보와 fin_ok=False.
+    """
+    A_housing, L, H = np.atleast_1d(A_housing, L, H)
+    P_churn, P_bearing = _loss_model(gears, shafts)(oil_viscosity(T_max_oil, nu40, nu100))
+    A_req = np.atleast_1d((P_mesh + P_churn + P_bearing) / (h * (T_max_oil - T_ambient)))
+
+    fh, fp = np.meshgrid(FIN_HEIGHTS, FIN_PITCHES, indexing="ij")
+    fh, fp = fh.ravel(), fp.ravel()
+    A_fin, count = fin_area(L[:, None], H[:, None], fh[None, :], fp[None, :], h)
+    volume = count * fh[None, :] * T_FIN * L[:, None]
+    ok = A_housing[:, None] + A_fin >= A_req[:, None]
+
+    best = np.where(ok, volume, np.inf).argmin(axis=1)
+    fin_ok = ok.any(axis=1)
+    pick = np.where(fin_ok, best, A_fin.argmax(axis=1))
+    rows = np.arange(A_housing.shape[0])
+    T = solve_oil_temperature(P_mesh, gears, shafts, h * (A_housing + A_fin[rows, pick]),
+                              T_ambient, nu40, nu100)
+    return count[rows, pick], fh[pick], fp[pick], fin_ok, T
+
+
+def housing_thermal(P_mesh, gears, shafts, A_housing, L, H, h_natural, h_forced,
+                    T_ambient, T_max_oil, nu40=220.0, nu100=19.4):
+    """
+    후보 하우징 배열 전체의 평형 오일 온도, 냉각 방식, 방열 핀 (설계 스윕용)
+    P_mesh, gears/shafts 의 각 값, A_housing/L/H 는 같은 길이로 브로드캐스트 가능한 배열,
+    열전달계수/온도는 스칼라. cooling: COOLING_* 코드.
+    """
+    A_housing, L, H = np.broadcast_arrays(*np.atleast_1d(A_housing, L, H))
+    oil = dict(nu40=nu40, nu100=nu100)
+    T_nat = solve_oil_temperature(P_mesh, gears, shafts, h_natural * A_housing, T_ambient, **oil)
+    T_forced = solve_oil_temperature(P_mesh, gears, shafts, h_forced * A_housing, T_ambient, **oil)
+
+    n = A_housing.shape[0]
+    cooling = np.where(T_nat <= T_max_oil, COOLING_NATURAL, COOLING_FAN)
+    T_oil = np.where(T_nat <= T_max_oil, T_nat, T_forced)
+    fin_count = np.zeros(n, dtype=int)
+    fin_height, fin_pitch = np.zeros(n), np.zeros(n)
+
+    need = T_forced > T_max_oil
+    if need.any():
+        pick = lambda x: np.broadcast_to(x, (n,))[need]
+        count, height, pitch, ok, T_fin = size_fins(
+            pick(P_mesh), [tuple(pick(v) for v in g) for g in gears],
+            [tuple(pick(v) for v in s) for s in shafts],
+            A_housing[need], L[need], H[need], h_forced, T_ambient, T_max_oil, **oil)
+        cooling[need] = np.where(ok, COOLING_FINS, COOLING_INSUFFICIENT)
+        T_oil[need] = T_fin
+        fin_count[need], fin_height[need], fin_pitch[need] = count, height, pitch
+
+    P_churn, P_bearing = speed_losses(T_oil, gears, shafts, **oil)
+    return dict(T_oil_natural=T_nat, T_oil_forced=T_forced, T_oil=T_oil,
+                P_loss=P_mesh + P_churn + P_bearing, cooling=cooling,
+                fin_count=fin_count, fin_height=fin_height, fin_pitch=fin_pitch)
+
+
+# ============================================================
+# 2단 기어박스 적용 (gearbox_design_agma.thermal_check)
+# ============================================================
+def gearbox_thermal(spec, stage1, stage2, shafts, A_housing, L, H):
+    """
+    GearboxSpec, StageResult 2개, 축 [(n, d_shaft), ...] (입력/중간/출력) 과
+    하우징 치수 [m] 로 평형 오일 온도, 냉각 방식, 방열 핀을 결정한다.
+    """
+    P = spec.P_kW * 1000
+    P_mesh = P * (1 - spec.eta_gear) + P * spec.eta_gear * (1 - spec.eta_gear)
+    # 큰 기어만 오일에 잠기는 것으로 본다 (피니언 침지 계수 0)
+    gears = [(stage1.n / stage1.ratio, stage1.d_gear, stage1.b, F_DIP),
+             (stage2.n / stage2.ratio, stage2.d_gear, stage2.b, F_DIP)]
+    # 베어링 반경 하중: 축에 걸리는 치면 법선력의 절반
+    cos_phi = math.cos(math.radians(spec.pressure_angle))
+    Fn1, Fn2 = stage1.Wt / cos_phi, stage2.Wt / cos_phi
+    loads = (Fn1 / 2, (Fn1 + Fn2) / 2, Fn2 / 2)
+    shaft_loads = [(n, d, F) for (n, d), F in zip(shafts, loads)]
+    oil = dict(nu40=spec.oil_nu40, nu100=spec.oil_nu100)
+
+    T_nat, T_forced = (
+        solve_oil_temperature(P_mesh, gears, shaft_loads, h * A_housing, spec.T_ambient, **oil)
+        for h in (spec.h_natural, spec.h_forced))
+    fins = {}
+    if T_nat <= spec.T_max_oil:
+        T_oil = T_nat
+    elif T_forced <= spec.T_max_oil:
+        T_oil = T_forced
+    else:
+        # 핀은 팬과 함께 쓰는 것으로 보고 강제 대류 열전달계수로 선정
+        count, height, pitch, ok, T_fin = size_fins(
+            P_mesh, gears, shaft_loads, A_housing, L, H, spec.h_forced,
+            spec.T_ambient, spec.T_max_oil, **oil)
+        T_oil = float(T_fin[0])
+        fins = dict(fin_count=int(count[0]), fin_height=float(height[0]),
+                    fin_pitch=float(pitch[0]), fin_ok=bool(ok[0]))
+
+    P_churn, P_bearing = speed_losses(T_oil, gears, shaft_loads, **oil)
+    return ThermalResult(
+        T_oil_natural=T_nat, T_oil_forced=T_forced, T_oil=T_oil,
+        P_mesh=P_mesh, P_churn=float(P_churn), P_bearing=float(P_bearing), **fins,
+    )
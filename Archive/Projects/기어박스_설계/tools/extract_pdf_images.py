@@ -2,110 +2,675 @@
 PDF 이미지 추출 스크립트
 - PyMuPDF(fitz)를 사용하여 PDF에서 이미지를 추출
 - 각 이미지를 PNG로 저장하고 위치 정보를 JSON으로 출력
+- --format: png(기본, 전부 300dpi PNG 로 변환) | auto(PNG/JPEG 는 원본 그대로, 나머지만 PNG 변환)
+  | original(변환 없이 PDF 안의 원본 바이트 그대로). 저장한 확장자는 JSON 의 ext
+- --workers N: 페이지 범위를 N 개 프로세스에 나눠 병렬 추출 (프로세스마다 PDF 를 따로 연다).
+  그림 번호(figN)는 작업자 수와 관계없이 페이지 순서대로 같다.
+- 중복 제거: 같은 이미지(xref)는 처음 나온 페이지에서 한 번만 추출하고, 다른 xref 라도
+  내용(원본 바이트 sha256)이 같으면 파일 1개로 합친다. 나온 위치는 전부 occurrences 에
+  [{"page", "bbox"}, ...] 로 기록 (page/bbox 는 첫 위치).
+- 크기 필터(MIN_SIZE)는 이미지 목록의 가로/세로로 먼저 걸러 작은 이미지는 추출하지 않고,
+  페이지 이미지 위치는 get_image_info 한 번으로 색인한다 (이미지 디코딩 없음, 크기가 겹치거나
+  인라인 이미지가 있으면 그 크기만 get_image_rects).
+- --ndjson: 이미지 파일을 저장하는 대로 JSON 한 줄씩 출력 (type: image | occurrence),
+  마지막 줄은 {"type": "summary", "total_images"}. 받는 쪽은 PDF 전체를 기다리지 않는다.
+- --hash-index FILE: 내용 해시 -> 저장 파일 색인. 여러 PDF 에서 같은 색인을 쓰면 이미 저장한
+  이미지는 다시 쓰지 않고 그 파일을 가리킨다 (JSON 의 shared, filename 은 출력 디렉토리 기준 경로).
+- 볼트 모드 (PDF 경로 대신 폴더): 아래 PDF 를 모두 찾아 새로 생겼거나 바뀐 것만 PDF 여러 개를
+  동시에 추출한다. 출력 루트의 .pdf_manifest.json 에 PDF 별 크기/수정 시각/내용 해시를 두고
+  비교하므로, 바뀐 것이 없으면 PDF 를 열지 않고 끝난다. PDF 마다 <출력 루트>/<볼트 상대 경로>/
+  에 이미지와 images.json (단일 PDF 모드의 출력 JSON) 을 저장하고, 표준 출력은 요약 JSON.
+  다른 PDF 가 가리키는 이미지는 덮어쓰지 않고, 더 이상 쓰이지 않는 파일은 요약의 unreferenced.
+
+사용법:
+    python extract_pdf_images.py <PDF경로> <출력디렉토리> [--workers 4] [--format auto]
+                                 [--hash-index Files/.image_hashes.json] [--ndjson]
+    python extract_pdf_images.py <볼트 폴더> <출력 루트> [--include Attachments References Seminars]
+                                 [--workers 4] [--format auto] [--ndjson]
 """
 
+import argparse
+import hashlib
 import sys
 import json
 import os
+import re
+import time
+from multiprocessing import Pool
 from pathlib import Path
 
-import fitz  # PyMuPDF
+try:
+    import pymupdf as fitz  # PyMuPDF 1.24.3+ (import fitz 는 stdout 에 경고를 출력해 JSON 을 깨뜨림)
+except ImportError:
+    import fitz  # PyMuPDF
 from PIL import Image
 import io
 
+MIN_SIZE = 50               # 이보다 작은 이미지(px)는 아이콘/장식으로 보고 건너뜀
+CHUNKS_PER_WORKER = 4       # 작업자당 페이지 묶음 수 (페이지마다 이미지 수가 달라 잘게 나눔)
+FORMATS = ("png", "auto", "original")
+PASSTHROUGH_EXTS = {"png", "jpg", "jpeg"}   # auto 모드에서 변환 없이 쓰는 원본 형식 (노트에서 바로 보임)
+MANIFEST_FILE = ".pdf_manifest.json"       # 볼트 모드: PDF 별 크기/수정 시각/내용 해시 (출력 루트)
+HASH_INDEX_FILE = ".image_hashes.json"      # 볼트 모드 기본 내용 해시 색인 (출력 루트)
+RESULT_FILE = "images.json"                 # 볼트 모드: PDF 별 추출 결과 (각 출력 디렉토리)
+
+
+def _page_chunks(n_pages, n_chunks):
+    """[0, n_pages) 를 연속된 페이지 범위 n_chunks 개로"""
+    n_chunks = max(1, min(n_chunks, n_pages))
+    bounds = [n_pages * i // n_chunks for i in range(n_chunks + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(n_chunks)]
+
+
+def _rect_dict(rect):
+    return {
+        "x0": round(rect.x0, 1),
+        "y0": round(rect.y0, 1),
+        "x1": round(rect.x1, 1),
+        "y1": round(rect.y1, 1),
+    }
+
+
+# ============================================================
+# 내용 해시 색인 (여러 PDF 사이 중복 제거)
+# ============================================================
+def _load_json(path):
+    """JSON 파일 내용 (파일이 없거나 깨졌으면 빈 dict)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _dump_json(path, data, indent=None):
+    """임시 파일에 쓴 뒤 이름 바꾸기 (중간에 멈춰도 이전 내용이 남음)"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
+def load_hash_index(path):
+    """{내용 해시: {"path", "size", "mtime_ns"}} (파일이 없거나 깨졌으면 빈 색인)"""
+    return _load_json(path)
+
+
+def save_hash_index(path, index):
+    _dump_json(path, index)
+
+
+def _index_lookup(index, digest):
+    """색인의 파일이 등록 이후 바뀌지 않았으면 그 경로 (덮어쓴 figN 등은 무효)"""
+    entry = index.get(digest)
+    if entry is None:
+        return None
+    try:
+        st = os.stat(entry["path"])
+    except OSError:
+        return None
+    if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+        return None
+    return entry["path"]
+
+
+def _index_add(index, digest, path):
+    st = os.stat(path)
+    index[digest] = {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _stem_key(path):
+    return os.path.normcase(os.path.splitext(os.path.abspath(path))[0])
+
+
+def _own_index(path, output_dir):
+    """path 가 output_dir 바로 아래의 figN 파일이면 N, 아니면 None"""
+    if os.path.normcase(os.path.dirname(os.path.abspath(path))) \
+            != os.path.normcase(os.path.abspath(output_dir)):
+        return None
+    match = re.fullmatch(r"fig(\d+)", os.path.splitext(os.path.basename(path))[0])
+    return int(match.group(1)) if match else None
+
+
+def _index_stems(index):
+    """색인이 가리키는 파일의 확장자 뺀 절대 경로 (다른 기록이 쓰고 있으므로 덮어쓰면 안 됨)"""
+    return {_stem_key(entry["path"]) for entry in index.values()}
+
+
+# ============================================================
+# 추출
+# ============================================================
+def _save_image(image_bytes, image_ext, save_stem, image_format):
+    """
+    이미지 1개 저장. 반환: 실제로 저장한 확장자
+    원본을 그대로 쓸 수 있으면 디코딩 없이 바이트를 바로 쓰고, 변환할 때만 PIL 을 거친다.
+    """
+    if image_format == "original" or (image_format == "auto" and image_ext in PASSTHROUGH_EXTS):
+        with open(f"{save_stem}.{image_ext}", "wb") as f:
+            f.write(image_bytes)
+        return image_ext
+
+    # PNG로 변환하여 저장
+    try:
+        pil_image = Image.open(io.BytesIO(image_bytes))
+        # 300dpi 메타데이터 설정
+        pil_image.save(f"{save_stem}.png", "PNG", dpi=(300, 300))
+        return "png"
+    except Exception:
+        # PIL 변환 실패 시 원본 바이트를 원래 확장자로 저장
+        with open(f"{save_stem}.{image_ext}", "wb") as f:
+            f.write(image_bytes)
+        return image_ext
+
+
+def _page_images(page):
+    """
+    페이지 이미지 목록 중 MIN_SIZE 이상만 (get_images 의 가로/세로 = 이미지 사전의 Width/Height,
+    추출 전에 작은 아이콘/장식을 거른다). 같은 xref 는 한 번만.
+    """
+    seen = set()
+    images = []
+    for img_info in page.get_images(full=True):
+        xref, width, height = img_info[0], img_info[2], img_info[3]
+        if width < MIN_SIZE or height < MIN_SIZE or xref in seen:
+            continue
+        seen.add(xref)
+        images.append(img_info)
+    return images
+
+
+def _draw_counts(page, all_images):
+    """
+    {xref: 페이지 내용 스트림에서 그 이미지를 그리는 횟수 ("/이름 Do" 개수)}.
+    폼 XObject 안에서 그리는 xref (referencer != 0) 는 셀 수 없으므로 None.
+    """
+    content = page.read_contents()
+    counts = {}
+    for img_info in all_images:
+        xref, name, referencer = img_info[0], img_info[7], img_info[9]
+        if referencer or counts.get(xref, 0) is None:
+            counts[xref] = None
+            continue
+        pattern = rb"/" + re.escape(name.encode("latin-1", "replace")) + rb"\s+Do\b"
+        counts[xref] = counts.get(xref, 0) + len(re.findall(pattern, content))
+    return counts
+
+
+def _page_bboxes(page, image_list):
+    """
+    페이지 이미지 위치 색인 {xref: [bbox, ...]} (그린 순서).
+    get_image_info 한 번으로 전체 그리기 위치를 얻고 (디코딩 없음), xref 는 (가로, 세로) 로 맞춘다.
+    크기만으로는 인라인 이미지 (xref 0) 나 이미지 목록에 없는 그리기와 구별되지 않으므로,
+    그 크기의 그리기 수가 내용 스트림의 "Do" 횟수와 같을 때만 믿는다. 그 밖에는
+    get_image_rects (이미지 디코딩 후 MD5 비교) 로 구한다:
+    - 같은 크기의 xref 가 둘 이상
+    - 그리기 수와 Do 횟수가 다름 (같은 크기의 인라인 이미지, 폼 XObject 안의 그리기 등)
+    - 이미지 목록에 없는 크기의 그리기가 있음 (인라인 이미지가 있는 페이지 - 이때는 모든 크기)
+    한계: 폼 XObject 안에서 그리는 이미지는 Do 횟수를 셀 수 없어 항상 get_image_rects 로 간다.
+    """
+    all_images = page.get_images(full=True)
+    by_size = {}
+    for img_info in image_list:
+        by_size.setdefault((img_info[2], img_info[3]), []).append(img_info[0])
+    draws = {}
+    for info in page.get_image_info():
+        draws.setdefault((info["width"], info["height"]), []).append(fitz.Rect(info["bbox"]))
+    listed = {(img_info[2], img_info[3]) for img_info in all_images}
+    trusted = listed.issuperset(draws)
+    counts = _draw_counts(page, all_images) if trusted else {}
+    bboxes = {}
+    for size, xrefs in by_size.items():
+        rects = draws.get(size, [])
+        if trusted and len(xrefs) == 1 and counts.get(xrefs[0]) == len(rects):
+            bboxes[xrefs[0]] = [_rect_dict(r) for r in rects]
+        else:
+            for xref in xrefs:
+                bboxes[xref] = [_rect_dict(r) for r in page.get_image_rects(xref)]
+    return bboxes
+
+
+def _first_pages(doc):
+    """{xref: 처음 나오는 페이지 번호(0 부터)} (이미지를 디코딩하지 않는 목록 조회만)"""
+    first = {}
+    for page_num in range(len(doc)):
+        for img_info in _page_images(doc[page_num]):
+            first.setdefault(img_info[0], page_num)
+    return first
+
+
+def _iter_pages(pdf_path, output_dir, start, stop, image_format="png", first_page=None):
+    """
+    페이지 [start, stop) 를 한 페이지씩 처리하는 생성기. 처음 나오는 페이지가 이 범위인 xref 만
+    추출해 임시 파일명으로 저장하고 (같은 내용은 범위 안에서 한 번만 저장), 위치를 모은다.
+    페이지마다 (이미지 목록, 위치 목록 [(page, xref, bbox), ...]) 를 내보낸다.
+    그림 번호와 범위 사이 중복 제거는 iter_images 에서 한다.
+    """
+    doc = fitz.open(str(pdf_path))
+    try:
+        if first_page is None:
+            first_page = _first_pages(doc)
+        written = {}        # 내용 해시 -> 임시 파일명 (이 범위에서 저장한 것)
+
+        for page_num in range(start, stop):
+            page = doc[page_num]
+            image_list = _page_images(page)     # 너무 작은 이미지는 아이콘/장식이므로 제외
+            if not image_list:
+                continue
+            bboxes = _page_bboxes(page, image_list)
+            images_info = []
+            occurrences = []
+
+            for img_index, img_info in enumerate(image_list):
+                xref = img_info[0]
+
+                # 페이지 내 이미지 위치(bbox) - 같은 이미지가 여러 번 그려지면 전부
+                for bbox in bboxes[xref] or [None]:
+                    occurrences.append((page_num + 1, xref, bbox))
 
-def extract_images(pdf_path: str, output_dir: str) -> list[dict]:
-    """PDF에서 이미지를 추출하여 output_dir에 저장하고 메타데이터를 반환한다."""
+                # 앞 페이지(다른 범위 포함)에서 이미 처리한 xref
+                if first_page.get(xref) != page_num:
+                    continue
+
+                try:
+                    base_image = doc.extract_image(xref)
+                except Exception:
+                    continue
+
+                image_bytes = base_image["image"]
+                image_ext = base_image["ext"]
+                width = base_image["width"]
+                height = base_image["height"]
+
+                digest = hashlib.sha256(image_bytes).hexdigest()
+                tmp_name = written.get(digest)
+                if tmp_name is None:
+                    tmp_stem = f".part-p{page_num + 1}-{img_index}"
+                    ext = _save_image(image_bytes, image_ext, output_dir / tmp_stem, image_format)
+                    tmp_name = written[digest] = f"{tmp_stem}.{ext}"
+
+                images_info.append({
+                    "xref": xref,
+                    "tmp_name": tmp_name,
+                    "page": page_num + 1,
+                    "width": width,
+                    "height": height,
+                    "ext": os.path.splitext(tmp_name)[1][1:],
+                    "original_ext": image_ext,
+                    "hash": digest,
+                })
+
+            yield images_info, occurrences
+    finally:
+        doc.close()
+
+
+def _extract_chunk(args):
+    return list(_iter_pages(*args))
+
+
+def iter_images(pdf_path: str, output_dir: str, workers: int = 1,
+                image_format: str = "png", hash_index: dict | None = None):
+    """
+    PDF에서 이미지를 페이지 순서대로 추출하며 결과를 바로 내보내는 생성기.
+      ("image", 기록)       : 새 이미지 파일을 저장했을 때 (occurrences 는 첫 페이지의 위치)
+      ("occurrence", 위치)  : 앞서 내보낸 이미지가 뒤 페이지에 다시 나올 때
+                              {"index", "filename", "page", "bbox"}
+    workers > 1 이면 페이지 범위를 나눠 프로세스 풀에서 추출한다 (범위 단위로 내보냄).
+    image_format 은 FORMATS 중 하나 (모듈 설명 참고).
+    hash_index (load_hash_index) 를 주면 이미 저장된 같은 내용의 이미지를 재사용하고,
+    새로 저장한 이미지를 등록한다 (저장은 호출한 쪽에서 save_hash_index).
+    색인이 가리키는 파일은 다른 기록(이전 실행, 다른 PDF)이 쓰고 있으므로 그 figN 번호는
+    건너뛰고 다음 번호로 저장한다 (덮어쓰지 않음). 색인이 이 output_dir 의 figN 을 가리키면
+    (바뀐 PDF 를 다시 추출) 공유가 아니라 자기 파일로 기록한다 (index = N, shared 없음).
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f"알 수 없는 출력 형식: {image_format} (가능: {', '.join(FORMATS)})")
     pdf_path = Path(pdf_path)
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    doc = fitz.open(str(pdf_path))
-    images_info = []
+    with fitz.open(str(pdf_path)) as doc:
+        n_pages = len(doc)
+        first_page = _first_pages(doc)
+    chunks = [(pdf_path, output_dir, start, stop, image_format, first_page)
+              for start, stop in _page_chunks(n_pages, workers * CHUNKS_PER_WORKER)]
+    workers = max(1, min(workers, len(chunks)))
+
+    if workers == 1:
+        # 한 프로세스면 범위를 나누지 않고 페이지마다 바로 내보낸다
+        pages = _iter_pages(pdf_path, output_dir, 0, n_pages, image_format, first_page)
+    else:
+        pool = Pool(workers)
+        # 묶음 결과는 페이지 순서대로 -> 그림 번호가 작업자 수와 무관
+        pages = (page for chunk in pool.imap(_extract_chunk, chunks) for page in chunk)
+
+    by_xref = {}        # xref -> 기록 (내용이 같은 xref 는 같은 기록)
+    by_hash = {}        # 내용 해시 -> 기록
     img_counter = 0
+    taken = _index_stems(hash_index) if hash_index is not None else set()
+    try:
+        for page_images, page_occurrences in pages:
+            new = {}        # 이 페이지에서 처음 나온 기록 (id -> 기록)
+            for info in page_images:
+                tmp_path = output_dir / info.pop("tmp_name")
+                record = by_hash.get(info["hash"])
+                if record is None:
+                    shared = _index_lookup(hash_index, info["hash"]) if hash_index is not None else None
+                    own = _own_index(shared, output_dir) if shared is not None else None
+                    if own is not None:
+                        # 이 출력 디렉토리의 figN (같은 PDF 를 다시 추출) -> 공유가 아니라 자기 파일
+                        index, filename, shared = own, os.path.basename(shared), None
+                    elif shared is not None:
+                        index, filename = None, os.path.relpath(shared, output_dir)
+                    else:
+                        img_counter += 1
+                        while _stem_key(output_dir / f"fig{img_counter}") in taken:
+                            img_counter += 1
+                        index, filename = img_counter, f"fig{img_counter}.{info['ext']}"
+                        os.replace(tmp_path, output_dir / filename)
+                        if hash_index is not None:
+                            _index_add(hash_index, info["hash"], output_dir / filename)
+                    record = {"index": index, "filename": filename, **info,
+                              "bbox": None, "occurrences": []}
+                    if shared is not None:
+                        record["shared"] = True
+                    del record["xref"]
+                    by_hash[info["hash"]] = new[id(record)] = record
+                if tmp_path.exists():
+                    tmp_path.unlink()   # 다른 범위/PDF 에서 이미 저장한 내용
+                by_xref[info["xref"]] = record
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        image_list = page.get_images(full=True)
+            for page, xref, bbox in page_occurrences:
+                record = by_xref.get(xref)
+                if record is None:
+                    continue        # 추출 실패
+                if id(record) in new:
+                    if not record["occurrences"]:
+                        record["bbox"] = bbox
+                    record["occurrences"].append({"page": page, "bbox": bbox})
+                else:
+                    yield "occurrence", {"index": record["index"], "filename": record["filename"],
+                                         "page": page, "bbox": bbox}
+            for record in new.values():
+                yield "image", record
+    finally:
+        if workers > 1:
+            pool.terminate()    # 다 읽었으면 이미 끝난 상태, 중간에 멈추면 남은 묶음 취소
+            pool.join()
 
-        for img_index, img_info in enumerate(image_list):
-            xref = img_info[0]
 
-            try:
-                base_image = doc.extract_image(xref)
-            except Exception:
-                continue
+def extract_images(pdf_path: str, output_dir: str, workers: int = 1,
+                   image_format: str = "png", hash_index: dict | None = None) -> list[dict]:
+    """
+    PDF에서 이미지를 추출하여 output_dir에 저장하고 메타데이터를 반환한다.
+    인자는 iter_images 와 같고, 각 기록의 occurrences 에 모든 위치를 모은다.
+    """
+    images_info = []
+    by_filename = {}
+    for kind, item in iter_images(pdf_path, output_dir, workers, image_format, hash_index):
+        if kind == "image":
+            images_info.append(item)
+            by_filename[item["filename"]] = item
+        else:
+            by_filename[item["filename"]]["occurrences"].append(
+                {"page": item["page"], "bbox": item["bbox"]})
+    return images_info
+
+
+
+# ============================================================
+# 볼트 전체 (바뀐 PDF 만 다시 추출)
+# ============================================================
+def _file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
 
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-            width = base_image["width"]
-            height = base_image["height"]
+def find_pdfs(root, include=None, skip=()):
+    """
+    root 아래 PDF 의 상대 경로 목록 (정렬). include 를 주면 그 하위 폴더만 찾는다.
+    점(.)으로 시작하는 폴더(.git, .obsidian, .trash 등)와 skip 폴더(출력 루트)는 건너뜀.
+    """
+    root = os.path.abspath(root)
+    skip = {os.path.abspath(p) for p in skip}
+    found = []
+    for top in [os.path.join(root, d) for d in include] if include else [root]:
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames
+                           if not d.startswith(".") and os.path.join(dirpath, d) not in skip]
+            found += [os.path.relpath(os.path.join(dirpath, name), root)
+                      for name in filenames if name.lower().endswith(".pdf")]
+    return sorted(set(found))
 
-            # 너무 작은 이미지는 아이콘/장식이므로 건너뜀
-            if width < 50 or height < 50:
+
+def plan_vault(root, output_root, pdfs, manifest, image_format):
+    """
+    manifest 와 비교해 다시 추출할 PDF 를 고른다.
+    반환: (처리할 [(상대 경로, {"size", "mtime_ns", "sha256"})], 그대로인 수, manifest 갱신 수)
+    크기/수정 시각이 같으면 파일을 읽지 않고 건너뛰고, 다르면 내용 해시로 다시 비교한다
+    (복사/touch 로 시각만 바뀐 PDF 는 manifest 만 갱신). 새 PDF 의 해시는 추출할 때 구한다.
+    """
+    todo = []
+    unchanged = refreshed = 0
+    for rel in pdfs:
+        st = os.stat(os.path.join(root, rel))
+        stat = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        entry = manifest.get(rel)
+        digest = None
+        if (entry is not None and entry["format"] == image_format
+                and os.path.isfile(os.path.join(output_root, entry["output_dir"], RESULT_FILE))):
+            if entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                unchanged += 1
+                continue
+            digest = _file_digest(os.path.join(root, rel))
+            if digest == entry["sha256"]:
+                entry.update(stat)
+                unchanged += 1
+                refreshed += 1
                 continue
+        todo.append((rel, {**stat, "sha256": digest}))
+    return todo, unchanged, refreshed
+
+
+_vault_index = None     # 작업 프로세스의 내용 해시 색인 (시작 시점 사본 + 이 프로세스가 추가한 것)
+
+
+def _init_vault_worker(index):
+    global _vault_index
+    _vault_index = index
+
+
+def _extract_vault_pdf(task):
+    """
+    PDF 1개 추출 (작업 프로세스). 결과 JSON 을 출력 디렉토리의 RESULT_FILE 로 저장한다.
+    반환: manifest 항목 + "pdf", "index" (이번에 색인에 추가한 항목), 실패하면 "error"
+    manifest 항목의 files 는 이 PDF 의 출력 디렉토리에 있는 자기 파일, refs 는 결과가 가리키는 파일 전체
+    (다른 PDF 와 공유한 것 포함), 모두 output_root 기준 상대 경로.
+    """
+    root, output_root, rel, info, image_format = task
+    pdf_path = os.path.join(root, rel)
+    out_rel = os.path.splitext(rel)[0]      # 볼트 구조 그대로 (이름이 같은 PDF 도 안 겹침)
+    output_dir = os.path.join(output_root, out_rel)
+    before = set(_vault_index)
+    result = {"pdf": rel, **info, "format": image_format, "output_dir": out_rel}
+    try:
+        if result["sha256"] is None:
+            result["sha256"] = _file_digest(pdf_path)
+        images_info = extract_images(pdf_path, output_dir, 1, image_format, _vault_index)
+        _dump_json(os.path.join(output_dir, RESULT_FILE),
+                   {"pdf_path": pdf_path, "output_dir": output_dir,
+                    "total_images": len(images_info), "images": images_info}, indent=2)
+        result["total_images"] = len(images_info)
+        refs = [os.path.relpath(os.path.join(output_dir, img["filename"]), output_root)
+                for img in images_info]
+        result["files"] = [ref for ref, img in zip(refs, images_info) if not img.get("shared")]
+        result["refs"] = sorted(set(refs))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["index"] = {k: v for k, v in _vault_index.items() if k not in before}
+    return result
+
+
+def _entry_refs(output_root, entry):
+    """manifest 항목이 가리키는 파일 (refs 가 없는 이전 형식 항목은 RESULT_FILE 에서 읽음)"""
+    if "refs" in entry:
+        return entry["refs"]
+    output_dir = os.path.join(output_root, entry["output_dir"])
+    images = _load_json(os.path.join(output_dir, RESULT_FILE)).get("images", [])
+    return [os.path.relpath(os.path.join(output_dir, img["filename"]), output_root) for img in images]
 
-            img_counter += 1
-            filename = f"fig{img_counter}.png"
-            save_path = output_dir / filename
-
-            # PNG로 변환하여 저장
-            try:
-                pil_image = Image.open(io.BytesIO(image_bytes))
-                # 300dpi 메타데이터 설정
-                pil_image.save(str(save_path), "PNG", dpi=(300, 300))
-            except Exception:
-                # PIL 변환 실패 시 원본 바이트 직접 저장
-                with open(save_path, "wb") as f:
-                    f.write(image_bytes)
-
-            # 페이지 내 이미지 위치(bbox) 찾기
-            bbox = None
-            for img_rect in page.get_image_rects(xref):
-                bbox = {
-                    "x0": round(img_rect.x0, 1),
-                    "y0": round(img_rect.y0, 1),
-                    "x1": round(img_rect.x1, 1),
-                    "y1": round(img_rect.y1, 1),
-                }
-                break
-
-            images_info.append({
-                "index": img_counter,
-                "filename": filename,
-                "page": page_num + 1,
-                "width": width,
-                "height": height,
-                "original_ext": image_ext,
-                "bbox": bbox,
-            })
-
-    doc.close()
-    return images_info
+
+def unreferenced_files(output_root, manifest, index):
+    """색인에 있는 output_root 아래 파일 중 어느 PDF 결과도 가리키지 않는 것 (상대 경로, 정렬)"""
+    refs = set()
+    for entry in manifest.values():
+        refs.update(_entry_refs(output_root, entry))
+    orphans = []
+    for entry in index.values():
+        rel = os.path.relpath(entry["path"], output_root)
+        if rel.split(os.sep)[0] != os.pardir and rel not in refs and os.path.exists(entry["path"]):
+            orphans.append(rel)
+    return sorted(orphans)
+
+
+def extract_vault(root, output_root, workers=1, image_format="png", include=None,
+                  hash_index_path=None, on_result=None):
+    """
+    root 아래 PDF 중 새로 생겼거나 바뀐 것만 추출한다 (PDF 마다 output_root/<상대 경로>/).
+    output_root/MANIFEST_FILE 에 PDF 별 {"size", "mtime_ns", "sha256", "format", "output_dir",
+    "total_images"} 를 두고 다음 실행에서 비교한다. 여러 PDF 를 workers 개 프로세스에서 동시에
+    추출하며 (PDF 안은 순차), 한 개 끝날 때마다 manifest 를 저장해 중간에 멈춰도 이어서 한다.
+    내용 해시 색인(기본 output_root/HASH_INDEX_FILE)으로 PDF 사이 같은 이미지는 한 번만 저장
+    (동시에 추출 중인 PDF 끼리는 서로의 새 이미지를 모름). 색인에 있는 파일은 다른 PDF 가 가리킬
+    수 있으므로 바뀐 PDF 를 다시 추출해도 덮어쓰지 않는다 (iter_images).
+    사라진 PDF 는 manifest 에서 빼고 그 PDF 가 저장한 파일을 요약의 removed 에 남긴다.
+    파일은 지우지 않으며, 어느 PDF 결과도 가리키지 않게 된 파일(사라진 PDF, 다시 추출한 PDF 의
+    이전 이미지)은 매 실행 요약의 unreferenced 에 나온다 (정리는 사용자가 확인 후).
+    on_result 를 주면 PDF 하나 끝날 때마다 그 결과로 호출. 반환: 요약 dict
+    """
+    t0 = time.perf_counter()
+    root = os.path.abspath(root)
+    output_root = os.path.abspath(output_root)
+    os.makedirs(output_root, exist_ok=True)
+    manifest_path = os.path.join(output_root, MANIFEST_FILE)
+    manifest = _load_json(manifest_path)
+
+    pdfs = find_pdfs(root, include, skip=[output_root])
+    found = set(pdfs)
+    # include 밖의 PDF 는 이번에 찾지 않았을 뿐이므로 그대로 둔다
+    tops = tuple(os.path.normpath(d) + os.sep for d in include) if include else ("",)
+    removed = []
+    for rel in [rel for rel in manifest if rel.startswith(tops) and rel not in found]:
+        entry = manifest.pop(rel)
+        removed.append({"pdf": rel, "output_dir": entry["output_dir"],
+                        "files": entry.get("files", [])})
+    todo, unchanged, refreshed = plan_vault(root, output_root, pdfs, manifest, image_format)
+    hash_index_path = hash_index_path or os.path.join(output_root, HASH_INDEX_FILE)
+    hash_index = load_hash_index(hash_index_path)
+
+    summary = {"root": root, "output_root": output_root, "total_pdfs": len(pdfs),
+               "unchanged": unchanged, "processed": [], "failed": [], "removed": removed}
+    if todo:
+        # 큰 PDF 부터 -> 마지막에 큰 PDF 하나만 남아 다른 작업자가 노는 시간을 줄임
+        todo.sort(key=lambda item: -item[1]["size"])
+        tasks = [(root, output_root, rel, info, image_format) for rel, info in todo]
+        workers = max(1, min(workers, len(tasks)))
+        if workers == 1:
+            _init_vault_worker(hash_index)
+            results = map(_extract_vault_pdf, tasks)
+        else:
+            pool = Pool(workers, _init_vault_worker, (hash_index,))
+            results = pool.imap_unordered(_extract_vault_pdf, tasks)
+        try:
+            for result in results:
+                hash_index.update(result.pop("index"))
+                rel = result.pop("pdf")
+                if "error" in result:
+                    summary["failed"].append({"pdf": rel, "error": result["error"]})
+                else:
+                    manifest[rel] = result
+                    summary["processed"].append({"pdf": rel, "output_dir": result["output_dir"],
+                                                 "total_images": result["total_images"]})
+                _dump_json(manifest_path, manifest)
+                save_hash_index(hash_index_path, hash_index)
+                if on_result is not None:
+                    on_result({"pdf": rel, **result})
+        finally:
+            if workers > 1:
+                pool.terminate()
+                pool.join()
+    elif removed or refreshed:
+        _dump_json(manifest_path, manifest)
+
+    summary["processed"].sort(key=lambda item: item["pdf"])
+    summary["total_images"] = sum(entry["total_images"] for entry in manifest.values())
+    summary["unreferenced"] = unreferenced_files(output_root, manifest, hash_index)
+    summary["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    return summary
 
 
 def main():
-    if len(sys.argv) < 3:
-        print("사용법: python extract_pdf_images.py <PDF경로> <출력디렉토리>", file=sys.stderr)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="PDF 이미지 추출 (PNG + 위치 정보 JSON)")
+    parser.add_argument("pdf_path", help="PDF 경로 (폴더면 볼트 모드: 아래 PDF 중 바뀐 것만)")
+    parser.add_argument("output_dir", help="이미지 출력 디렉토리 (볼트 모드는 출력 루트)")
+    parser.add_argument("--workers", type=int,
+                        help="병렬 추출 프로세스 수 (기본: PDF 1개는 1, 볼트 모드는 CPU 코어 수, "
+                             "0 = CPU 코어 수). 볼트 모드에서는 동시에 추출할 PDF 수")
+    parser.add_argument("--include", nargs="+", metavar="DIR",
+                        help="볼트 모드에서 찾을 하위 폴더 (기본: 전체, 예: Attachments References)")
+    parser.add_argument("--format", choices=FORMATS, default="png",
+                        help="저장 형식 (png: 전부 PNG 변환, auto: PNG/JPEG 는 원본 그대로, "
+                             "original: 변환 없음)")
+    parser.add_argument("--hash-index", help="내용 해시 색인 JSON (여러 PDF 사이 중복 제거)")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="이미지마다 JSON 한 줄씩 바로 출력 (마지막 줄은 summary)")
+    args = parser.parse_args()
+
+    pdf_path = args.pdf_path
+    output_dir = args.output_dir
 
-    pdf_path = sys.argv[1]
-    output_dir = sys.argv[2]
+    if os.path.isdir(pdf_path):
+        on_result = None
+        if args.ndjson:
+            def on_result(result):
+                print(json.dumps({"type": "pdf", **result}, ensure_ascii=False), flush=True)
+        summary = extract_vault(pdf_path, output_dir, args.workers or os.cpu_count(), args.format,
+                                args.include, args.hash_index, on_result)
+        if args.ndjson:
+            print(json.dumps({"type": "summary", **summary}, ensure_ascii=False), flush=True)
+        else:
+            print(json.dumps(summary, ensure_ascii=False, indent=2))
+        sys.exit(1 if summary["failed"] else 0)
 
     if not os.path.isfile(pdf_path):
         print(f"오류: PDF 파일을 찾을 수 없습니다: {pdf_path}", file=sys.stderr)
         sys.exit(1)
 
-    images_info = extract_images(pdf_path, output_dir)
-
-    # JSON으로 결과 출력 (에이전트가 파싱할 수 있도록)
-    result = {
-        "pdf_path": pdf_path,
-        "output_dir": output_dir,
-        "total_images": len(images_info),
-        "images": images_info,
-    }
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    hash_index = load_hash_index(args.hash_index) if args.hash_index else None
+    workers = os.cpu_count() if args.workers == 0 else args.workers or 1
+    if args.ndjson:
+        # 파일을 저장하는 대로 한 줄씩 (받는 쪽은 앞 페이지부터 바로 처리)
+        total = 0
+        for kind, item in iter_images(pdf_path, output_dir, workers, args.format, hash_index):
+            total += kind == "image"
+            print(json.dumps({"type": kind, **item}, ensure_ascii=False), flush=True)
+        print(json.dumps({"type": "summary", "pdf_path": pdf_path, "output_dir": output_dir,
+                          "total_images": total}, ensure_ascii=False), flush=True)
+    else:
+        images_info = extract_images(pdf_path, output_dir, workers, args.format, hash_index)
+        # JSON으로 결과 출력 (에이전트가 파싱할 수 있도록)
+        result = {
+            "pdf_path": pdf_path,
+            "output_dir": output_dir,
+            "total_images": len(images_info),
+            "images": images_info,
+        }
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    if hash_index is not None:
+        save_hash_index(args.hash_index, hash_index)
 
 
 if __name__ == "__main__":
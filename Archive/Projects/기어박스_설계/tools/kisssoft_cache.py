@@ -0,0 +1,150 @@
+"""
+KISSsoft 계산 결과 디스크 캐시 (내용 주소 방식)
+- 키 = sha256(입력 모델 파일 해시, 적용한 SetVar 값 전체, KISSsoft 버전, 결과에 영향을 주는 설정)
+- 값 = 읽어 온 결과(gear_spec / life_results 등, JSON) + 생성 파일(.z12 / .step / .ksys) 사본
+- 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+- 항목은 임시 디렉토리에 만든 뒤 이름 바꾸기로 등록 -> 여러 프로세스(하중 스윕)가 같이 써도 안전
+
+체크포인트(kisssoft_checkpoint)는 한 실행의 재개용, 이 캐시는 실행/케이스를 넘어 같은 계산을
+다시 요청할 때(설계 검토에서 동일 케이스 반복) Calculate/Export3D 를 건너뛰는 용도다.
+
+    cache = ResultCache(CACHE_ROOT)
+    key = cache.key(file_digest(model), kv.writes(), kisssoft_version(ks))
+    hit = cache.get(key)
+    if hit is None:
+        ... 계산 ...
+        cache.put(key, {"gear_spec": gear_spec}, {"z12": saved_file})
+    else:
+        cache.restore(hit, "z12", dest)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_MAX_BYTES = 512 * 2**20     # 512 MB
+CACHE_DIR = ".cache"
+META_FILE = "meta.json"
+
+# 버전 조회에 시도할 COM 메서드 (앞쪽 우선, 없으면 "unknown")
+VERSION_METHODS = ("GetVersion", "GetKISSsoftVersion")
+
+
+def kisssoft_version(com):
+    """COM 객체의 KISSsoft 버전 문자열 (조회할 수 없으면 "unknown")"""
+    for name in VERSION_METHODS:
+        try:
+            return str(getattr(com, name)())
+        except Exception:
+            continue
+    return "unknown"
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+class ResultCache:
+    """
+    root/<키 앞 2자리>/<키>/ 에 meta.json 과 생성 파일 사본을 둔다.
+    meta.json 의 수정 시각이 마지막 사용 시각 (적중할 때마다 갱신).
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(model_digest, set_vars, version, settings=None):
+        """set_vars: OpenFile 이후 적용한 {변수명: 값} 전체 (순서 무관)"""
+        payload = json.dumps({"model": model_digest, "vars": set_vars, "version": version,
+                              "settings": settings}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    # --------------------------------------------------------
+    # 조회 / 등록
+    # --------------------------------------------------------
+    def get(self, key, require=()):
+        """
+        적중하면 {"value": 결과, "artifacts": {이름: 캐시 안 파일 경로}}, 아니면 None.
+        require 에 있는 생성 파일이 없는 항목은 적중으로 보지 않는다.
+        """
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        artifacts = {name: os.path.join(path, fname) for name, fname in meta["artifacts"].items()}
+        if not all(name in artifacts and os.path.isfile(artifacts[name]) for name in require):
+            self.misses += 1
+            return None
+        os.utime(os.path.join(path, META_FILE))     # LRU 사용 시각 갱신
+        self.hits += 1
+        return {"value": meta["value"], "artifacts": artifacts}
+
+    def put(self, key, value, artifacts=None):
+        """결과와 생성 파일(이름 -> 원본 경로) 사본을 등록하고 크기 한도를 맞춘다."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            names = {}
+            for name, src in (artifacts or {}).items():
+                names[name] = name + os.path.splitext(src)[1]
+                shutil.copyfile(src, os.path.join(tmp, names[name]))
+            with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+                json.dump({"value": value, "artifacts": names}, f, ensure_ascii=False, default=str)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)     # 같은 키 갱신 (생성 파일 추가 등)
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)          # 다른 프로세스가 먼저 등록
+        self.evict()
+
+    @staticmethod
+    def restore(hit, name, dest):
+        """캐시된 생성 파일을 dest 로 복사"""
+        shutil.copyfile(hit["artifacts"][name], dest)
+        return dest
+
+    # --------------------------------------------------------
+    # 크기 관리
+    # --------------------------------------------------------
+    def entries(self):
+        """[(마지막 사용 시각, 크기, 경로), ...]"""
+        result = []
+        for shard in os.listdir(self.root):
+            shard_path = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_path):
+                continue
+            for name in os.listdir(shard_path):
+                path = os.path.join(shard_path, name)
+                try:
+                    used = os.path.getmtime(os.path.join(path, META_FILE))
+                    result.append((used, _dir_size(path), path))
+                except OSError:
+                    continue    # 등록 중(.tmp-*) 이거나 다른 프로세스가 삭제 중
+        return result
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래된 항목 삭제. 반환: 삭제 수"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
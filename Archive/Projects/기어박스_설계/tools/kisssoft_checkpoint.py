@@ -0,0 +1,107 @@
+"""
+KISSsoft 워크플로 체크포인트 저장소
+- 단계별 결과(원본 하중, 기어 제원, 수명/안전율, 저장한 .z12/.ksys/.step 경로)를 JSON 으로 보관
+- 키 = 입력 모델 파일 해시 + 하중 케이스 + 설정(Fine Sizing 엔진/범위 등) 해시
+  -> 입력이나 설정이 바뀌면 새 키가 되어 이전 결과를 재사용하지 않는다
+- 결과가 가리키는 파일이 지워졌으면 그 단계는 완료되지 않은 것으로 본다
+- 쓰기는 임시 파일 + os.replace 로 원자적 (실행 중 중단돼도 파일이 깨지지 않음)
+
+    store = CheckpointStore(os.path.join(OUTPUT_DIR, ".checkpoints"))
+    ck = store.open(store.key(file_digest(model), {"factor": 1.1}, settings))
+    original = ck.get("step1")
+    if original is None:
+        original = step1(...)
+        ck.save("step1", original)
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    """모델 파일 내용 해시. 파일이 없으면 (로컬 백엔드 내장 예제 등) 경로 문자열 해시."""
+    if not os.path.isfile(path):
+        return _sha(path.encode("utf-8"))
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class Checkpoint:
+    """실행 1건(모델 x 하중 케이스)의 단계별 결과"""
+
+    def __init__(self, path):
+        self.path = path
+        self.steps = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.steps = json.load(f)["steps"]
+            except (ValueError, KeyError):
+                self.steps = {}     # 깨진 체크포인트는 처음부터
+
+    def get(self, step):
+        """완료된 단계의 결과. 없거나 결과 파일이 사라졌으면 None."""
+        entry = self.steps.get(step)
+        if entry is None or not all(os.path.isfile(p) for p in entry["files"]):
+            return None
+        return entry["value"]
+
+    def save(self, step, value, files=()):
+        """단계 결과 기록. files 는 이 결과가 유효하려면 남아 있어야 하는 파일 경로."""
+        self.steps[step] = {"value": value, "files": list(files),
+                            "saved": datetime.now().isoformat(timespec="seconds")}
+        self._write()
+
+    def discard(self, *steps):
+        """다시 계산한 단계의 하위 단계 기록을 지운다"""
+        if any(self.steps.pop(step, None) is not None for step in steps):
+            self._write()
+
+    def _write(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps}, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        self.steps = {}
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+
+class CheckpointStore:
+    """체크포인트 디렉토리 (키마다 JSON 파일 1개)"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(model_digest, case, settings=None):
+        """
+        model_digest: file_digest(모델 파일), case: 하중 케이스 dict (factor 또는 torque/speed),
+        settings: 결과에 영향을 주는 설정 dict
+        """
+        case = {k: v for k, v in case.items() if k != "label"}     # 표시명은 결과와 무관
+        factor = case.get("factor")
+        label = f"x{factor:.4f}" if factor is not None else "case"
+        extra = _sha(_canonical({"case": case, "settings": settings}).encode("utf-8"))
+        return f"{model_digest[:16]}_{label}_{extra[:12]}"
+
+    def open(self, key):
+        return Checkpoint(os.path.join(self.root, key + ".json"))
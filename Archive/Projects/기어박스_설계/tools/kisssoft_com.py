@@ -0,0 +1,182 @@
+"""
+KISSsoft / KISSsys COM 변수 접근 계층
+- 필요한 변수(ZS.*, ZR[i].* ...)를 미리 선언하고 한 번에 읽기/쓰기
+- 실행(run) 단위 캐시: 같은 변수를 다시 읽어도 COM 왕복 없음
+- 쓰기는 모아 두었다가 계산 메서드 호출 직전에 한 번에 반영
+- KISSsoft COM 은 다중 변수 메서드를 문서화하지 않으므로 기본은 GetVar/SetVar 를 한 곳에서
+  연속 호출하는 순차 경로. 다중 변수 경로(GetVars/SetVars, 왕복 1회)는 그 메서드를 제공하는
+  local 백엔드에서 multi_vars 로 켤 때만 사용 (--multi-vars 또는 KISSSOFT_MULTI_VARS=1)
+
+COM 왕복 횟수(round_trips)를 세므로 하중 케이스 스윕에서 병목을 확인할 수 있다.
+
+COM 객체 생성은 dispatch() 한 곳에서 백엔드를 고른다.
+    "com"   : win32com.client.Dispatch (Windows + KISSsoft 라이선스)
+    "local" : kisssoft_local 의 순수 Python 대체 (Linux/CI, 지연 시간 설정 가능)
+기본값은 KISSSOFT_BACKEND 환경 변수 (없으면 "com").
+"""
+
+import os
+
+BACKENDS = ("com", "local")
+BACKEND_ENV = "KISSSOFT_BACKEND"
+MULTI_VARS_ENV = "KISSSOFT_MULTI_VARS"     # "1" 이면 local 백엔드의 다중 변수 경로 사용
+
+# 호출 후 캐시를 비우는 범위
+#   "all"     : 파일을 새로 열었으므로 전부
+#   "results" : 계산 결과가 바뀌므로 stable 로 선언한 변수(하중 조건 등)만 남김
+INVALIDATES = {
+    "OpenFile": "all",
+    "Calculate": "results",
+    "CalculateFineSizing": "results",
+    "SetFineSizingSolution": "results",
+}
+
+
+def default_backend():
+    return os.environ.get(BACKEND_ENV, "com")
+
+
+def default_multi_vars():
+    return os.environ.get(MULTI_VARS_ENV, "") == "1"
+
+
+def enable_multi_vars():
+    """이 프로세스와 이후 시작하는 작업 프로세스의 dispatch 기본값을 multi_vars=True 로"""
+    os.environ[MULTI_VARS_ENV] = "1"
+
+
+def dispatch(progid, backend=None, latency=None, multi_vars=None):
+    """
+    progid("KISSsoftCOM.KISSsoft" 등) 의 COM 객체를 backend 로 생성.
+    latency 는 local 백엔드에만 적용 (kisssoft_local.parse_latency 참고).
+    multi_vars: GetVars/SetVars 다중 변수 메서드 제공 (local 백엔드만, None 이면 환경 변수).
+    com 백엔드에서 pywin32 가 없으면 ImportError.
+    """
+    backend = backend or default_backend()
+    if multi_vars is None:
+        multi_vars = default_multi_vars()
+    if backend == "local":
+        import kisssoft_local
+        return kisssoft_local.create(progid, latency=latency, multi_vars=multi_vars)
+    if backend != "com":
+        raise ValueError(f"알 수 없는 백엔드: {backend} (가능: {', '.join(BACKENDS)})")
+    if multi_vars:
+        raise ValueError("다중 변수 경로는 local 백엔드에서만 사용 가능 (KISSsoft COM 에는 없음)")
+    import win32com.client
+    return win32com.client.Dispatch(progid)
+
+
+class ComVars:
+    """
+    COM 객체 1개(KISSsoft 또는 KISSsys)의 변수 접근기
+
+        v = ComVars(ks)
+        v.call("OpenFile", path)
+        load = v.fetch(["ZS.Torque", "ZS.Power"], stable=True)   # 일괄 읽기
+        v.set_many({"ZS.Torque": 110.0})                          # 쓰기 예약
+        v.call("Calculate")                                       # 쓰기 반영 후 계산
+
+    prefix 를 주면 모든 변수명 앞에 붙인다 (KISSsys 서브컴포넌트 "GearPair1." 등).
+    COM 객체의 multi_vars 가 True 이면 (dispatch(..., multi_vars=True) 의 local 백엔드)
+    GetVars/SetVars 로 한 번에 읽고 쓴다. 읽기/쓰기 오류는 그대로 예외로 올린다.
+    """
+
+    def __init__(self, com, prefix=""):
+        self.com = com
+        self.prefix = prefix
+        self.round_trips = 0
+        self._cache = {}
+        self._stable = set()
+        self._pending = {}
+        self._applied = {}      # 마지막 OpenFile 이후 반영한 쓰기 (결과 캐시 키용)
+        self.multi_vars = getattr(com, "multi_vars", False) is True
+
+    # --------------------------------------------------------
+    # 읽기
+    # --------------------------------------------------------
+    def fetch(self, names, stable=False):
+        """
+        names 의 값을 {이름: 값} 으로. 캐시에 없는 것만 한 번에 COM 에서 읽는다.
+        stable=True 이면 계산 후에도 캐시에 남긴다 (계산이 바꾸지 않는 입력값).
+        """
+        names = list(names)
+        missing = [n for n in dict.fromkeys(names) if n not in self._cache]
+        if missing:
+            self._cache.update(zip(missing, self._read(missing)))
+        if stable:
+            self._stable.update(names)
+        return {n: self._cache[n] for n in names}
+
+    def get(self, name, stable=False):
+        return self.fetch([name], stable)[name]
+
+    def fetch_labeled(self, labeled, stable=False):
+        """{표시명: 변수명} -> {표시명: 값} (단계별 출력/리포트용)"""
+        values = self.fetch(labeled.values(), stable)
+        return {label: values[name] for label, name in labeled.items()}
+
+    def _read(self, names):
+        full = [self.prefix + n for n in names]
+        if self.multi_vars:
+            values = list(self.com.GetVars(full))
+            self.round_trips += 1
+            if len(values) != len(full):
+                raise RuntimeError(f"GetVars: {len(full)}개 요청, {len(values)}개 반환")
+            return values
+        values = []
+        for name in full:
+            values.append(self.com.GetVar(name))
+            self.round_trips += 1
+        return values
+
+    # --------------------------------------------------------
+    # 쓰기
+    # --------------------------------------------------------
+    def set(self, name, value):
+        self.set_many({name: value})
+
+    def set_many(self, values):
+        """쓰기 예약 (flush 또는 다음 call 에서 반영). 캐시는 바로 새 값으로."""
+        self._pending.update(values)
+        self._cache.update(values)
+
+    def writes(self):
+        """마지막 OpenFile 이후 쓴 {변수명: 값} 전체 (반영 예약분 포함)"""
+        return {**self._applied, **self._pending}
+
+    def flush(self):
+        """예약된 쓰기를 COM 에 반영"""
+        if not self._pending:
+            return
+        names = [self.prefix + n for n in self._pending]
+        values = list(self._pending.values())
+        self._applied.update(self._pending)
+        self._pending.clear()
+        if self.multi_vars:
+            self.com.SetVars(names, values)
+            self.round_trips += 1
+            return
+        for name, value in zip(names, values):
+            self.com.SetVar(name, value)
+            self.round_trips += 1
+
+    # --------------------------------------------------------
+    # 메서드 호출
+    # --------------------------------------------------------
+    def call(self, method, *args):
+        """
+        COM 메서드 호출. 예약된 쓰기를 먼저 반영하고, INVALIDATES 에 따라 캐시를 비운다.
+        """
+        self.flush()
+        result = getattr(self.com, method)(*args)
+        self.round_trips += 1
+        self.invalidate(INVALIDATES.get(method))
+        return result
+
+    def invalidate(self, scope="results"):
+        if scope == "all":
+            self._cache.clear()
+            self._stable.clear()
+            self._applied.clear()
+        elif scope == "results":
+            self._cache = {n: v for n, v in self._cache.items() if n in self._stable}
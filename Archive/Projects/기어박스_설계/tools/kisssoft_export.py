@@ -0,0 +1,149 @@
+"""
+KISSsys 시스템 계산 / 3D STEP 출력 백그라운드 단계
+- 계산(KISSsoft)과 분리된 작업 큐 + 작업 스레드 N 개
+- 작업 스레드마다 KISSsys 인스턴스를 처음 작업에서 한 번만 만들고, close() 때 닫는다
+  (com 백엔드는 스레드마다 CoInitialize / 스레드 종료 시 CoUninitialize)
+- submit() 은 바로 ExportJob 을 돌려주므로 리포트는 먼저 쓰고, 상태는 끝난 뒤 채운다
+- 스윕에서는 전 케이스가 아니라 골라낸 설계만 요청해서 출력 (export-on-demand)
+
+    with ExportStage(backend="local") as stage:
+        job = stage.submit("case1", export_fn, gear_spec, torque, step_file)
+        ... 리포트 작성 ...
+        job.wait()
+        print(job.status_text())
+"""
+
+import queue
+import threading
+import time
+
+from kisssoft_com import default_backend, dispatch
+
+KISSSYS_PROGID = "KISSsysCOM.KISSsys"
+
+STATUS_TEXT = {"queued": "대기", "running": "진행 중", "done": "완료", "failed": "실패"}
+
+
+class ExportJob:
+    """작업 1건의 상태 (queued -> running -> done | failed)"""
+
+    def __init__(self, name, fn, args):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.elapsed = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """끝날 때까지 대기. 반환: 끝났으면 True"""
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def status_text(self):
+        text = STATUS_TEXT[self.status]
+        if self.status == "failed":
+            text += f": {self.error}"
+        elif self.status == "done":
+            text += f" ({self.elapsed:.1f} s)"
+        return text
+
+
+class ExportStage:
+    """
+    KISSsys 작업 큐. 작업 함수는 fn(ksys, *args) 형태로 작업 스레드의 인스턴스를 받는다.
+    workers 는 동시에 쓸 KISSsys 인스턴스(라이선스) 수.
+    connect 를 주면 인스턴스 생성에 사용 (None 을 돌려주면 연결 실패로 처리).
+    """
+
+    def __init__(self, backend=None, latency=None, workers=1, progid=KISSSYS_PROGID,
+                 connect=None):
+        self.backend = backend or default_backend()
+        self.latency = latency
+        self.workers = max(1, workers)
+        self.progid = progid
+        self.connect = connect
+        self.jobs = []
+        self._queue = queue.Queue()
+        self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, name, fn, *args):
+        """작업 등록 (작업 스레드는 첫 등록 때 시작). 반환: ExportJob"""
+        if not self._threads:
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"export-{i + 1}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        job = ExportJob(name, fn, args)
+        self.jobs.append(job)
+        self._queue.put(job)
+        return job
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in self.jobs:
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not job.wait(left):
+                return False
+        return True
+
+    def close(self):
+        """남은 작업을 끝내고 작업 스레드와 KISSsys 인스턴스를 정리"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def _connect(self):
+        if self.connect is None:
+            return dispatch(self.progid, self.backend, self.latency)
+        com = self.connect()
+        if com is None:
+            raise RuntimeError(f"{self.progid} 연결 실패")
+        return com
+
+    def _work(self):
+        pythoncom = None
+        if self.backend == "com":
+            import pythoncom
+            pythoncom.CoInitialize()
+        ksys = None
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    return
+                job.status = "running"
+                t0 = time.perf_counter()
+                try:
+                    if ksys is None:
+                        ksys = self._connect()
+                    job.result = job.fn(ksys, *job.args)
+                    job.status = "done"
+                except Exception as e:
+                    job.error = f"{type(e).__name__}: {e}"
+                    job.status = "failed"
+                job.elapsed = time.perf_counter() - t0
+                job._done.set()
+        finally:
+            if ksys is not None:
+                try:
+                    ksys.Close()
+                except Exception:
+                    pass
+            # COM 참조를 모두 놓은 뒤 이 스레드의 COM 초기화 해제 (ExportStage 를 여러 번 써도 안 샘)
+            ksys = None
+            if pythoncom is not None:
+                pythoncom.CoUninitialize()
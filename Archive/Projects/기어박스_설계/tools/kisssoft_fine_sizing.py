@@ -0,0 +1,241 @@
+"""
+Fine Sizing 로컬 사전 탐색 엔진 (KISSsoft CalculateFineSizing 대체/사전 필터)
+- KISSsoft 와 같은 범위(ZR[0].z, ZR[0].mn, ZR[0].b)를 AGMA 강도식으로 전부 평가
+- 목적함수(중량, 중심거리, 최소 안전율, 수명)의 가중합으로 순위를 매긴다
+  (각 항은 현재 모델 제원 대비 비율 -> 점수 = 가중치 합 이면 현재 제원과 같은 수준)
+- rank_solutions() 는 순위가 확정된 후보부터 바로 내보내는 생성기 (조합별 점수 하한으로 분기 한정,
+  상위 K 개를 내보내면 남은 조합은 평가하지 않음)
+- 상위 몇 개만 KISSsoft 에서 Calculate 로 검증하면 라이선스 점유 시간이 크게 줄어든다
+
+    case = case_from_vars(kv.fetch(CASE_VARS))
+    for c in rank_solutions(case, {"weight": 1.0, "min_safety": 0.5}, top_k=3):
+        print(c.z1, c.mn, c.b, c.score)
+
+AGMA 근사값이므로 최종 안전율/수명은 반드시 KISSsoft 계산 결과를 사용한다.
+"""
+
+import heapq
+import math
+import os
+import sys
+from dataclasses import dataclass, replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gearbox_design_agma import ISO54_MODULES, GearboxSpec, design_stage  # noqa: E402
+
+# 수명 환산 S-N 기울기 (ISO 6336 침탄강, 유한 수명 영역): 수명 = 요구수명 * S^k
+LIFE_EXP_ROOT = 8.738
+LIFE_EXP_FLANK = 13.22
+LIFE_MAX = 1e6          # KISSsoft 처럼 내구 한도 이상은 1e6 h 로 표시
+
+RHO_STEEL = 7.85e-6     # 강 밀도 [kg/mm^3]
+B_STEP = 1.0            # 이폭 탐색 간격 [mm]
+DEFAULT_TOP_K = 5
+
+# 탐색 범위 기본값 (kisssoft_gear_optimization.SIZING_RANGE 와 같은 이름)
+DEFAULT_RANGE = {
+    "ZR[0].z.min": 18, "ZR[0].z.max": 30,
+    "ZR[0].mn.min": 2.0, "ZR[0].mn.max": 4.0,
+    "ZR[0].b.min": 20.0, "ZR[0].b.max": 40.0,
+}
+
+# 사례 입력에 필요한 KISSsoft 변수 (case_from_vars 용)
+CASE_VARS = ("ZS.Torque", "ZS.Speed", "ZS.Ka", "ZS.Hlife", "ZR[0].z", "ZR[1].z",
+             "ZR[0].mn", "ZR[0].b", "ZR[0].alfn", "ZR[0].beta")
+
+# 목적함수: 이름 -> (값 함수, 최소화 여부)
+OBJECTIVES = {
+    "weight": (lambda c: c.mass, True),
+    "center_distance": (lambda c: c.a, True),
+    "min_safety": (lambda c: min(c.SF, c.SH), False),
+    "life": (lambda c: min(c.life_root, c.life_flank), False),
+}
+DEFAULT_OBJECTIVES = {"weight": 1.0}
+
+_BASE_SPEC = GearboxSpec()
+
+
+@dataclass(slots=True)
+class SizingCase:
+    """기어 쌍 1개의 하중/형상 입력과 현재 제원 (점수 기준)"""
+    T: float                    # 피니언 토크 [Nm]
+    n: float                    # 피니언 회전수 [RPM]
+    z1: int                     # 현재 피니언 잇수
+    z2: int                     # 현재 기어 잇수 (기어비 유지)
+    mn: float                   # 현재 모듈 [mm]
+    b: float                    # 현재 이폭 [mm]
+    Ka: float = 1.25
+    Hlife: float = 20000.0      # 요구수명 [hr]
+    pressure_angle: float = 20.0
+    helix_angle: float = 0.0
+    SF_min: float = 1.0
+    SH_min: float = 1.0
+
+
+@dataclass(slots=True)
+class Candidate:
+    z1: int
+    z2: int
+    mn: float
+    b: float
+    a: float                    # 중심거리 [mm]
+    SF: float
+    SH: float
+    life_root: float            # [hr]
+    life_flank: float           # [hr]
+    mass: float                 # 기어 2개 원판 근사 중량 [kg]
+    score: float = 0.0
+
+
+def parse_objectives(text):
+    """"weight=1,min_safety=0.5" -> {"weight": 1.0, "min_safety": 0.5} (가중치 생략 시 1)"""
+    objectives = {}
+    for item in (text or "").split(","):
+        name, _, weight = item.strip().partition("=")
+        if not name:
+            continue
+        if name not in OBJECTIVES:
+            raise ValueError(f"알 수 없는 목적함수: {name} (가능: {', '.join(OBJECTIVES)})")
+        objectives[name] = float(weight) if weight else 1.0
+    return objectives
+
+
+def case_from_vars(values, SF_min=1.0, SH_min=1.0, prefix=""):
+    """KISSsoft 변수 {이름: 값} (CASE_VARS) -> SizingCase"""
+    v = {name: values[prefix + name] for name in CASE_VARS}
+    return SizingCase(T=v["ZS.Torque"], n=v["ZS.Speed"], z1=int(v["ZR[0].z"]), z2=int(v["ZR[1].z"]),
+                      mn=v["ZR[0].mn"], b=v["ZR[0].b"], Ka=v["ZS.Ka"], Hlife=v["ZS.Hlife"],
+                      pressure_angle=v["ZR[0].alfn"], helix_angle=v["ZR[0].beta"],
+                      SF_min=SF_min, SH_min=SH_min)
+
+
+def life_hours(S, exponent, required):
+    """안전율 S 에서의 계산 수명 [hr] (S = 1 이면 요구수명)"""
+    return min(required * S ** exponent, LIFE_MAX)
+
+
+# ============================================================
+# 평가
+# ============================================================
+def _stage(case, z1, z2, mn, b):
+    spec = replace(_BASE_SPEC, psi=b / mn, Ka=case.Ka,
+                   helix_angle=case.helix_angle, pressure_angle=case.pressure_angle)
+    return design_stage(case.T, case.n, z1, z2, mn, spec)
+
+
+def _candidate(case, z1, z2, mn, b, s, SF, SH):
+    return Candidate(
+        z1=z1, z2=z2, mn=mn, b=b, a=s.a, SF=SF, SH=SH,
+        life_root=life_hours(SF, LIFE_EXP_ROOT, case.Hlife),
+        life_flank=life_hours(SH, LIFE_EXP_FLANK, case.Hlife),
+        mass=RHO_STEEL * math.pi / 4 * (s.d_pinion ** 2 + s.d_gear ** 2) * b,
+    )
+
+
+def evaluate(case, z1, z2, mn, b):
+    """제원 1개를 평가 (점수는 rank_solutions 에서 채운다)"""
+    s = _stage(case, z1, z2, mn, b)
+    return _candidate(case, z1, z2, mn, b, s, s.SF, s.SH)
+
+
+def _widths(r):
+    b_lo, b_hi = r["ZR[0].b.min"], r["ZR[0].b.max"]
+    return [b_lo + B_STEP * k for k in range(int((b_hi - b_lo) / B_STEP + 1e-9) + 1)]
+
+
+def _groups(case, r):
+    """탐색할 (z1, z2, mn) 조합 (기어비 유지, 모듈은 ISO 54 계열)"""
+    u = case.z2 / case.z1
+    modules = [m for m in ISO54_MODULES if r["ZR[0].mn.min"] <= m <= r["ZR[0].mn.max"]]
+    return [(z1, round(z1 * u), m)
+            for z1 in range(int(r["ZR[0].z.min"]), int(r["ZR[0].z.max"]) + 1) for m in modules]
+
+
+def _scorer(case, objectives):
+    """후보 -> 점수 (현재 제원 대비 비율의 가중합, 작을수록 좋음)"""
+    ref = evaluate(case, case.z1, case.z2, case.mn, case.b)
+    terms = []
+    for name, weight in objectives.items():
+        value, minimize = OBJECTIVES[name]
+        terms.append((value, minimize, weight, value(ref)))
+
+    def score(c):
+        total = 0.0
+        for value, minimize, weight, r in terms:
+            v = value(c)
+            total += weight * (v / r if minimize else r / v)
+        return total
+    return score
+
+
+def _bound(case, score, z1, z2, mn, s, widths):
+    """
+    조합 (z1, z2, mn) 의 모든 이폭 후보 점수의 하한. s 는 최소 이폭 widths[0] 의 강도 계산.
+    SF ∝ b, SH ∝ sqrt(b) 이므로 안전율을 만족하는 최소 이폭은
+    b0 * max(SF_min/SF0, (SH_min/SH0)^2) -> 그 이폭의 중량/중심거리에 안전율 무한대,
+    수명 LIFE_MAX 를 둔 낙관적 후보의 점수. 각 항이 값에 대해 단조이므로 (가중치 >= 0)
+    실제 후보 점수는 이보다 작을 수 없다. 범위 안에 만족하는 이폭이 없으면 무한대.
+    """
+    b0 = widths[0]
+    b_need = b0 * max(case.SF_min / s.SF, (case.SH_min / s.SH) ** 2)
+    # 격자 위 첫 이폭 (부동소수 오차로 실제보다 큰 이폭을 고르지 않도록 여유)
+    b = next((w for w in widths if w >= b_need * (1 - 1e-9)), None)
+    if b is None:
+        return math.inf
+    return score(_candidate(case, z1, z2, mn, b, s, math.inf, math.inf))
+
+
+def rank_solutions(case, objectives=None, top_k=DEFAULT_TOP_K, ranges=None, stats=None):
+    """
+    최소 안전율(case.SF_min/SH_min)을 만족하는 후보를 점수 순으로 내보내는 생성기.
+
+    잇수-모듈 조합을 점수 하한(_bound) 오름차순으로 평가하고, 찾은 후보 중 점수가 남은 조합의
+    하한 이하인 것은 순위가 확정되므로 바로 내보낸다 (분기 한정, 결과는 전체 탐색과 같은 순서).
+    top_k 개를 내보내면 남은 조합은 평가하지 않는다. top_k=None 이면 모든 후보.
+    이폭은 조합마다 강도 계산 1회 후 SF ∝ b, SH ∝ sqrt(b) 로 환산 (AGMA 식에서 정확).
+    stats(dict) 를 주면 평가 조합 수 (이폭 후보까지 펼친 조합), 후보 수, 조기 종료 여부
+    (만족하는 이폭이 있는 조합을 다 펼치기 전에 끝남) 를 기록한다 (내보낼 때마다 갱신).
+    """
+    r = {**DEFAULT_RANGE, **(ranges or {})}
+    score = _scorer(case, objectives or DEFAULT_OBJECTIVES)
+    widths = _widths(r)
+    # 조합마다 최소 이폭 강도 계산 1회 -> 하한 계산과 이폭 환산에 같이 쓴다
+    groups = []
+    for g in _groups(case, r):
+        s = _stage(case, *g, widths[0])
+        groups.append((_bound(case, score, *g, s, widths), g, s))
+    groups.sort(key=lambda item: item[0])
+    feasible = sum(item[0] < math.inf for item in groups)
+
+    found = []      # (점수, 순번, 후보) 최소 힙 -> 아직 내보내지 않은 후보
+    seq = 0
+    evaluated = 0
+    emitted = 0
+
+    def note():
+        if stats is not None:
+            stats.update(groups=len(groups), evaluated=evaluated, candidates=seq,
+                         stopped_early=evaluated < feasible)
+
+    # 마지막 (하한 무한대) 항목에서 남은 후보를 모두 내보낸다
+    for lower, (z1, z2, mn), s in groups + [(math.inf, (None, None, None), None)]:
+        # 남은 조합의 하한 이하인 후보는 순위 확정
+        while found and found[0][0] <= lower:
+            note()
+            yield heapq.heappop(found)[2]
+            emitted += 1
+            if top_k is not None and emitted >= top_k:
+                return
+        if lower == math.inf:
+            break       # 남은 조합은 만족하는 이폭이 없음
+        evaluated += 1
+        for b in widths:
+            k = b / widths[0]
+            SF, SH = s.SF * k, s.SH * math.sqrt(k)
+            if SF < case.SF_min or SH < case.SH_min:
+                continue
+            c = _candidate(case, z1, z2, mn, b, s, SF, SH)
+            c.score = score(c)
+            seq += 1
+            heapq.heappush(found, (c.score, seq, c))
+    note()
@@ -7,18 +7,23 @@ KISSsoft COM Expert 기어 최적화 스크립트
 
 필요 모듈: CC1 (COM Basic), CC2 (COM Expert), Z05x (3D), KISSsys
 필요 패키지: pip install pywin32
+
+KISSsoft 없이 (Linux/CI) 흐름만 확인하려면 로컬 대체 백엔드를 사용:
+    python kisssoft_gear_optimization.py --backend local --output-dir ./out [--latency 0.01]
+    (또는 KISSSOFT_BACKEND=local 환경 변수, 결과는 AGMA 근사값)
 """
 
+import argparse
 import sys
 import os
 from datetime import datetime
 
-try:
-    import win32com.client
-except ImportError:
-    print("오류: pywin32가 설치되지 않았습니다.")
-    print("설치: pip install pywin32")
-    sys.exit(1)
+from kisssoft_cache import CACHE_DIR, DEFAULT_MAX_BYTES, ResultCache, kisssoft_version
+from kisssoft_checkpoint import CHECKPOINT_DIR, CheckpointStore, file_digest
+from kisssoft_com import BACKENDS, ComVars, default_backend, dispatch, enable_multi_vars
+from kisssoft_export import ExportStage
+from kisssoft_fine_sizing import CASE_VARS, case_from_vars, parse_objectives, rank_solutions
+from kisssoft_profile import Profiler, TimedCom
 
 
 # ============================================================
@@ -29,19 +34,88 @@ KISSSYS_EXAMPLE = r"C:\Program Files\KISSsoft 2025\example\SingleStageGearbox.ks
 OUTPUT_DIR = r"C:\task\Obsidian_Vault\이근호\퇴직준비세미나_이근호\Files\KISSsoft_Results"
 LOAD_INCREASE_FACTOR = 1.10  # 하중 증가 비율 (10%)
 
+# 출력 파일명 (OUTPUT_DIR 기준)
+SIZED_FILE = "fine_sized_110pct.z12"          # Fine Sizing 직후 (체크포인트 재개용)
+OPTIMIZED_FILE = "optimized_gear_110pct.z12"
+STEP_FILE = "gearbox_optimized_110pct.step"
+KSYS_FILE = "gearbox_optimized_110pct.ksys"
+TIMING_FILE = "kisssoft_timing.json"          # 단계/COM 메서드별 실행 시간
+
+# 단계 함수와 COM 호출 시간 계측 (리포트 실행 시간 표, TIMING_FILE, --trace)
+PROFILER = Profiler()
+
+# 단계별 COM 변수 (표시명 -> KISSsoft 변수명). 단계마다 한 번에 읽고 쓴다.
+LOAD_VARS = {
+    "토크 [Nm]": "ZS.Torque",
+    "동력 [kW]": "ZS.Power",
+    "회전수 [rpm]": "ZS.Speed",
+    "사용계수 Ka": "ZS.Ka",
+    "요구수명 [hr]": "ZS.Hlife",
+}
+SIZING_RANGE = {
+    "ZR[0].z.min": 18,     # 피니언 최소 잇수
+    "ZR[0].z.max": 30,     # 피니언 최대 잇수
+    "ZR[0].mn.min": 2.0,   # 최소 모듈 [mm]
+    "ZR[0].mn.max": 4.0,   # 최대 모듈 [mm]
+    "ZR[0].b.min": 20.0,   # 최소 이폭 [mm]
+    "ZR[0].b.max": 40.0,   # 최대 이폭 [mm]
+}
+GEAR_SPEC_VARS = {
+    "피니언 잇수": "ZR[0].z",
+    "기어 잇수": "ZR[1].z",
+    "모듈 [mm]": "ZR[0].mn",
+    "이폭 [mm]": "ZR[0].b",
+    "압력각 [deg]": "ZR[0].alfn",
+    "비틀림각 [deg]": "ZR[0].beta",
+    "피치직경-피니언 [mm]": "ZR[0].d",
+    "피치직경-기어 [mm]": "ZR[1].d",
+    "중심거리 [mm]": "ZS.aw",
+}
+LIFE_VARS = {
+    "치면 안전율 (SH)": "ZR[0].SafetyFlank",
+    "치근 안전율 (SF)": "ZR[0].SafetyRoot",
+    "계산수명-치면 [hr]": "ZR[0].LifeFlank",
+    "계산수명-치근 [hr]": "ZR[0].LifeRoot",
+    "요구수명 [hr]": "ZS.Hlife",
+}
+# Fine Sizing 엔진
+#   "kisssoft": CalculateFineSizing 후 솔루션 #1 적용
+#   "native"  : kisssoft_fine_sizing 으로 로컬 순위 -> 상위 SIZING_TOP_K 개만 KISSsoft 에서 검증
+SIZING_ENGINE = "kisssoft"
+SIZING_TOP_K = 3
+SIZING_OBJECTIVES = {"weight": 1.0}     # 목적함수 가중치 (weight/center_distance/min_safety/life)
+SIZING_SF_MIN = 1.0                     # 검증 통과 최소 치근 안전율
+SIZING_SH_MIN = 1.0                     # 검증 통과 최소 치면 안전율
+SIZING_SOLUTION_VARS = ("ZR[0].z", "ZR[1].z", "ZR[0].mn", "ZR[0].b")
+
+# KISSsys 기어 쌍 서브컴포넌트 (GearPair1.*) 에 반영할 변수
+KISSSYS_PAIR = "GearPair1."
+KISSSYS_GEAR_VARS = {
+    "피니언 잇수": "ZR[0].z",
+    "기어 잇수": "ZR[1].z",
+    "모듈 [mm]": "ZR[0].mn",
+    "이폭 [mm]": "ZR[0].b",
+}
+
 
 def ensure_output_dir():
     """출력 디렉토리가 없으면 생성"""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
-def connect_kisssoft():
-    """KISSsoft COM 객체 생성 및 연결"""
+def connect_kisssoft(backend=None, latency=None):
+    """KISSsoft COM 객체 생성 및 연결 (backend: "com" | "local", 기본은 KISSSOFT_BACKEND)"""
     try:
-        ks = win32com.client.Dispatch("KISSsoftCOM.KISSsoft")
+        with PROFILER.span("KISSsoft", "connect"):
+            ks = TimedCom(dispatch("KISSsoftCOM.KISSsoft", backend, latency), PROFILER, "KISSsoft")
         ks.SetSilentMode(True)
-        print("[OK] KISSsoft COM 연결 성공")
+        print(f"[OK] KISSsoft COM 연결 성공 ({backend or default_backend()})")
         return ks
+    except ImportError:
+        print("오류: pywin32가 설치되지 않았습니다.")
+        print("설치: pip install pywin32")
+        print("  - KISSsoft 없이 실행하려면 --backend local")
+        sys.exit(1)
     except Exception as e:
         print(f"[오류] KISSsoft COM 연결 실패: {e}")
         print("  - KISSsoft가 설치되어 있는지 확인하세요")
@@ -49,10 +123,11 @@ def connect_kisssoft():
         sys.exit(1)
 
 
-def connect_kisssys():
+def connect_kisssys(backend=None, latency=None):
     """KISSsys COM 객체 생성 및 연결"""
     try:
-        ksys = win32com.client.Dispatch("KISSsysCOM.KISSsys")
+        with PROFILER.span("KISSsys", "connect"):
+            ksys = TimedCom(dispatch("KISSsysCOM.KISSsys", backend, latency), PROFILER, "KISSsys")
         print("[OK] KISSsys COM 연결 성공")
         return ksys
     except Exception as e:
@@ -61,37 +136,116 @@ def connect_kisssys():
         return None
 
 
+# ============================================================
+# 하중 케이스 공통 처리 (단계 1~3, 하중 스윕 kisssoft_load_sweep.py 에서 사용)
+# ============================================================
+def apply_load_case(kv, original, case):
+    """
+    하중 케이스를 쓰기 예약하고 (토크, 동력, 회전수) 를 돌려준다.
+    case: {"factor": 배율} -> 원본 토크/동력에 배율 적용
+          {"torque": Nm, "speed": rpm} -> 절대값 (동력은 T*n/9549 로 계산, speed 생략 시 원본)
+    """
+    speed = case.get("speed", original["회전수 [rpm]"])
+    values = {}
+    if "torque" in case:
+        torque = case["torque"]
+        power = torque * speed / 9549
+        if speed != original["회전수 [rpm]"]:
+            values["ZS.Speed"] = speed
+    else:
+        factor = case.get("factor", LOAD_INCREASE_FACTOR)
+        torque = original["토크 [Nm]"] * factor
+        power = original["동력 [kW]"] * factor
+    values.update({"ZS.Torque": torque, "ZS.Power": power})
+    kv.set_many(values)
+    return torque, power, speed
+
+
+def configure_sizing(engine=None, top_k=None, objectives=None):
+    """Fine Sizing 설정 변경 (CLI, 하중 스윕 작업 프로세스에서 호출)"""
+    global SIZING_ENGINE, SIZING_TOP_K, SIZING_OBJECTIVES
+    if engine:
+        SIZING_ENGINE = engine
+    if top_k:
+        SIZING_TOP_K = top_k
+    if objectives:
+        SIZING_OBJECTIVES = parse_objectives(objectives) if isinstance(objectives, str) else objectives
+
+
+def sizing_range(ranges=None):
+    """SIZING_RANGE 에 케이스별 범위(다단 모델의 단별 범위 등)를 덮어쓴 탐색 범위"""
+    return {**SIZING_RANGE, **(ranges or {})}
+
+
+def native_fine_size(kv, ranges=None):
+    """
+    로컬 엔진이 순위를 확정하는 대로 (상위 SIZING_TOP_K 개까지) KISSsoft 에서 계산해
+    최소 안전율을 처음 만족하는 후보를 적용한다 (남은 탐색은 하지 않음).
+    CalculateFineSizing 은 호출하지 않는다.
+    반환: (검증한 로컬 후보 목록, 적용한 후보 번호 또는 None)
+    """
+    case = case_from_vars(kv.fetch(CASE_VARS), SIZING_SF_MIN, SIZING_SH_MIN)
+    candidates = []
+    sf_var, sh_var = LIFE_VARS["치근 안전율 (SF)"], LIFE_VARS["치면 안전율 (SH)"]
+    for c in rank_solutions(case, SIZING_OBJECTIVES, SIZING_TOP_K, ranges=sizing_range(ranges)):
+        i = len(candidates)
+        candidates.append(c)
+        kv.set_many(dict(zip(SIZING_SOLUTION_VARS, (c.z1, c.z2, c.mn, c.b))))
+        kv.call("Calculate")
+        safety = kv.fetch([sf_var, sh_var])
+        if safety[sf_var] >= SIZING_SF_MIN and safety[sh_var] >= SIZING_SH_MIN:
+            return candidates, i
+    # 검증을 통과한 후보가 없으면 원래 제원으로 되돌린다
+    kv.set_many(dict(zip(SIZING_SOLUTION_VARS, (case.z1, case.z2, case.mn, case.b))))
+    return candidates, None
+
+
+def fine_size(kv, ranges=None):
+    """
+    탐색 범위 설정 후 Fine Sizing 실행, 최적 솔루션 적용. 반환: 솔루션 수
+    (native 엔진은 KISSsoft 검증을 통과한 후보가 있으면 검증한 로컬 후보 수, 없으면 0)
+    ranges: SIZING_RANGE 대신 쓸 항목 (sizing_range 참고)
+    """
+    if SIZING_ENGINE == "native":
+        candidates, accepted = native_fine_size(kv, ranges)
+        return len(candidates) if accepted is not None else 0
+    kv.set_many(sizing_range(ranges))
+    kv.call("CalculateFineSizing")
+    num_solutions = kv.get("FineSizing.NumResults")
+    if num_solutions > 0:
+        kv.call("SetFineSizingSolution", 0)
+    return num_solutions
+
+
+def calculate_results(kv):
+    """강도 계산 후 (기어 제원, 수명/안전율) 을 한 번에 읽는다."""
+    kv.call("Calculate")
+    kv.fetch([*GEAR_SPEC_VARS.values(), *LIFE_VARS.values()])
+    return kv.fetch_labeled(GEAR_SPEC_VARS), kv.fetch_labeled(LIFE_VARS)
+
+
 # ============================================================
 # 단계 1: 예제 모델 로드 및 하중 10% 증가
 # ============================================================
-def step1_load_and_increase_load(ks):
-    """예제 모델을 열고 하중을 10% 증가시킨다."""
+@PROFILER.timed("단계 1: 모델 로드/하중 증가")
+def step1_load_and_increase_load(kv):
+    """예제 모델을 열고 하중을 10% 증가시킨다. kv: KISSsoft ComVars"""
     print("\n" + "=" * 60)
     print("단계 1: 예제 모델 로드 및 하중 10% 증가")
     print("=" * 60)
 
-    ks.OpenFile(KISSSOFT_EXAMPLE)
+    kv.call("OpenFile", KISSSOFT_EXAMPLE)
     print(f"  파일 열기: {KISSSOFT_EXAMPLE}")
 
-    # 현재 하중 조건 읽기
-    original = {
-        "토크 [Nm]": ks.GetVar("ZS.Torque"),
-        "동력 [kW]": ks.GetVar("ZS.Power"),
-        "회전수 [rpm]": ks.GetVar("ZS.Speed"),
-        "사용계수 Ka": ks.GetVar("ZS.Ka"),
-        "요구수명 [hr]": ks.GetVar("ZS.Hlife"),
-    }
+    # 현재 하중 조건 읽기 (계산이 바꾸지 않는 입력값 -> 실행 내내 캐시)
+    original = kv.fetch_labeled(LOAD_VARS, stable=True)
 
     print("\n  [원본 하중 조건]")
     for k, v in original.items():
         print(f"    {k}: {v}")
 
     # 하중 10% 증가
-    new_torque = original["토크 [Nm]"] * LOAD_INCREASE_FACTOR
-    new_power = original["동력 [kW]"] * LOAD_INCREASE_FACTOR
-
-    ks.SetVar("ZS.Torque", new_torque)
-    ks.SetVar("ZS.Power", new_power)
+    new_torque, new_power, _ = apply_load_case(kv, original, {"factor": LOAD_INCREASE_FACTOR})
 
     print(f"\n  [하중 +{int((LOAD_INCREASE_FACTOR - 1) * 100)}% 적용]")
     print(f"    토크: {original['토크 [Nm]']:.2f} → {new_torque:.2f} Nm")
@@ -103,37 +257,36 @@ def step1_load_and_increase_load(ks):
 # ============================================================
 # 단계 2: Fine Sizing으로 기어 Spec. 최적화
 # ============================================================
-def step2_fine_sizing(ks):
+@PROFILER.timed("단계 2: Fine Sizing")
+def step2_fine_sizing(kv):
     """COM Expert(CC2)의 Fine Sizing을 실행하여 최적 기어 제원을 탐색한다."""
     print("\n" + "=" * 60)
     print("단계 2: Fine Sizing 최적화 (COM Expert CC2)")
     print("=" * 60)
 
-    # Fine Sizing 탐색 범위 설정
-    sizing_params = {
-        "ZR[0].z.min": 18,     # 피니언 최소 잇수
-        "ZR[0].z.max": 30,     # 피니언 최대 잇수
-        "ZR[0].mn.min": 2.0,   # 최소 모듈 [mm]
-        "ZR[0].mn.max": 4.0,   # 최대 모듈 [mm]
-        "ZR[0].b.min": 20.0,   # 최소 이폭 [mm]
-        "ZR[0].b.max": 40.0,   # 최대 이폭 [mm]
-    }
-
+    # Fine Sizing 탐색 범위 (하중 변경과 함께 실행 직전에 한 번에 반영)
     print("  [Fine Sizing 탐색 범위]")
-    for k, v in sizing_params.items():
-        ks.SetVar(k, v)
+    for k, v in SIZING_RANGE.items():
         print(f"    {k} = {v}")
 
-    # Fine Sizing 실행
-    print("\n  Fine Sizing 실행 중...")
-    ks.CalculateFineSizing()
+    if SIZING_ENGINE == "native":
+        print(f"\n  로컬 엔진 순위 -> 상위 {SIZING_TOP_K}개 KISSsoft 검증 "
+              f"(목적함수: {SIZING_OBJECTIVES})")
+        candidates, accepted = native_fine_size(kv)
+        for i, c in enumerate(candidates):
+            mark = "적용" if i == accepted else "불합격"
+            print(f"    #{i + 1} z={c.z1}/{c.z2} mn={c.mn} b={c.b:g} a={c.a:.1f} "
+                  f"SF={c.SF:.2f} SH={c.SH:.2f} 점수={c.score:.3f} [{mark}]")
+        if accepted is None:
+            print("  [경고] 검증을 통과한 후보가 없습니다. --top-k 를 늘리거나 범위를 넓혀보세요.")
+        return
 
-    num_solutions = ks.GetVar("FineSizing.NumResults")
+    # Fine Sizing 실행, 최적(첫 번째) 솔루션 적용
+    print("\n  Fine Sizing 실행 중...")
+    num_solutions = fine_size(kv)
     print(f"  탐색 완료: {num_solutions}개 솔루션 발견")
 
     if num_solutions > 0:
-        # 최적(첫 번째) 솔루션 적용
-        ks.SetFineSizingSolution(0)
         print("  최적 솔루션(#1) 적용 완료")
     else:
         print("  [경고] Fine Sizing 결과가 없습니다. 범위를 넓혀보세요.")
@@ -142,37 +295,17 @@ def step2_fine_sizing(ks):
 # ============================================================
 # 단계 3: 재계산 및 수명/안전율 결과 획득
 # ============================================================
-def step3_calculate_and_get_results(ks):
+@PROFILER.timed("단계 3: 강도 계산/결과")
+def step3_calculate_and_get_results(kv):
     """강도 계산을 실행하고 최적화된 기어 Spec.과 수명/안전율을 읽는다."""
     print("\n" + "=" * 60)
     print("단계 3: 강도 계산 및 결과 획득")
     print("=" * 60)
 
-    ks.Calculate()
+    # 기어 제원과 수명/안전율을 한 번에 읽기 (ZS.Hlife 는 단계 1 캐시 사용)
+    gear_spec, life_results = calculate_results(kv)
     print("  강도 계산 완료")
 
-    # 최적화된 기어 제원 읽기
-    gear_spec = {
-        "피니언 잇수": ks.GetVar("ZR[0].z"),
-        "기어 잇수": ks.GetVar("ZR[1].z"),
-        "모듈 [mm]": ks.GetVar("ZR[0].mn"),
-        "이폭 [mm]": ks.GetVar("ZR[0].b"),
-        "압력각 [deg]": ks.GetVar("ZR[0].alfn"),
-        "비틀림각 [deg]": ks.GetVar("ZR[0].beta"),
-        "피치직경-피니언 [mm]": ks.GetVar("ZR[0].d"),
-        "피치직경-기어 [mm]": ks.GetVar("ZR[1].d"),
-        "중심거리 [mm]": ks.GetVar("ZS.aw"),
-    }
-
-    # 수명/안전율 결과 읽기
-    life_results = {
-        "치면 안전율 (SH)": ks.GetVar("ZR[0].SafetyFlank"),
-        "치근 안전율 (SF)": ks.GetVar("ZR[0].SafetyRoot"),
-        "계산수명-치면 [hr]": ks.GetVar("ZR[0].LifeFlank"),
-        "계산수명-치근 [hr]": ks.GetVar("ZR[0].LifeRoot"),
-        "요구수명 [hr]": ks.GetVar("ZS.Hlife"),
-    }
-
     print("\n  [최적화된 기어 제원]")
     for k, v in gear_spec.items():
         print(f"    {k}: {v}")
@@ -182,8 +315,8 @@ def step3_calculate_and_get_results(ks):
         print(f"    {k}: {v}")
 
     # 최적화된 KISSsoft 파일 저장
-    optimized_file = os.path.join(OUTPUT_DIR, "optimized_gear_110pct.z12")
-    ks.SaveFile(optimized_file)
+    optimized_file = os.path.join(OUTPUT_DIR, OPTIMIZED_FILE)
+    kv.call("SaveFile", optimized_file)
     print(f"\n  저장: {optimized_file}")
 
     return gear_spec, life_results
@@ -192,53 +325,48 @@ def step3_calculate_and_get_results(ks):
 # ============================================================
 # 단계 4: KISSsys 시스템 모델에 반영 및 3D 출력
 # ============================================================
-def step4_kisssys_3d_export(ksys, gear_spec, new_torque):
-    """KISSsys 시스템 모델에 최적화 결과를 반영하고 3D STEP을 출력한다."""
+@PROFILER.timed("단계 4: KISSsys/3D 출력 (백그라운드)")
+def kisssys_export(ksys, gear_spec, new_torque, step_file, ksys_file=None):
+    """
+    KISSsys 기어 쌍에 제원/토크 반영 -> 시스템 계산 -> 3D STEP (+ .ksys) 저장.
+    내보내기 단계(ExportStage) 작업 스레드에서 실행된다. 반환: ComVars
+    """
+    kv = ComVars(ksys, prefix=KISSSYS_PAIR)
+    kv.call("OpenFile", KISSSYS_EXAMPLE)
+    # 기어 쌍 서브컴포넌트에 최적화 결과 반영 (계산 직전에 한 번에 쓰기)
+    kv.set_many(kisssys_writes(gear_spec, new_torque))
+    kv.call("Calculate")
+    kv.call("Export3D", step_file)
+    if ksys_file:
+        kv.call("SaveFile", ksys_file)
+    return kv
+
+
+@PROFILER.timed("단계 4: 작업 등록")
+def step4_kisssys_3d_export(stage, gear_spec, new_torque):
+    """
+    KISSsys 시스템 반영/3D STEP 출력을 내보내기 단계(stage)에 넣는다.
+    계산 결과는 이미 있으므로 기다리지 않고 돌아간다. 반환: ExportJob
+    """
     print("\n" + "=" * 60)
-    print("단계 4: KISSsys 시스템 반영 및 3D 모델 출력")
+    print("단계 4: KISSsys 시스템 반영 및 3D 모델 출력 (백그라운드)")
     print("=" * 60)
 
-    if ksys is None:
-        print("  [건너뜀] KISSsys COM 연결이 없습니다.")
-        return
-
-    ksys.OpenFile(KISSSYS_EXAMPLE)
-    print(f"  파일 열기: {KISSSYS_EXAMPLE}")
-
-    # 기어 쌍 서브컴포넌트에 최적화 결과 반영
-    ksys.SetVar("GearPair1.ZS.Torque", new_torque)
-    ksys.SetVar("GearPair1.ZR[0].z", gear_spec["피니언 잇수"])
-    ksys.SetVar("GearPair1.ZR[1].z", gear_spec["기어 잇수"])
-    ksys.SetVar("GearPair1.ZR[0].mn", gear_spec["모듈 [mm]"])
-    ksys.SetVar("GearPair1.ZR[0].b", gear_spec["이폭 [mm]"])
-    print("  최적화 결과 반영 완료")
-
-    # 시스템 레벨 재계산
-    ksys.Calculate()
-    print("  시스템 계산 완료")
-
-    # 3D STEP 파일 출력
-    step_file = os.path.join(OUTPUT_DIR, "gearbox_optimized_110pct.step")
-    ksys.Export3D(step_file)
-    print(f"  3D STEP 출력: {step_file}")
-
-    # KISSsys 파일 저장
-    ksys_file = os.path.join(OUTPUT_DIR, "gearbox_optimized_110pct.ksys")
-    ksys.SaveFile(ksys_file)
-    print(f"  저장: {ksys_file}")
-
-    ksys.Close()
+    step_file = os.path.join(OUTPUT_DIR, STEP_FILE)
+    ksys_file = os.path.join(OUTPUT_DIR, KSYS_FILE)
+    print(f"  작업 등록: {KISSSYS_EXAMPLE} -> {STEP_FILE}, {KSYS_FILE}")
+    return stage.submit("KISSsys/3D", kisssys_export, gear_spec, new_torque, step_file, ksys_file)
 
 
 # ============================================================
 # 단계 5: 결과 비교 리포트 생성 (Markdown)
 # ============================================================
-def step5_generate_report(original, gear_spec, life_results):
-    """원본 vs 최적화 결과를 Markdown 비교표로 출력한다."""
-    print("\n" + "=" * 60)
-    print("단계 5: 결과 비교 리포트 생성")
-    print("=" * 60)
-
+def write_report(original, gear_spec, life_results, export_status=""):
+    """
+    리포트 Markdown 을 만들어 저장. 반환: (경로, 본문)
+    export_status: KISSsys/3D 출력 상태 (진행 중이면 끝난 뒤 다시 불러 갱신)
+    실행 시간 표는 쓰는 시점까지의 계측값 (PROFILER)
+    """
     today = datetime.now().strftime("%Y-%m-%d")
     increase_pct = int((LOAD_INCREASE_FACTOR - 1) * 100)
 
@@ -285,25 +413,221 @@ tags: [KISSsoft, 기어최적화, 하중변경]
 
 ## 출력 파일
 
-- KISSsoft 계산 파일: `optimized_gear_110pct.z12`
-- KISSsys 시스템 파일: `gearbox_optimized_110pct.ksys`
-- 3D STEP 모델: `gearbox_optimized_110pct.step`
-"""
+- KISSsoft 계산 파일: `{OPTIMIZED_FILE}`
+- KISSsys 시스템 파일: `{KSYS_FILE}`
+- 3D STEP 모델: `{STEP_FILE}`
+{f"- KISSsys/3D 출력 상태: {export_status}" if export_status else ""}
+
+{PROFILER.markdown()}"""
 
     report_path = os.path.join(OUTPUT_DIR, "기어최적화_결과리포트.md")
     with open(report_path, "w", encoding="utf-8") as f:
         f.write(report)
+    return report_path, report
+
 
+@PROFILER.timed("단계 5: 리포트 생성")
+def step5_generate_report(original, gear_spec, life_results, export_status=""):
+    """원본 vs 최적화 결과를 Markdown 비교표로 출력한다."""
+    print("\n" + "=" * 60)
+    print("단계 5: 결과 비교 리포트 생성")
+    print("=" * 60)
+
+    report_path, report = write_report(original, gear_spec, life_results, export_status)
     print(f"  리포트 저장: {report_path}")
     print(report)
 
     return report_path
 
 
+# ============================================================
+# 체크포인트 파이프라인
+# ============================================================
+def sizing_settings():
+    """결과에 영향을 주는 설정 (체크포인트 키에 포함 -> 바뀌면 처음부터 다시 계산)"""
+    return {"range": SIZING_RANGE, "engine": SIZING_ENGINE, "top_k": SIZING_TOP_K,
+            "objectives": SIZING_OBJECTIVES, "SF_min": SIZING_SF_MIN, "SH_min": SIZING_SH_MIN}
+
+
+def checkpoint_store():
+    return CheckpointStore(os.path.join(OUTPUT_DIR, CHECKPOINT_DIR))
+
+
+def open_checkpoint(case, fresh=False):
+    """(예제 모델 파일 해시, 하중 케이스, 설정) 의 체크포인트. fresh=True 이면 비우고 시작."""
+    store = checkpoint_store()
+    ck = store.open(store.key(file_digest(KISSSOFT_EXAMPLE), case, sizing_settings()))
+    if fresh:
+        ck.clear()
+    return ck
+
+
+def result_cache(root=None, max_bytes=DEFAULT_MAX_BYTES):
+    """계산 결과 캐시 (기본 위치: KISSSOFT_CACHE_DIR 환경 변수 또는 OUTPUT_DIR/.cache)"""
+    root = root or os.environ.get("KISSSOFT_CACHE_DIR") or os.path.join(OUTPUT_DIR, CACHE_DIR)
+    return ResultCache(root, max_bytes)
+
+
+def kisssys_writes(gear_spec, new_torque):
+    """KISSsys 기어 쌍에 반영할 {변수명: 값} (GearPair1. 접두어 제외)"""
+    return {"ZS.Torque": new_torque,
+            **{var: gear_spec[label] for label, var in KISSSYS_GEAR_VARS.items()}}
+
+
+def sizing_cache_key(kv, cache, version, model=KISSSOFT_EXAMPLE, ranges=None):
+    """
+    Fine Sizing + 강도 계산 결과의 캐시 키. 하중을 쓰기 예약한 직후(단계 1 다음)에 부른다.
+    Fine Sizing 범위는 fine_size 에서 쓰므로 미리 합쳐 둔다.
+    """
+    return cache.key(file_digest(model), {**kv.writes(), **sizing_range(ranges)}, version,
+                     sizing_settings())
+
+
+def run_pipeline(ck, backend=None, latency=None, cache=None):
+    """
+    단계 1~5 실행. ck(Checkpoint) 에 완료 기록이 있는 단계는 건너뛰고,
+    KISSsoft/KISSsys 는 다시 계산할 단계가 있을 때만 연결한다.
+      - 단계 3 까지 완료: KISSsoft 연결 없이 단계 4 부터
+      - 단계 2 까지 완료: Fine Sizing 결과 파일(SIZED_FILE)을 열어 단계 3 부터
+    cache(ResultCache) 가 있으면 같은 모델/입력/버전의 결과와 생성 파일을 재사용해
+    단계 2~3 (Fine Sizing, Calculate) 과 단계 4 (KISSsys 계산, Export3D) 를 건너뛴다.
+    단계 4 는 백그라운드 내보내기 단계에서 실행하고, KISSsoft 는 단계 3 직후 닫는다.
+    단계 5 (리포트) 는 내보내기를 기다리지 않고 먼저 쓰고, 끝나면 출력 상태를 갱신한다.
+    """
+    ks = kv = ksys_vars = None
+    try:
+        done = ck.get("step3")
+        if done is None:
+            ks = connect_kisssoft(backend, latency)
+            kv = ComVars(ks)
+            version = kisssoft_version(ks)
+            original, sized = ck.get("step1"), ck.get("step2")
+            key = hit = None
+            if original is not None and sized is not None:
+                kv.call("OpenFile", sized["file"])
+                print(f"\n[체크포인트] 단계 1~2 완료 -> {sized['file']} 에서 재개")
+            else:
+                # 단계 1: 하중 증가
+                original = step1_load_and_increase_load(kv)
+                ck.save("step1", original)
+
+                if cache is not None:
+                    key = sizing_cache_key(kv, cache, version)
+                    hit = cache.get(key, require=("z12",))
+                if hit is None:
+                    # 단계 2: Fine Sizing 최적화 (결과 모델을 저장해 두고 재개에 사용)
+                    step2_fine_sizing(kv)
+                    sized_file = os.path.join(OUTPUT_DIR, SIZED_FILE)
+                    kv.call("SaveFile", sized_file)
+                    ck.save("step2", {"file": sized_file}, files=[sized_file])
+
+            # 단계 3: 계산 및 결과 획득
+            optimized_file = os.path.join(OUTPUT_DIR, OPTIMIZED_FILE)
+            if hit is not None:
+                gear_spec, life_results = hit["value"]["gear_spec"], hit["value"]["life_results"]
+                cache.restore(hit, "z12", optimized_file)
+                print(f"\n[캐시] 같은 조건의 결과 재사용 -> 단계 2~3 건너뜀 ({key[:12]})")
+            else:
+                gear_spec, life_results = step3_calculate_and_get_results(kv)
+                if key is not None:
+                    cache.put(key, {"gear_spec": gear_spec, "life_results": life_results},
+                              {"z12": optimized_file})
+            ck.save("step3", {"gear_spec": gear_spec, "life_results": life_results,
+                              "file": optimized_file, "version": version}, files=[optimized_file])
+            ck.discard("step4")     # 제원이 새로 계산됐으므로 KISSsys 반영도 다시
+            # 계산이 끝났으므로 KISSsoft 라이선스는 내보내기를 기다리지 않고 반환
+            ks.Close()
+            ks = None
+        else:
+            original = ck.get("step1")
+            gear_spec, life_results = done["gear_spec"], done["life_results"]
+            version = done.get("version", "unknown")
+            print(f"\n[체크포인트] 단계 1~3 완료 -> 저장된 결과 사용 ({done['file']})")
+
+        # 단계 4: KISSsys 반영 및 3D 출력 (백그라운드, 리포트는 먼저)
+        job = key = None
+        files = {"step": os.path.join(OUTPUT_DIR, STEP_FILE),
+                 "ksys": os.path.join(OUTPUT_DIR, KSYS_FILE)}
+        if ck.get("step4") is not None:
+            export_status = "완료 (이전 실행)"
+            print("\n[체크포인트] 단계 4 완료 -> KISSsys 반영/3D 출력 건너뜀")
+        else:
+            new_torque = original["토크 [Nm]"] * LOAD_INCREASE_FACTOR
+            hit = None
+            if cache is not None:
+                key = cache.key(file_digest(KISSSYS_EXAMPLE),
+                                kisssys_writes(gear_spec, new_torque), version)
+                hit = cache.get(key, require=tuple(files))
+            if hit is not None:
+                for name, dest in files.items():
+                    cache.restore(hit, name, dest)
+                ck.save("step4", {"files": list(files.values())}, files=files.values())
+                export_status = "완료 (캐시)"
+                print(f"\n[캐시] 같은 제원의 KISSsys/3D 결과 재사용 -> 단계 4 건너뜀 ({key[:12]})")
+            else:
+                stage = ExportStage(backend, latency,
+                                    connect=lambda: connect_kisssys(backend, latency))
+                job = step4_kisssys_3d_export(stage, gear_spec, new_torque)
+                export_status = job.status_text()
+
+        # 단계 5: 리포트 생성 (내보내기 상태는 끝난 뒤 갱신)
+        report_path = step5_generate_report(original, gear_spec, life_results, export_status)
+
+        if job is not None:
+            print("\n  KISSsys/3D 출력 대기 중...")
+            stage.close()
+            print(f"  KISSsys/3D 출력: {job.status_text()}")
+            write_report(original, gear_spec, life_results, job.status_text())
+            if job.status == "done":
+                ksys_vars = job.result
+                ck.save("step4", {"files": list(files.values())}, files=files.values())
+                if key is not None:
+                    cache.put(key, {"torque": original["토크 [Nm]"] * LOAD_INCREASE_FACTOR}, files)
+        trips = sum(v.round_trips for v in (kv, ksys_vars) if v is not None)
+        print(f"\n  COM 왕복 횟수: {trips}회")
+
+        ck.save("step5", {"report": report_path}, files=[report_path])
+        return report_path
+
+    finally:
+        if ks is not None:
+            try:
+                ks.Close()
+            except Exception:
+                pass
+
+
 # ============================================================
 # 메인 실행
 # ============================================================
 def main():
+    global OUTPUT_DIR
+    parser = argparse.ArgumentParser(description="KISSsoft COM Expert 기어 최적화")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="COM 백엔드 (기본: KISSSOFT_BACKEND 또는 com)")
+    parser.add_argument("--latency", help="local 백엔드 호출 지연 [s] (예: 0.01,Calculate=0.5)")
+    parser.add_argument("--multi-vars", action="store_true",
+                        help="local 백엔드에서 GetVars/SetVars 다중 변수 경로 사용 (일괄 읽기 검증용)")
+    parser.add_argument("--output-dir", help=f"출력 디렉토리 (기본: {OUTPUT_DIR})")
+    parser.add_argument("--sizing", choices=("kisssoft", "native"), default=SIZING_ENGINE,
+                        help="Fine Sizing 엔진 (native: 로컬 순위 후 상위 후보만 KISSsoft 검증)")
+    parser.add_argument("--top-k", type=int, help=f"native 검증 후보 수 (기본: {SIZING_TOP_K})")
+    parser.add_argument("--objectives", help="native 목적함수 가중치 (예: weight=1,min_safety=0.5)")
+    parser.add_argument("--fresh", action="store_true", help="체크포인트를 무시하고 단계 1부터 실행")
+    parser.add_argument("--no-cache", action="store_true", help="계산 결과 캐시를 쓰지 않음")
+    parser.add_argument("--cache-dir", help="결과 캐시 위치 (기본: KISSSOFT_CACHE_DIR 또는 출력/.cache)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 2**20,
+                        help="결과 캐시 최대 크기 [MB]")
+    parser.add_argument("--trace", help="Chrome trace 파일 경로 (chrome://tracing 에서 열기)")
+    args = parser.parse_args()
+    if args.output_dir:
+        OUTPUT_DIR = args.output_dir
+    if args.multi_vars:
+        if args.backend != "local":
+            parser.error("--multi-vars 는 --backend local 에서만 사용 가능")
+        enable_multi_vars()
+    configure_sizing(args.sizing, args.top_k, args.objectives)
+
     print("=" * 60)
     print("KISSsoft COM Expert 기어 최적화 스크립트")
     print(f"하중 증가율: +{int((LOAD_INCREASE_FACTOR - 1) * 100)}%")
@@ -312,26 +636,14 @@ def main():
 
     ensure_output_dir()
 
-    # COM 연결
-    ks = connect_kisssoft()
-    ksys = connect_kisssys()
+    ck = open_checkpoint({"factor": LOAD_INCREASE_FACTOR}, fresh=args.fresh)
+    cache = None if args.no_cache else result_cache(args.cache_dir, args.cache_size * 2**20)
 
     try:
-        # 단계 1: 하중 증가
-        original = step1_load_and_increase_load(ks)
-
-        # 단계 2: Fine Sizing 최적화
-        step2_fine_sizing(ks)
-
-        # 단계 3: 계산 및 결과 획득
-        gear_spec, life_results = step3_calculate_and_get_results(ks)
-
-        # 단계 4: KISSsys 반영 및 3D 출력
-        new_torque = original["토크 [Nm]"] * LOAD_INCREASE_FACTOR
-        step4_kisssys_3d_export(ksys, gear_spec, new_torque)
-
-        # 단계 5: 리포트 생성
-        step5_generate_report(original, gear_spec, life_results)
+        with PROFILER.span("실행", "run"):
+            run_pipeline(ck, args.backend, args.latency, cache)
+        if cache is not None:
+            print(f"\n  결과 캐시: 적중 {cache.hits}회, 미적중 {cache.misses}회 ({cache.root})")
 
         print("\n" + "=" * 60)
         print("모든 단계 완료!")
@@ -342,13 +654,15 @@ def main():
         print("  - KISSsoft 라이선스(CC1, CC2 모듈)를 확인하세요")
         print("  - 변수명이 KISSsoft 버전과 일치하는지 확인하세요")
         print("  - GUI에서 View > Show variable name으로 정확한 변수명을 확인하세요")
+        print(f"  - 다시 실행하면 완료된 단계는 건너뜁니다 (체크포인트: {ck.path})")
         raise
 
     finally:
-        try:
-            ks.Close()
-        except Exception:
-            pass
+        # 실패한 실행도 어디서 시간을 썼는지 남긴다
+        timing_path = PROFILER.write_json(os.path.join(OUTPUT_DIR, TIMING_FILE))
+        print(f"\n  실행 시간 기록: {timing_path}")
+        if args.trace:
+            print(f"  Chrome trace: {PROFILER.write_trace(args.trace)}")
 
 
 if __name__ == "__main__":
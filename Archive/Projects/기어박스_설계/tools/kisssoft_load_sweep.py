@@ -0,0 +1,386 @@
+"""
+KISSsoft 하중 케이스 병렬 스윕 (디레이팅 검토용)
+- 하중 배율 목록 또는 토크-회전수 점 목록을 N 개 작업 프로세스에 분배
+- 프로세스마다 KISSsoftCOM.KISSsoft 인스턴스를 한 번만 만들어 재사용
+  (케이스마다: 파일 열기 -> 하중 적용 -> Fine Sizing -> 강도 계산 -> 결과 수집)
+- 전체 케이스를 하나의 비교표(Markdown + CSV)로 저장
+- 3D STEP 은 전 케이스가 아니라 상위 N 개 설계만 요청 시 출력 (--export-top, 백그라운드 단계)
+- 동시 인스턴스 수는 라이선스 수에 맞게 --instances 로 지정
+
+사용법:
+    python kisssoft_load_sweep.py --factors 1.0,1.05,1.10,1.20 [--instances 2]
+    python kisssoft_load_sweep.py --cases 하중케이스.csv [--instances 2] [--save]
+    python kisssoft_load_sweep.py --factors 1.0,1.1 --backend local --latency 0.01   (KISSsoft 없이)
+    python kisssoft_load_sweep.py --factors 1.0,1.1,1.2 --export-top 1 --export-by "중심거리 [mm]"
+
+케이스 CSV 열: label(선택), factor  또는  label(선택), torque [Nm], speed [rpm]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+
+import kisssoft_gear_optimization as opt
+from kisssoft_cache import DEFAULT_MAX_BYTES, kisssoft_version
+from kisssoft_checkpoint import file_digest
+from kisssoft_com import BACKENDS, ComVars, default_backend, dispatch, enable_multi_vars
+from kisssoft_export import ExportStage
+
+DEFAULT_INSTANCES = 2   # 동시 KISSsoft 인스턴스 수 (보유 라이선스 수 이하)
+DEFAULT_EXPORT_BY = "중심거리 [mm]"   # 3D 출력 대상 선정 기준 (작은 순)
+SWEEP_REPORT = "하중스윕_비교.md"
+SWEEP_CSV = "하중스윕_비교.csv"
+
+# 작업 프로세스마다 하나씩 (COM 인스턴스와 변수 접근기)
+_worker = {}
+
+
+# ============================================================
+# 케이스 입력
+# ============================================================
+def parse_factors(text):
+    """'1.0,1.1' -> [{"label": "x1.00", "factor": 1.0}, ...]"""
+    return [{"label": f"x{float(f):.2f}", "factor": float(f)}
+            for f in text.split(",") if f.strip()]
+
+
+def read_cases(path):
+    """케이스 CSV -> 케이스 dict 목록 (빈 칸은 무시)"""
+    cases = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            case = {k: float(v) for k, v in row.items()
+                    if k in ("factor", "torque", "speed") and v not in (None, "")}
+            case["label"] = row.get("label") or f"case{i + 1}"
+            cases.append(case)
+    return cases
+
+
+# ============================================================
+# 작업 프로세스
+# ============================================================
+def _init_worker(save_dir, backend=None, latency=None, sizing=None, cache=None):
+    """cache: (캐시 절대 경로, 최대 크기) 또는 None (프로세스마다 ResultCache 를 연다)"""
+    _worker.update(save_dir=save_dir, backend=backend or default_backend(), latency=latency)
+    if sizing:
+        opt.configure_sizing(**sizing)
+    _worker["cache"] = opt.result_cache(*cache) if cache else None
+
+
+def _worker_vars():
+    """이 프로세스의 KISSsoft 인스턴스 (처음 호출할 때 한 번만 생성)"""
+    if "kv" not in _worker:
+        if "close" not in _worker:
+            # 풀이 정상 종료될 때 인스턴스를 닫고 (라이선스 반환) COM 초기화를 해제한다
+            _worker["close"] = Finalize(None, _close_worker, exitpriority=10)
+            if _worker["backend"] == "com":
+                import pythoncom
+                pythoncom.CoInitialize()
+                _worker["com_init"] = True
+        ks = _worker["ks"] = dispatch("KISSsoftCOM.KISSsoft", _worker["backend"],
+                                      _worker["latency"])
+        ks.SetSilentMode(True)
+        _worker["kv"] = ComVars(ks)
+        _worker["version"] = kisssoft_version(ks)
+    return _worker["kv"]
+
+
+def _close_worker():
+    """_worker_vars 정리: 인스턴스를 닫고, COM 참조를 모두 놓은 뒤 CoUninitialize"""
+    _worker.pop("kv", None)
+    ks = _worker.pop("ks", None)
+    try:
+        if ks is not None:
+            ks.Close()
+    finally:
+        del ks
+        if _worker.pop("com_init", False):
+            import pythoncom
+            pythoncom.CoUninitialize()
+
+
+def run_case(index, case):
+    """
+    케이스 1개 계산. COM 오류는 예외 대신 error 필드로 돌려준다.
+    case 의 "vars" ({변수명: 값}) 는 하중과 함께 모델에 쓰고, "ranges" 는 Fine Sizing 범위에
+    덮어쓴다 (다단 모델의 단별 계산, kisssoft_multistage.py). "file" 은 저장 파일명.
+    반환: 비교표 1행 dict
+    """
+    record = {"case": index, "label": case.get("label", f"case{index + 1}"), "pid": os.getpid()}
+    t0 = time.perf_counter()
+    try:
+        kv = _worker_vars()
+        kv.call("OpenFile", opt.KISSSOFT_EXAMPLE)
+        original = kv.fetch_labeled(opt.LOAD_VARS, stable=True)
+        torque, power, speed = opt.apply_load_case(kv, original, case)
+        kv.set_many(case.get("vars", {}))
+        record.update({"토크 [Nm]": torque, "동력 [kW]": power, "회전수 [rpm]": speed})
+        save_dir, cache = _worker.get("save_dir"), _worker.get("cache")
+        if save_dir:
+            name = case.get("file") or f"load_case_{index + 1:03d}_{record['label']}.z12"
+            record["file"] = os.path.join(save_dir, name)
+
+        key = hit = None
+        if cache is not None:
+            key = opt.sizing_cache_key(kv, cache, _worker["version"], ranges=case.get("ranges"))
+            hit = cache.get(key, require=("z12",) if save_dir else ())
+        if hit is not None:
+            value = hit["value"]
+            record["솔루션 수"] = value.get("num_solutions")
+            record.update(value["gear_spec"])
+            record.update(value["life_results"])
+            if save_dir:
+                cache.restore(hit, "z12", record["file"])
+            record["cache"] = True
+        else:
+            record["솔루션 수"] = opt.fine_size(kv, case.get("ranges"))
+            gear_spec, life_results = opt.calculate_results(kv)
+            record.update(gear_spec)
+            record.update(life_results)
+            if save_dir:
+                kv.call("SaveFile", record["file"])
+            if key is not None:
+                cache.put(key, {"gear_spec": gear_spec, "life_results": life_results,
+                                "num_solutions": record["솔루션 수"]},
+                          {"z12": record["file"]} if save_dir else None)
+        record["error"] = None
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["시간 [s]"] = time.perf_counter() - t0
+    return record
+
+
+def _run_indexed(item):
+    return run_case(*item)
+
+
+# ============================================================
+# 스윕 실행
+# ============================================================
+def _case_checkpoints(cases, save_dir, fresh):
+    """케이스별 체크포인트 (모델 해시 + 케이스 + Fine Sizing 설정 + 파일 저장 여부)"""
+    store = opt.checkpoint_store()
+    digest = file_digest(opt.KISSSOFT_EXAMPLE)
+    settings = {**opt.sizing_settings(), "save": bool(save_dir)}
+    checkpoints = [store.open(store.key(digest, case, settings)) for case in cases]
+    if fresh:
+        for ck in checkpoints:
+            ck.clear()
+    return checkpoints
+
+
+def run_sweep(cases, instances=DEFAULT_INSTANCES, save_dir=None, log=print,
+              backend=None, latency=None, sizing=None, resume=False, fresh=False, cache=None):
+    """
+    케이스 목록을 instances 개 KISSsoft 인스턴스로 나눠 계산한다.
+    backend/latency 는 kisssoft_com.dispatch 참고 (기본: KISSSOFT_BACKEND).
+    sizing 은 opt.configure_sizing 인자 dict (작업 프로세스마다 적용).
+    resume=True 이면 케이스마다 결과를 체크포인트에 남기고, 이미 성공한 케이스는
+    다시 계산하지 않는다 (오류 케이스는 다음 실행에서 재시도).
+    cache 는 (결과 캐시 위치, 최대 크기) -> 다른 실행에서 계산한 같은 케이스도 재사용.
+    반환: 입력 순서의 결과 dict 목록
+    """
+    if sizing:
+        opt.configure_sizing(**sizing)      # 체크포인트 키에 현재 설정이 들어가도록 먼저 적용
+    if cache:
+        # 기본 위치(opt.OUTPUT_DIR 기준)는 여기서 정한다. spawn 으로 시작한 작업 프로세스
+        # (Windows) 는 main 에서 바꾼 OUTPUT_DIR 을 모르므로 절대 경로로 넘긴다.
+        cache = (os.path.abspath(opt.result_cache(*cache).root), cache[1])
+    records = [None] * len(cases)
+    checkpoints = _case_checkpoints(cases, save_dir, fresh) if resume else None
+    if checkpoints:
+        for i, ck in enumerate(checkpoints):
+            records[i] = ck.get("record")
+        n_done = sum(r is not None for r in records)
+        if n_done:
+            log(f"  [체크포인트] 완료된 케이스 {n_done}개 건너뜀")
+    items = [(i, case) for i, case in enumerate(cases) if records[i] is None]
+    if not items:
+        return records
+
+    instances = max(1, min(instances, len(items)))
+    if instances == 1:
+        _init_worker(save_dir, backend, latency, sizing, cache)
+        results = map(_run_indexed, items)
+    else:
+        pool = Pool(instances, initializer=_init_worker,
+                    initargs=(save_dir, backend, latency, sizing, cache))
+        # 케이스마다 계산 시간이 달라 1개씩 분배, 결과는 입력 순서로
+        results = pool.imap(_run_indexed, items, chunksize=1)
+    try:
+        for n, r in enumerate(results, 1):
+            records[r["case"]] = r
+            if checkpoints and r["error"] is None:
+                checkpoints[r["case"]].save("record", r, files=[r["file"]] if "file" in r else ())
+            status = "오류: " + r["error"] if r["error"] else \
+                f"SF={r.get('치근 안전율 (SF)')}, SH={r.get('치면 안전율 (SH)')}" + \
+                (" [캐시]" if r.get("cache") else "")
+            log(f"  [{n}/{len(items)}] {r['label']} ({r['시간 [s]']:.1f} s) {status}")
+    finally:
+        if instances > 1:
+            pool.close()
+            pool.join()
+        elif "close" in _worker:
+            _worker.pop("close")()
+    return records
+
+
+# ============================================================
+# 3D 출력 (요청한 설계만)
+# ============================================================
+def select_designs(records, top, by=DEFAULT_EXPORT_BY, descending=False):
+    """오류 없는 케이스 중 by 열 기준 상위 top 개"""
+    ok = [r for r in records if r["error"] is None and r.get(by) is not None]
+    return sorted(ok, key=lambda r: r[by], reverse=descending)[:top]
+
+
+def export_designs(records, output_dir, backend=None, latency=None, workers=1, log=print):
+    """
+    records 의 설계를 KISSsys 에 반영해 STEP 으로 출력 (백그라운드 단계, workers 개 KISSsys).
+    각 record 의 "STEP" 열에 파일명 또는 실패 사유를 채운다.
+    """
+    with ExportStage(backend, latency, workers) as stage:
+        jobs = []
+        for r in records:
+            gear_spec = {label: r[label] for label in opt.GEAR_SPEC_VARS}
+            step_file = os.path.join(output_dir, f"load_case_{r['case'] + 1:03d}_{r['label']}.step")
+            jobs.append((r, step_file, stage.submit(r["label"], opt.kisssys_export,
+                                                    gear_spec, r["토크 [Nm]"], step_file)))
+        for r, step_file, job in jobs:
+            job.wait()
+            r["STEP"] = os.path.basename(step_file) if job.status == "done" else job.status_text()
+            log(f"  [3D] {r['label']}: {job.status_text()}")
+
+
+# ============================================================
+# 비교표
+# ============================================================
+TABLE_COLUMNS = (
+    "label", "토크 [Nm]", "동력 [kW]", "회전수 [rpm]", "솔루션 수",
+    *opt.GEAR_SPEC_VARS, "치면 안전율 (SH)", "치근 안전율 (SF)",
+    "계산수명-치면 [hr]", "계산수명-치근 [hr]", "요구수명 [hr]", "STEP", "error",
+)
+
+
+def _cell(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+def write_comparison(records, output_dir, elapsed, instances):
+    """결과를 Markdown 비교표와 CSV 로 저장. 반환: (md 경로, csv 경로)"""
+    md_path = os.path.join(output_dir, SWEEP_REPORT)
+    csv_path = os.path.join(output_dir, SWEEP_CSV)
+
+    with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(records)
+
+    n_err = sum(r["error"] is not None for r in records)
+    lines = [
+        "---",
+        "tags: [KISSsoft, 기어최적화, 하중스윕]",
+        f"생성일: {datetime.now().strftime('%Y-%m-%d')}",
+        "---",
+        "",
+        "# KISSsoft 하중 케이스 스윕 비교",
+        "",
+        f"> 모델: `{os.path.basename(opt.KISSSOFT_EXAMPLE)}`, 케이스 {len(records)}개 "
+        f"(오류 {n_err}개), 인스턴스 {instances}개, 총 {elapsed:.1f} s",
+        "",
+        "| " + " | ".join(TABLE_COLUMNS) + " |",
+        "|" + "------|" * len(TABLE_COLUMNS),
+    ]
+    for r in records:
+        lines.append("| " + " | ".join(_cell(r.get(c)) for c in TABLE_COLUMNS) + " |")
+    with open(md_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return md_path, csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KISSsoft 하중 케이스 병렬 스윕")
+    parser.add_argument("--factors", help="하중 배율 목록 (쉼표 구분, 예: 1.0,1.1,1.2)")
+    parser.add_argument("--cases", help="케이스 CSV (label, factor 또는 torque, speed)")
+    parser.add_argument("--instances", type=int, default=DEFAULT_INSTANCES,
+                        help=f"동시 KISSsoft 인스턴스 수 (기본: {DEFAULT_INSTANCES}, 라이선스 수 이하)")
+    parser.add_argument("--save", action="store_true", help="케이스별 .z12 파일 저장")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="COM 백엔드 (기본: KISSSOFT_BACKEND 또는 com)")
+    parser.add_argument("--latency", help="local 백엔드 호출 지연 [s] (예: 0.01,Calculate=0.5)")
+    parser.add_argument("--multi-vars", action="store_true",
+                        help="local 백엔드에서 GetVars/SetVars 다중 변수 경로 사용 (일괄 읽기 검증용)")
+    parser.add_argument("--output-dir", help=f"출력 디렉토리 (기본: {opt.OUTPUT_DIR})")
+    parser.add_argument("--sizing", choices=("kisssoft", "native"), default=opt.SIZING_ENGINE,
+                        help="Fine Sizing 엔진 (native: 로컬 순위 후 상위 후보만 KISSsoft 검증)")
+    parser.add_argument("--top-k", type=int, help=f"native 검증 후보 수 (기본: {opt.SIZING_TOP_K})")
+    parser.add_argument("--objectives", help="native 목적함수 가중치 (예: weight=1,min_safety=0.5)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="케이스 체크포인트를 쓰지 않음 (기본: 완료된 케이스 건너뜀)")
+    parser.add_argument("--fresh", action="store_true", help="기존 케이스 체크포인트를 지우고 시작")
+    parser.add_argument("--export-top", type=int, default=0,
+                        help="3D STEP 을 출력할 상위 설계 수 (기본: 0 = 출력 안 함)")
+    parser.add_argument("--export-by", default=DEFAULT_EXPORT_BY,
+                        help=f"상위 설계 선정 열 (작은 순, 기본: {DEFAULT_EXPORT_BY})")
+    parser.add_argument("--export-workers", type=int, default=1, help="동시 KISSsys 인스턴스 수")
+    parser.add_argument("--no-cache", action="store_true", help="계산 결과 캐시를 쓰지 않음")
+    parser.add_argument("--cache-dir", help="결과 캐시 위치 (기본: KISSSOFT_CACHE_DIR 또는 출력/.cache)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 2**20,
+                        help="결과 캐시 최대 크기 [MB]")
+    args = parser.parse_args()
+    if args.output_dir:
+        opt.OUTPUT_DIR = args.output_dir
+    if args.multi_vars:
+        if args.backend != "local":
+            parser.error("--multi-vars 는 --backend local 에서만 사용 가능")
+        enable_multi_vars()
+
+    cases = []
+    if args.factors:
+        cases += parse_factors(args.factors)
+    if args.cases:
+        cases += read_cases(args.cases)
+    if not cases:
+        parser.error("--factors 또는 --cases 가 필요합니다")
+
+    opt.ensure_output_dir()
+    print("=" * 60)
+    print(f"KISSsoft 하중 스윕: 케이스 {len(cases)}개, 인스턴스 {args.instances}개")
+    print("=" * 60)
+
+    t0 = time.perf_counter()
+    records = run_sweep(cases, args.instances, opt.OUTPUT_DIR if args.save else None,
+                        backend=args.backend, latency=args.latency,
+                        sizing={"engine": args.sizing, "top_k": args.top_k,
+                                "objectives": args.objectives},
+                        resume=not args.no_resume, fresh=args.fresh,
+                        cache=None if args.no_cache else (args.cache_dir, args.cache_size * 2**20))
+    elapsed = time.perf_counter() - t0
+
+    # 비교표는 먼저 저장하고, 3D 출력 대상의 STEP 열은 출력이 끝난 뒤 갱신
+    chosen = select_designs(records, args.export_top, args.export_by) if args.export_top else []
+    for r in chosen:
+        r["STEP"] = "대기"
+    md_path, csv_path = write_comparison(records, opt.OUTPUT_DIR, elapsed, args.instances)
+    print(f"\n비교표 저장: {md_path}")
+    print(f"CSV 저장: {csv_path}")
+    if chosen:
+        print(f"\n3D STEP 출력: {len(chosen)}개 ({args.export_by} 기준)")
+        export_designs(chosen, opt.OUTPUT_DIR, args.backend, args.latency, args.export_workers)
+        write_comparison(records, opt.OUTPUT_DIR, elapsed, args.instances)
+        print("비교표 STEP 열 갱신")
+    if any(r["error"] for r in records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
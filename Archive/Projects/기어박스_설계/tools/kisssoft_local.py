@@ -0,0 +1,289 @@
+"""
+KISSsoft / KISSsys COM 로컬 대체 백엔드 (순수 Python, win32com 불필요)
+- KISSsoftCOM.KISSsoft / KISSsysCOM.KISSsys 와 같은 메서드를 제공
+  (OpenFile, GetVar, SetVar, CalculateFineSizing, SetFineSizingSolution,
+   Calculate, SaveFile, Export3D, GetVersion, SetSilentMode, Close)
+- 강도/안전율은 gearbox_design_agma.py 의 AGMA 식(design_stage)으로 계산한 근사값
+  -> KISSsoft(ISO 6336) 결과와 수치는 다르다. 오케스트레이션(일괄 읽기/쓰기, 인스턴스 풀,
+     캐시) 검증과 벤치마크 용도이며 설계 판단에 쓰지 않는다.
+- 호출마다 인위적인 지연(latency)을 넣어 실제 COM 왕복/계산 시간을 흉내 낸다
+
+    ks = LocalKISSsoft(latency={"*": 0.002, "CalculateFineSizing": 1.0})
+    ks.OpenFile("CylGearPair1.z12")      # 없는 경로는 파일명으로 내장 예제 모델 사용
+
+지연은 KISSSOFT_LOCAL_LATENCY 환경 변수로도 준다 (parse_latency 형식):
+    KISSSOFT_LOCAL_LATENCY="0.002,Calculate=0.2,CalculateFineSizing=1.0"
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gearbox_design_agma import GearboxSpec, design_stage  # noqa: E402
+from kisssoft_fine_sizing import (  # noqa: E402
+    DEFAULT_RANGE, LIFE_EXP_FLANK, LIFE_EXP_ROOT, case_from_vars, life_hours, rank_solutions,
+)
+
+LATENCY_ENV = "KISSSOFT_LOCAL_LATENCY"
+VERSION = "local-1"     # GetVersion 값 (결과 캐시 키에 들어감 -> 계산식이 바뀌면 올린다)
+
+# 내장 예제 모델 (파일명 -> 변수). 경로가 없으면 파일명으로 찾는다.
+# 입력값은 gearbox_design_agma 기본 사양의 1단 (10 kW, 1750 RPM, SCM420H)
+_PAIR = {
+    "ZS.Torque": 54.57, "ZS.Power": 10.0, "ZS.Speed": 1750.0,
+    "ZS.Ka": 1.5, "ZS.Hlife": 20000.0,
+    "ZR[0].z": 18, "ZR[1].z": 63, "ZR[0].mn": 3.0, "ZR[0].b": 30.0,
+    "ZR[0].alfn": 20.0, "ZR[0].beta": 20.0,
+    "FineSizing.SFmin": 1.0, "FineSizing.SHmin": 1.0,
+}
+# 2단 감속기: gearbox_design_agma 기본 사양의 1단/2단 (기어비 7 x 5, 2단 토크 = T1 * 7 * 0.98)
+_STAGE1 = {**_PAIR, "ZR[1].z": 126}
+_STAGE2 = {**_PAIR, "ZS.Torque": 374.32, "ZS.Power": 9.8, "ZS.Speed": 250.0,
+           "ZR[0].z": 20, "ZR[1].z": 100, "ZR[0].mn": 4.5, "ZR[0].b": 45.0}
+EXAMPLES = {
+    "CylGearPair1.z12": _PAIR,
+    "SingleStageGearbox.ksys": {"GearPair1." + k: v for k, v in _PAIR.items()},
+    "TwoStageGearbox.ksys": {f"GearPair{i}.{k}": v
+                             for i, pair in enumerate((_STAGE1, _STAGE2), 1) for k, v in pair.items()},
+}
+
+_BASE_SPEC = GearboxSpec()
+_PAIR_KEY = re.compile(r"^(.*)ZR\[0\]\.z$")
+
+
+class LocalComError(Exception):
+    """COM 오류 대체 (없는 변수, 없는 파일, 솔루션 번호 범위 밖 등)"""
+
+
+def parse_latency(text):
+    """
+    "0.002,Calculate=0.2" -> {"*": 0.002, "Calculate": 0.2}
+    이름 없는 값은 모든 호출의 기본 지연 [s]
+    """
+    latency = {}
+    for item in (text or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, value = item.rpartition("=")
+        latency[name.strip() or "*"] = float(value)
+    return latency
+
+
+# ============================================================
+# 기어 쌍 계산 (변수 dict 위에서, prefix 는 KISSsys 서브컴포넌트)
+# ============================================================
+def _stage(v, p, z1, z2, mn, b):
+    spec = replace(_BASE_SPEC, psi=b / mn, Ka=v[p + "ZS.Ka"],
+                   helix_angle=v[p + "ZR[0].beta"], pressure_angle=v[p + "ZR[0].alfn"])
+    return design_stage(v[p + "ZS.Torque"], v[p + "ZS.Speed"], z1, z2, mn, spec)
+
+
+def calculate_pair(v, p=""):
+    """현재 제원으로 강도 계산, 결과 변수를 v 에 기록"""
+    s = _stage(v, p, v[p + "ZR[0].z"], v[p + "ZR[1].z"], v[p + "ZR[0].mn"], v[p + "ZR[0].b"])
+    hlife = v[p + "ZS.Hlife"]
+    v.update({
+        p + "ZR[0].d": round(s.d_pinion, 4), p + "ZR[1].d": round(s.d_gear, 4),
+        p + "ZS.aw": round(s.a, 4),
+        p + "ZR[0].SafetyRoot": round(s.SF, 4), p + "ZR[0].SafetyFlank": round(s.SH, 4),
+        p + "ZR[0].LifeRoot": round(life_hours(s.SF, LIFE_EXP_ROOT, hlife), 1),
+        p + "ZR[0].LifeFlank": round(life_hours(s.SH, LIFE_EXP_FLANK, hlife), 1),
+    })
+
+
+def fine_sizing_pair(v, p=""):
+    """
+    잇수/모듈/이폭 범위 전체에서 최소 안전율을 만족하는 솔루션 목록 (중심거리 작은 순).
+    기어비는 현재 모델 값을 유지한다. 반환: [(z1, z2, mn, b), ...]
+    """
+    case = case_from_vars(v, v.get(p + "FineSizing.SFmin", 1.0),
+                          v.get(p + "FineSizing.SHmin", 1.0), prefix=p)
+    ranges = {k: v[p + k] for k in DEFAULT_RANGE if p + k in v}
+    return [(c.z1, c.z2, c.mn, c.b)
+            for c in rank_solutions(case, {"center_distance": 1.0}, top_k=None, ranges=ranges)]
+
+
+# ============================================================
+# COM 객체 대체
+# ============================================================
+class LocalKISSsoft:
+    """KISSsoftCOM.KISSsoft 대체 (단일 기어 쌍 .z12)"""
+
+    progid = "KISSsoftCOM.KISSsoft"
+
+    def __init__(self, latency=None, multi_vars=False):
+        """
+        latency   : 초 단위 float (모든 호출), {메서드명: 초, "*": 기본} 또는
+                    parse_latency 형식 문자열. None 이면 KISSSOFT_LOCAL_LATENCY 환경 변수 (없으면 0)
+        multi_vars: True 이면 GetVars/SetVars 다중 변수 메서드도 제공
+        """
+        if latency is None:
+            latency = parse_latency(os.environ.get(LATENCY_ENV))
+        elif isinstance(latency, str):
+            latency = parse_latency(latency)
+        elif not isinstance(latency, dict):
+            latency = {"*": float(latency)}
+        self.latency = latency
+        self.multi_vars = multi_vars
+        self.calls = Counter()      # 메서드별 호출 수 (벤치마크용)
+        self.path = None
+        self._vars = {}
+        self._solutions = []
+
+    def _enter(self, method):
+        self.calls[method] += 1
+        delay = self.latency.get(method, self.latency.get("*", 0.0))
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pairs(self):
+        return [m.group(1) for m in map(_PAIR_KEY.match, self._vars) if m]
+
+    def __getattr__(self, name):
+        # 다중 변수 메서드는 multi_vars=True 일 때만 존재 (실제 KISSsoft COM 에는 없음)
+        if self.__dict__.get("multi_vars"):
+            if name == "GetVars":
+                return self._get_vars
+            if name == "SetVars":
+                return self._set_vars
+        raise AttributeError(name)
+
+    # --------------------------------------------------------
+    # 파일
+    # --------------------------------------------------------
+    def OpenFile(self, path):
+        self._enter("OpenFile")
+        if os.path.isfile(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise LocalComError(f"로컬 백엔드는 KISSsoft 원본 파일을 읽을 수 없음: {path}")
+            variables = data["vars"]
+        else:
+            name = os.path.basename(path.replace("\\", "/"))   # Windows 경로도 파일명으로
+            if name not in EXAMPLES:
+                raise LocalComError(f"파일 없음: {path}")
+            variables = EXAMPLES[name]
+        self.path = path
+        self._vars = dict(variables)
+        self._solutions = []
+        for p in self._pairs():
+            calculate_pair(self._vars, p)
+        return True
+
+    def SaveFile(self, path):
+        """변수 전체를 JSON 으로 저장 (같은 백엔드의 OpenFile 로 다시 읽을 수 있음)"""
+        self._enter("SaveFile")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"progid": self.progid, "source": self.path, "vars": self._vars},
+                      f, ensure_ascii=False, indent=1)
+        return True
+
+    def Export3D(self, path):
+        """STEP 헤더와 기어 제원 주석만 있는 자리표시 파일 (형상 없음)"""
+        self._enter("Export3D")
+        lines = ["ISO-10303-21;", "HEADER;",
+                 f"FILE_DESCRIPTION(('{self.progid} local backend placeholder'),'2;1');",
+                 f"FILE_NAME('{os.path.basename(path)}','',(''),(''),'','','');",
+                 "FILE_SCHEMA(('AUTOMOTIVE_DESIGN'));", "ENDSEC;", "DATA;"]
+        for p in self._pairs():
+            z1, z2, mn, b = (self._vars[p + k] for k in ("ZR[0].z", "ZR[1].z", "ZR[0].mn", "ZR[0].b"))
+            lines.append(f"/* {p or 'pair'} z={z1}/{z2} mn={mn} b={b} */")
+        lines += ["ENDSEC;", "END-ISO-10303-21;"]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return True
+
+    def GetVersion(self):
+        self._enter("GetVersion")
+        return VERSION
+
+    def SetSilentMode(self, silent):
+        self._enter("SetSilentMode")
+
+    def Close(self):
+        self._enter("Close")
+        self._vars = {}
+
+    # --------------------------------------------------------
+    # 변수
+    # --------------------------------------------------------
+    def GetVar(self, name):
+        self._enter("GetVar")
+        try:
+            return self._vars[name]
+        except KeyError:
+            raise LocalComError(f"변수 없음: {name}") from None
+
+    def SetVar(self, name, value):
+        self._enter("SetVar")
+        self._vars[name] = value
+
+    def _get_vars(self, names):
+        self._enter("GetVars")
+        missing = [n for n in names if n not in self._vars]
+        if missing:
+            raise LocalComError(f"변수 없음: {', '.join(missing)}")
+        return [self._vars[n] for n in names]
+
+    def _set_vars(self, names, values):
+        self._enter("SetVars")
+        self._vars.update(zip(names, values))
+
+    # --------------------------------------------------------
+    # 계산
+    # --------------------------------------------------------
+    def Calculate(self):
+        self._enter("Calculate")
+        for p in self._pairs():
+            calculate_pair(self._vars, p)
+        return True
+
+    def CalculateFineSizing(self):
+        self._enter("CalculateFineSizing")
+        self._solutions = fine_sizing_pair(self._vars)
+        self._vars["FineSizing.NumResults"] = len(self._solutions)
+        return True
+
+    def SetFineSizingSolution(self, index):
+        self._enter("SetFineSizingSolution")
+        if not 0 <= index < len(self._solutions):
+            raise LocalComError(f"Fine Sizing 솔루션 번호 범위 밖: {index}")
+        z1, z2, mn, b = self._solutions[index]
+        self._vars.update({"ZR[0].z": z1, "ZR[1].z": z2, "ZR[0].mn": mn, "ZR[0].b": b})
+        calculate_pair(self._vars)
+        return True
+
+
+class LocalKISSsys(LocalKISSsoft):
+    """
+    KISSsysCOM.KISSsys 대체. 변수는 "GearPair1.ZR[0].z" 처럼 서브컴포넌트 이름이 붙고,
+    Calculate 는 모델 안의 모든 기어 쌍을 다시 계산한다.
+    """
+
+    progid = "KISSsysCOM.KISSsys"
+
+    def CalculateFineSizing(self):
+        raise AttributeError("CalculateFineSizing")
+
+    def SetFineSizingSolution(self, index):
+        raise AttributeError("SetFineSizingSolution")
+
+
+BACKEND_CLASSES = {cls.progid: cls for cls in (LocalKISSsoft, LocalKISSsys)}
+
+
+def create(progid, latency=None, multi_vars=False):
+    """win32com.client.Dispatch(progid) 대체"""
+    try:
+        cls = BACKEND_CLASSES[progid]
+    except KeyError:
+        raise LocalComError(f"로컬 백엔드에 없는 COM 클래스: {progid}") from None
+    return cls(latency=latency, multi_vars=multi_vars)
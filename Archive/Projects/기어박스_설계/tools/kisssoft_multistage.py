@@ -0,0 +1,345 @@
+"""
+KISSsoft 다단 감속기 최적화 (KISSsys 모델의 기어 쌍 전체)
+- KISSsys 모델에서 기어 쌍(GearPair1., GearPair2., ...)을 찾아 단별 제원/하중을 읽는다
+- 입력 토크(하중 증가 적용)를 단마다 T(k+1) = T(k) * 기어비 * 효율, n(k+1) = n(k) / 기어비 로 전달
+- 단별 입력 하중이 정해지면 단끼리는 독립 -> 단별 Fine Sizing 을 하중 스윕 작업 프로세스
+  (kisssoft_load_sweep.run_sweep, 단 1개 = 케이스 1개)로 병렬 실행
+- Fine Sizing 은 기어비를 잇수 반올림 범위에서만 유지하므로, 실제 기어비로 하중을 다시 전달해
+  입력 하중이 LOAD_TOL 이상 바뀐 하류 단만 다시 계산 (단 수만큼 반복하면 수렴)
+- 최적화 결과를 KISSsys 각 기어 쌍에 반영 -> 시스템 계산 -> 3D STEP (백그라운드 단계)
+
+사용법:
+    python kisssoft_multistage.py [--model 감속기.ksys] [--instances 2]
+    python kisssoft_multistage.py --backend local --output-dir ./out     (KISSsoft 없이, 2단 예제)
+
+단별 계산은 KISSsoft 단일 쌍 모델(KISSSOFT_EXAMPLE)에 기어 쌍의 제원/하중을 써서 수행한다.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import kisssoft_gear_optimization as opt
+import kisssoft_load_sweep as sweep
+from kisssoft_cache import DEFAULT_MAX_BYTES, kisssoft_version
+from kisssoft_checkpoint import file_digest
+from kisssoft_com import BACKENDS, ComVars, default_backend, enable_multi_vars
+from kisssoft_export import ExportStage
+from kisssoft_fine_sizing import CASE_VARS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gearbox_design_agma import GearboxSpec  # noqa: E402
+
+
+# ============================================================
+# 설정값 (사용 환경에 맞게 수정하세요)
+# ============================================================
+MULTISTAGE_EXAMPLE = r"C:\Program Files\KISSsoft 2025\example\TwoStageGearbox.ksys"
+PAIR_PATTERN = "GearPair{}."    # KISSsys 기어 쌍 서브컴포넌트 이름 (1 부터)
+MAX_PAIRS = 9                   # 기어 쌍 탐색 상한
+STAGE_EFFICIENCY = GearboxSpec().eta_gear     # 단당 효율 (gearbox_design_agma 와 같은 값)
+LOAD_TOL = 0.005                # 다시 계산할 입력 하중 상대 변화
+# 단별 Fine Sizing 범위: 현재 모듈/이폭의 배율 (1단 예제에서 SIZING_RANGE 와 같은 2.0~4.0 mm, 20~40 mm)
+STAGE_RANGE_SPAN = (2 / 3, 4 / 3)
+
+# 단별 계산 모델에 쓰는 기어 쌍 변수 (토크/회전수는 전달한 하중으로)
+STAGE_VARS = tuple(n for n in CASE_VARS if n not in ("ZS.Torque", "ZS.Speed"))
+
+MULTI_STEP_FILE = "gearbox_multistage_optimized.step"
+MULTI_KSYS_FILE = "gearbox_multistage_optimized.ksys"
+MULTI_REPORT = "다단_기어최적화_결과리포트.md"
+STAGE_FILE = "multistage_stage{}.z12"      # 단별 Fine Sizing 결과 (회차마다 덮어씀)
+
+
+# ============================================================
+# 모델 분석 / 하중 전달
+# ============================================================
+def discover_pairs(com, pattern=PAIR_PATTERN, limit=MAX_PAIRS):
+    """
+    KISSsys 모델의 기어 쌍 접두어 목록 (GearPair1. 부터 피니언 잇수 변수가 없을 때까지).
+    없는 변수 오류가 나야 하므로 ComVars 를 거치지 않고 GetVar 를 직접 호출한다.
+    """
+    pairs = []
+    for i in range(1, limit + 1):
+        prefix = pattern.format(i)
+        try:
+            com.GetVar(prefix + "ZR[0].z")
+        except Exception:
+            break
+        pairs.append(prefix)
+    return pairs
+
+
+def read_pairs(ksys, model):
+    """모델을 열고 {기어 쌍 접두어: {CASE_VARS 변수: 값}} (단 순서)"""
+    kv = ComVars(ksys)
+    kv.call("OpenFile", model)
+    pairs = discover_pairs(ksys)
+    values = kv.fetch([p + n for p in pairs for n in CASE_VARS])
+    return {p: {n: values[p + n] for n in CASE_VARS} for p in pairs}
+
+
+def stage_loads(T_in, n_in, ratios, eta=STAGE_EFFICIENCY):
+    """
+    입력 토크/회전수와 단별 기어비 -> ([단별 피니언 (토크, 회전수)], 출력 (토크, 회전수))
+    """
+    loads = []
+    T, n = T_in, n_in
+    for u in ratios:
+        loads.append((T, n))
+        T, n = T * u * eta, n / u
+    return loads, (T, n)
+
+
+def stage_range(pair):
+    """현재 모듈/이폭 기준 Fine Sizing 범위 (잇수 범위는 SIZING_RANGE 그대로)"""
+    lo, hi = STAGE_RANGE_SPAN
+    mn, b = pair["ZR[0].mn"], pair["ZR[0].b"]
+    return {"ZR[0].mn.min": round(mn * lo, 2), "ZR[0].mn.max": round(mn * hi, 2),
+            "ZR[0].b.min": round(b * lo), "ZR[0].b.max": round(b * hi)}
+
+
+def stage_case(k, pair, load):
+    """단 k (0 부터) 의 하중 스윕 케이스"""
+    T, n = load
+    return {"label": f"stage{k + 1}", "torque": round(T, 4), "speed": round(n, 4),
+            "file": STAGE_FILE.format(k + 1),
+            "vars": {name: pair[name] for name in STAGE_VARS},
+            "ranges": stage_range(pair)}
+
+
+def _moved(old, new):
+    return any(abs(a - b) > LOAD_TOL * abs(b) for a, b in zip(old, new))
+
+
+@opt.PROFILER.timed("단별 Fine Sizing")
+def size_stages(pairs, T_in, n_in, instances=sweep.DEFAULT_INSTANCES, save_dir=None, log=print,
+                **sweep_args):
+    """
+    단별 Fine Sizing. 1회차는 모델 기어비로 전달한 하중으로 전 단을 병렬 계산하고,
+    이후 회차는 실제 기어비로 다시 전달한 하중이 바뀐 단만 다시 계산한다.
+    sweep_args 는 run_sweep 인자 (backend, latency, sizing, resume, fresh, cache).
+    반환: (단별 결과 dict 목록, 단별 (토크, 회전수), 출력 (토크, 회전수))
+    """
+    prefixes = list(pairs)
+    ratios = [pairs[p]["ZR[1].z"] / pairs[p]["ZR[0].z"] for p in prefixes]
+    records = [None] * len(prefixes)
+    sized_for = [None] * len(prefixes)
+    for rnd in range(1, len(prefixes) + 1):
+        loads, _ = stage_loads(T_in, n_in, ratios)
+        todo = [k for k, load in enumerate(loads) if sized_for[k] is None or _moved(sized_for[k], load)]
+        if not todo:
+            break
+        log(f"\n  [{rnd}회차] 단 {', '.join(str(k + 1) for k in todo)} Fine Sizing")
+        cases = [stage_case(k, pairs[prefixes[k]], loads[k]) for k in todo]
+        for k, r in zip(todo, sweep.run_sweep(cases, instances, save_dir, log, **sweep_args)):
+            r.update(pair=prefixes[k], stage=k + 1)
+            records[k], sized_for[k] = r, loads[k]
+        if any(records[k]["error"] for k in todo):
+            break
+        ratios = [r["기어 잇수"] / r["피니언 잇수"] for r in records]
+    loads, output = stage_loads(T_in, n_in, ratios)
+    return records, loads, output
+
+
+# ============================================================
+# KISSsys 반영 / 3D 출력
+# ============================================================
+def stage_writes(records, loads):
+    """KISSsys 에 반영할 {접두어 포함 변수명: 값} (기어 쌍별 제원 + 전달 하중)"""
+    writes = {}
+    for r, (T, n) in zip(records, loads):
+        p = r["pair"]
+        writes.update({p + "ZS.Torque": T, p + "ZS.Speed": n})
+        writes.update({p + var: r[label] for label, var in opt.KISSSYS_GEAR_VARS.items()})
+    return writes
+
+
+@opt.PROFILER.timed("KISSsys/3D 출력 (백그라운드)")
+def kisssys_export_stages(ksys, model, writes, step_file, ksys_file=None):
+    """KISSsys 모델의 모든 기어 쌍에 반영 -> 시스템 계산 -> 3D STEP (+ .ksys). 반환: ComVars"""
+    kv = ComVars(ksys)
+    kv.call("OpenFile", model)
+    kv.set_many(writes)
+    kv.call("Calculate")
+    kv.call("Export3D", step_file)
+    if ksys_file:
+        kv.call("SaveFile", ksys_file)
+    return kv
+
+
+# ============================================================
+# 리포트
+# ============================================================
+STAGE_COLUMNS = ("단", "기어 쌍", "토크 [Nm]", "회전수 [rpm]", "피니언 잇수", "기어 잇수", "기어비",
+                 "모듈 [mm]", "이폭 [mm]", "중심거리 [mm]", "치근 안전율 (SF)", "치면 안전율 (SH)",
+                 "계산수명-치근 [hr]", "계산수명-치면 [hr]", "시간 [s]", "error")
+
+
+def _stage_row(r, load):
+    row = {**r, "단": r["stage"], "기어 쌍": r["pair"].rstrip("."),
+           "토크 [Nm]": load[0], "회전수 [rpm]": load[1]}
+    if r["error"] is None:
+        row["기어비"] = r["기어 잇수"] / r["피니언 잇수"]
+    return row
+
+
+def write_report(model, records, loads, output, factor, export_status=""):
+    """단별 결과 Markdown 저장. 반환: (경로, 본문)"""
+    T_in, n_in = loads[0]
+    lines = [
+        "---",
+        "tags: [KISSsoft, 기어최적화, 다단]",
+        f"생성일: {datetime.now().strftime('%Y-%m-%d')}",
+        "---",
+        "",
+        f"# KISSsoft 다단 기어 최적화 결과 (하중 +{round((factor - 1) * 100)}%)",
+        "",
+        f"> 모델: `{os.path.basename(model)}`, 기어 쌍 {len(records)}개, "
+        f"입력 {T_in:.2f} Nm @ {n_in:.1f} rpm -> 출력 {output[0]:.2f} Nm @ {output[1]:.2f} rpm "
+        f"(총 기어비 {n_in / output[1]:.3f}, 단당 효율 {STAGE_EFFICIENCY})",
+        "",
+        "## 단별 결과",
+        "",
+        "| " + " | ".join(STAGE_COLUMNS) + " |",
+        "|" + "------|" * len(STAGE_COLUMNS),
+    ]
+    for r, load in zip(records, loads):
+        row = _stage_row(r, load)
+        lines.append("| " + " | ".join(sweep._cell(row.get(c)) for c in STAGE_COLUMNS) + " |")
+    lines += ["", "## 출력 파일", ""]
+    lines += [f"- {r['stage']}단 KISSsoft 계산 파일: `{os.path.basename(r['file'])}`"
+              for r in records if r.get("file")]
+    lines += [f"- KISSsys 시스템 파일: `{MULTI_KSYS_FILE}`", f"- 3D STEP 모델: `{MULTI_STEP_FILE}`"]
+    if export_status:
+        lines.append(f"- KISSsys/3D 출력 상태: {export_status}")
+    report = "\n".join(lines) + "\n\n" + opt.PROFILER.markdown()
+
+    path = os.path.join(opt.OUTPUT_DIR, MULTI_REPORT)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(report)
+    return path, report
+
+
+# ============================================================
+# 메인 실행
+# ============================================================
+def main():
+    parser = argparse.ArgumentParser(description="KISSsoft 다단 감속기 최적화 (KISSsys 기어 쌍 전체)")
+    parser.add_argument("--model", default=MULTISTAGE_EXAMPLE, help="KISSsys 모델 (.ksys)")
+    parser.add_argument("--factor", type=float, default=opt.LOAD_INCREASE_FACTOR,
+                        help=f"입력 하중 배율 (기본: {opt.LOAD_INCREASE_FACTOR})")
+    parser.add_argument("--instances", type=int, default=sweep.DEFAULT_INSTANCES,
+                        help=f"동시 KISSsoft 인스턴스 수 (기본: {sweep.DEFAULT_INSTANCES}, 라이선스 수 이하)")
+    parser.add_argument("--backend", choices=BACKENDS, default=default_backend(),
+                        help="COM 백엔드 (기본: KISSSOFT_BACKEND 또는 com)")
+    parser.add_argument("--latency", help="local 백엔드 호출 지연 [s] (예: 0.01,Calculate=0.5)")
+    parser.add_argument("--multi-vars", action="store_true",
+                        help="local 백엔드에서 GetVars/SetVars 다중 변수 경로 사용 (일괄 읽기 검증용)")
+    parser.add_argument("--output-dir", help=f"출력 디렉토리 (기본: {opt.OUTPUT_DIR})")
+    parser.add_argument("--sizing", choices=("kisssoft", "native"), default=opt.SIZING_ENGINE,
+                        help="Fine Sizing 엔진 (native: 로컬 순위 후 상위 후보만 KISSsoft 검증)")
+    parser.add_argument("--top-k", type=int, help=f"native 검증 후보 수 (기본: {opt.SIZING_TOP_K})")
+    parser.add_argument("--objectives", help="native 목적함수 가중치 (예: weight=1,min_safety=0.5)")
+    parser.add_argument("--fresh", action="store_true", help="단별 체크포인트를 지우고 시작")
+    parser.add_argument("--no-export", action="store_true", help="KISSsys 반영/3D 출력 생략")
+    parser.add_argument("--no-cache", action="store_true", help="계산 결과 캐시를 쓰지 않음")
+    parser.add_argument("--cache-dir", help="결과 캐시 위치 (기본: KISSSOFT_CACHE_DIR 또는 출력/.cache)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 2**20,
+                        help="결과 캐시 최대 크기 [MB]")
+    parser.add_argument("--trace", help="Chrome trace 파일 경로 (chrome://tracing 에서 열기)")
+    args = parser.parse_args()
+    if args.output_dir:
+        opt.OUTPUT_DIR = args.output_dir
+    if args.multi_vars:
+        if args.backend != "local":
+            parser.error("--multi-vars 는 --backend local 에서만 사용 가능")
+        enable_multi_vars()
+    opt.ensure_output_dir()
+    # 캐시 위치는 OUTPUT_DIR 을 바꾼 이 프로세스에서 정해 둔다 (run_sweep 작업 프로세스와 공유)
+    cache_args = None if args.no_cache else \
+        (os.path.abspath(opt.result_cache(args.cache_dir).root), args.cache_size * 2**20)
+
+    print("=" * 60)
+    print(f"KISSsoft 다단 감속기 최적화: {os.path.basename(args.model)}")
+    print(f"하중 배율: x{args.factor:.2f}, 인스턴스 {args.instances}개")
+    print("=" * 60)
+
+    try:
+        with opt.PROFILER.span("실행", "run"):
+            # 모델 분석 (기어 쌍 탐색, 단별 제원/하중)
+            ksys = opt.connect_kisssys(args.backend, args.latency)
+            if ksys is None:
+                sys.exit(1)
+            try:
+                with opt.PROFILER.span("모델 분석"):
+                    pairs = read_pairs(ksys, args.model)
+                    version = kisssoft_version(ksys)
+            finally:
+                ksys.Close()
+            if not pairs:
+                print(f"[오류] 기어 쌍을 찾지 못했습니다 ({PAIR_PATTERN.format(1)}ZR[0].z 없음)")
+                sys.exit(1)
+            first = pairs[next(iter(pairs))]
+            T_in, n_in = first["ZS.Torque"] * args.factor, first["ZS.Speed"]
+            print(f"\n  기어 쌍 {len(pairs)}개: {', '.join(p.rstrip('.') for p in pairs)}")
+            print(f"  입력: {T_in:.2f} Nm @ {n_in:.1f} rpm")
+
+            records, loads, output = size_stages(
+                pairs, T_in, n_in, args.instances, opt.OUTPUT_DIR,
+                backend=args.backend, latency=args.latency,
+                sizing={"engine": args.sizing, "top_k": args.top_k, "objectives": args.objectives},
+                resume=True, fresh=args.fresh, cache=cache_args)
+            failed = [r for r in records if r["error"]]
+            print(f"\n  출력: {output[0]:.2f} Nm @ {output[1]:.2f} rpm")
+
+            # KISSsys 반영/3D 출력 (백그라운드, 리포트는 먼저)
+            key = cache = job = None
+            files = {"step": os.path.join(opt.OUTPUT_DIR, MULTI_STEP_FILE),
+                     "ksys": os.path.join(opt.OUTPUT_DIR, MULTI_KSYS_FILE)}
+            export_status = ""
+            if not failed and not args.no_export:
+                writes = stage_writes(records, loads)
+                hit = None
+                if cache_args:
+                    cache = opt.result_cache(*cache_args)
+                    key = cache.key(file_digest(args.model), writes, version)
+                    hit = cache.get(key, require=tuple(files))
+                if hit is not None:
+                    for name, dest in files.items():
+                        cache.restore(hit, name, dest)
+                    export_status = "완료 (캐시)"
+                else:
+                    # 리포트를 쓰는 동안 백그라운드에서 실행 (run_pipeline 단계 4/5 와 같은 순서)
+                    stage = ExportStage(args.backend, args.latency,
+                                        connect=lambda: opt.connect_kisssys(args.backend, args.latency))
+                    job = stage.submit("KISSsys/3D", kisssys_export_stages, args.model, writes,
+                                       files["step"], files["ksys"])
+                    export_status = job.status_text()
+
+            if not failed:
+                report_path, _ = write_report(args.model, records, loads, output, args.factor,
+                                              export_status)
+                print(f"\n  리포트 저장: {report_path}")
+            if job is not None:
+                print("\n  KISSsys/3D 출력 대기 중...")
+                stage.close()
+                print(f"  KISSsys/3D 출력: {job.status_text()}")
+                write_report(args.model, records, loads, output, args.factor, job.status_text())
+                if job.status == "done" and key is not None:
+                    cache.put(key, {"loads": loads}, files)
+    finally:
+        timing_path = opt.PROFILER.write_json(os.path.join(opt.OUTPUT_DIR, opt.TIMING_FILE))
+        print(f"\n  실행 시간 기록: {timing_path}")
+        if args.trace:
+            print(f"  Chrome trace: {opt.PROFILER.write_trace(args.trace)}")
+
+    if failed:
+        for r in failed:
+            print(f"  [오류] {r['stage']}단: {r['error']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+KISSsoft 스크립트 실행 시간 계측
+- 단계 함수(@profiler.timed)와 COM 메서드 호출(TimedCom 프록시)의 벽시계 시간/호출 수 기록
+- 결과: 구조화 JSON (분류별 집계), Chrome trace (chrome://tracing, Perfetto 에서 열기),
+  리포트용 Markdown 표
+- 여러 스레드(백그라운드 내보내기 단계)에서 같이 기록해도 안전
+
+라이선스 추가 vs 오케스트레이션 개선 판단용: COM 메서드별 합계가 단계 시간의 대부분이면
+KISSsoft 계산 자체가 병목, 아니면 스크립트 쪽 오버헤드.
+
+    profiler = Profiler()
+    ks = TimedCom(ks, profiler, "KISSsoft")      # ks.Calculate() -> "KISSsoft.Calculate" 기록
+    with profiler.span("단계 1"):
+        ...
+    profiler.write_json("timing.json")
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+# 분류 (집계/표 출력 순서)
+CATEGORIES = {"run": "전체", "step": "단계", "connect": "COM 연결", "com": "COM 메서드"}
+
+
+@dataclass(slots=True)
+class Event:
+    name: str
+    cat: str
+    start: float        # 계측 시작 기준 [s]
+    dur: float          # [s]
+    tid: int
+    thread: str
+
+
+class Profiler:
+    def __init__(self):
+        self.events = []
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # 기록
+    # --------------------------------------------------------
+    @contextmanager
+    def span(self, name, cat="step"):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, cat, t, time.perf_counter() - t)
+
+    def record(self, name, cat, t_start, dur):
+        th = threading.current_thread()
+        event = Event(name, cat, t_start - self._t0, dur, th.ident, th.name)
+        with self._lock:
+            self.events.append(event)
+
+    def timed(self, name=None, cat="step"):
+        """함수 실행 시간을 기록하는 데코레이터 (이름 생략 시 함수명)"""
+        def decorate(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(label, cat):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    # --------------------------------------------------------
+    # 집계 / 출력
+    # --------------------------------------------------------
+    def summary(self):
+        """{분류: {이름: {"count", "total_s", "mean_ms", "max_ms"}}} (분류 안은 합계 큰 순)"""
+        with self._lock:
+            events = list(self.events)
+        groups = {}
+        for e in events:
+            s = groups.setdefault(e.cat, {}).setdefault(e.name, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += e.dur
+            s[2] = max(s[2], e.dur)
+        result = {}
+        for cat in sorted(groups, key=lambda c: list(CATEGORIES).index(c) if c in CATEGORIES else 99):
+            items = sorted(groups[cat].items(), key=lambda kv: -kv[1][1])
+            result[cat] = {name: {"count": n, "total_s": round(total, 6),
+                                  "mean_ms": round(total / n * 1000, 3), "max_ms": round(mx * 1000, 3)}
+                           for name, (n, total, mx) in items}
+        return result
+
+    def write_json(self, path):
+        data = {"started": self.started.isoformat(timespec="seconds"),
+                "elapsed_s": round(time.perf_counter() - self._t0, 6),
+                "summary": self.summary()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        return path
+
+    def write_trace(self, path):
+        """Chrome trace 이벤트 형식 (완료 이벤트 "X", 시간 단위 us)"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+        trace = [{"name": e.name, "cat": e.cat, "ph": "X", "pid": pid, "tid": e.tid,
+                  "ts": round(e.start * 1e6, 1), "dur": round(e.dur * 1e6, 1)} for e in events]
+        trace += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in {e.tid: e.thread for e in events}.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+    def markdown(self):
+        """리포트용 실행 시간 표 (Markdown)"""
+        lines = ["## 실행 시간", "",
+                 "| 구분 | 항목 | 호출 수 | 합계 [s] | 평균 [ms] | 최대 [ms] |",
+                 "|------|------|------|------|------|------|"]
+        for cat, items in self.summary().items():
+            for name, s in items.items():
+                lines.append(f"| {CATEGORIES.get(cat, cat)} | {name} | {s['count']} | "
+                             f"{s['total_s']:.3f} | {s['mean_ms']:.1f} | {s['max_ms']:.1f} |")
+        return "\n".join(lines) + "\n"
+
+
+class TimedCom:
+    """
+    COM 객체 프록시. 메서드 호출마다 "<label>.<메서드>" 이름으로 시간을 기록한다.
+    없는 속성은 원래 객체와 같이 AttributeError (ComVars 의 다중 변수 메서드 탐색 유지).
+    """
+
+    def __init__(self, com, profiler, label):
+        self._com = com
+        self._profiler = profiler
+        self._label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self._com, name)
+        if not callable(attr):
+            return attr
+        span_name = f"{self._label}.{name}"
+        profiler = self._profiler
+
+        def call(*args):
+            with profiler.span(span_name, "com"):
+                return attr(*args)
+        return call